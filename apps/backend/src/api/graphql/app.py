@@ -0,0 +1,218 @@
+"""GraphQL HTTP endpoint
+
+Requests are parsed, validated and checked against the query cost limits
+before any resolver runs, and the computed cost is reported in the
+``extensions`` of every executed response. Parsing and validation results
+are cached by query text, so repeated documents, persisted or not, go
+straight to execution.
+
+Queries can also be sent with GET, with ``query``, ``variables``,
+``operationName`` and ``extensions`` as URL parameters. Those responses carry
+an ETag built from the versions of the boards they read, and a request whose
+``If-None-Match`` still matches is answered with 304 Not Modified without
+running any resolver. Mutations must be sent with POST.
+
+Subscriptions are served over WebSocket with the ``graphql-ws`` protocol;
+their documents go through the same cache and limits as any other.
+"""
+
+from inspect import isawaitable
+from typing import Any, AsyncGenerator, Dict, Optional
+from graphql import DocumentNode, ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.websockets import WebSocket
+from starlette_graphene3 import GQL_ERROR, GraphQLApp, _get_operation_from_request
+from src.api.graphql.cost import check_cost
+from src.api.graphql.documents import ParsedDocument, documents
+from src.api.graphql.etag import etag_matches, query_etag
+from src.api.graphql.persisted import persisted_queries, persisted_query_hash
+from src.core.exceptions import QueryComplexityException, PersistedQueryException
+from src.core.executor import run_blocking
+import json
+
+class KanladinGraphQLApp(GraphQLApp):
+    """GraphQLApp that rejects operations over the cost limits before executing them,
+    answers GET queries with ETags and serves subscriptions over WebSocket"""
+    
+    async def _handle_http_request(self, request: Request) -> JSONResponse:
+        try:
+            operation = await _get_operation_from_request(request)
+        except ValueError as e:
+            return JSONResponse({"errors": [e.args[0]]}, status_code=400)
+        
+        if isinstance(operation, list):
+            return JSONResponse({"errors": ["This server does not support batching"]}, status_code=400)
+        
+        context_value = await self._get_context_value(request)
+        result = await self._execute(
+            operation.get("query"),
+            operation.get("variables"),
+            operation.get("operationName"),
+            context_value,
+            operation.get("extensions")
+        )
+        return JSONResponse(
+            self._response_body(result),
+            status_code=200,
+            background=context_value.get("background")
+        )
+    
+    async def _get_on_get(self, request: Request) -> Optional[Response]:
+        params = request.query_params
+        if "query" not in params and "extensions" not in params:
+            # A plain GET is the GraphiQL page
+            return await super()._get_on_get(request)
+        
+        try:
+            variables = _json_param(params.get("variables"))
+            extensions = _json_param(params.get("extensions"))
+        except ValueError as e:
+            return JSONResponse({"errors": [e.args[0]]}, status_code=400)
+        operation_name = params.get("operationName")
+        
+        parsed = self._load_document(params.get("query"), extensions)
+        if parsed.errors:
+            return JSONResponse(self._response_body(ExecutionResult(data=None, errors=parsed.errors)))
+        operation = get_operation_ast(parsed.document, operation_name)
+        if operation is not None and operation.operation != OperationType.QUERY:
+            return JSONResponse(
+                {"errors": ["Only queries can be sent with GET; use POST for mutations"]},
+                status_code=405,
+                headers={"Allow": "POST"}
+            )
+        
+        # Versions are read before executing: a write racing with this request
+        # can only make the ETag older than the data, never newer
+        etag = await run_blocking(
+            query_etag, self.schema.graphql_schema, parsed.document, operation_name, variables
+        )
+        if etag and etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        context_value = await self._get_context_value(request)
+        result = await self._run(parsed.document, variables, operation_name, context_value)
+        headers = {"Cache-Control": "no-cache"}
+        if etag and not result.errors:
+            # A write that landed during execution may or may not be in the result, so
+            # the result is only tagged with the versions it was read at if they held
+            etag_after = await run_blocking(
+                query_etag, self.schema.graphql_schema, parsed.document, operation_name, variables
+            )
+            if etag_after == etag:
+                headers["ETag"] = etag
+        return JSONResponse(
+            self._response_body(result),
+            status_code=200,
+            headers=headers,
+            background=context_value.get("background")
+        )
+    
+    async def _ws_on_start(self, data: Any, operation_id: str, websocket: WebSocket,
+                           subscriptions: Dict[str, AsyncGenerator[Any, None]]) -> None:
+        parsed = self._load_document(data.get("query"), data.get("extensions"))
+        errors = parsed.errors
+        operation_name = data.get("operationName")
+        if not errors:
+            try:
+                check_cost(self.schema.graphql_schema, parsed.document, operation_name, data.get("variables"))
+            except QueryComplexityException as e:
+                errors = [GraphQLError(e.message, original_error=e)]
+        
+        if not errors:
+            context_value = await self._get_context_value(websocket)
+            operation = get_operation_ast(parsed.document, operation_name)
+            if operation and operation.operation == OperationType.SUBSCRIPTION:
+                errors = await self._start_subscription(
+                    websocket, operation_id, subscriptions, parsed.document,
+                    context_value, data.get("variables"), operation_name
+                )
+            else:
+                errors = await self._handle_query_over_ws(
+                    websocket, operation_id, parsed.document,
+                    context_value, data.get("variables"), operation_name
+                )
+        
+        if errors:
+            await websocket.send_json({
+                "type": GQL_ERROR,
+                "id": operation_id,
+                "payload": self.error_formatter(errors[0])
+            })
+    
+    async def _execute(self, query: Optional[str], variable_values: Optional[Dict[str, Any]],
+                       operation_name: Optional[str], context_value: Any,
+                       extensions: Optional[Dict[str, Any]] = None) -> ExecutionResult:
+        """Parse, validate, cost-check and execute one operation"""
+        parsed = self._load_document(query, extensions)
+        if parsed.errors:
+            return ExecutionResult(data=None, errors=parsed.errors)
+        return await self._run(parsed.document, variable_values, operation_name, context_value)
+    
+    def _load_document(self, query: Optional[str], extensions: Optional[Dict[str, Any]]) -> ParsedDocument:
+        """Resolve a persisted query if one is sent, then parse and validate the document"""
+        try:
+            sha256_hash = persisted_query_hash(query, extensions)
+            if query is None and sha256_hash:
+                query = persisted_queries.get(sha256_hash)
+                if query is None:
+                    raise PersistedQueryException("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+        except PersistedQueryException as e:
+            return ParsedDocument(None, [GraphQLError(e.message, original_error=e)])
+        if query is None:
+            return ParsedDocument(None, [GraphQLError("Must provide query string.")])
+        
+        parsed = documents.get_or_parse(query)
+        # Only valid documents are registered
+        if sha256_hash and not parsed.errors:
+            persisted_queries.register(sha256_hash, query)
+        return parsed
+    
+    async def _run(self, document: DocumentNode, variable_values: Optional[Dict[str, Any]],
+                   operation_name: Optional[str], context_value: Any) -> ExecutionResult:
+        """Cost-check and execute a valid document"""
+        try:
+            query_cost = check_cost(self.schema.graphql_schema, document, operation_name, variable_values)
+        except QueryComplexityException as e:
+            return ExecutionResult(data=None, errors=[GraphQLError(e.message, original_error=e)])
+        
+        result = execute(
+            self.schema.graphql_schema,
+            document,
+            root_value=self.root_value,
+            context_value=context_value,
+            variable_values=variable_values,
+            operation_name=operation_name,
+            middleware=self.middleware,
+            execution_context_class=self.execution_context_class
+        )
+        if isawaitable(result):
+            result = await result
+        result.extensions = {**(result.extensions or {}), "cost": query_cost.to_dict()}
+        return result
+    
+    def _response_body(self, result: ExecutionResult) -> Dict[str, Any]:
+        response: Dict[str, Any] = {"data": result.data}
+        if result.errors:
+            for error in result.errors:
+                # Rejected operations are logged by the error formatter; they need no traceback
+                if error.original_error and not isinstance(
+                    error.original_error, (QueryComplexityException, PersistedQueryException)
+                ):
+                    self.logger.error("An exception occurred in resolvers", exc_info=error.original_error)
+            response["errors"] = [self.error_formatter(error) for error in result.errors]
+        if result.extensions:
+            response["extensions"] = result.extensions
+        return response
+
+def _json_param(value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a JSON object sent as a URL parameter"""
+    if not value:
+        return None
+    try:
+        decoded = json.loads(value)
+    except json.JSONDecodeError:
+        raise ValueError("URL parameters 'variables' and 'extensions' must be JSON")
+    if not isinstance(decoded, dict):
+        raise ValueError("URL parameters 'variables' and 'extensions' must be JSON objects")
+    return decoded
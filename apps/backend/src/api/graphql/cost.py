@@ -0,0 +1,145 @@
+"""Static cost and depth analysis of GraphQL operations
+
+Every selected field costs its weight plus the cost of the fields selected
+beneath it, times the number of items it is expected to return when it is a
+list. Nested lists therefore multiply, just as the reads behind them do.
+Weights and list sizes come from ``GRAPHQL_FIELD_WEIGHTS`` and
+``GRAPHQL_LIST_SIZES``, except that the edges of a connection field count as
+the ``first`` items it asks for. Introspection fields are free and add no
+depth, so tools such as GraphiQL keep working under tight limits.
+"""
+
+from typing import Any, Dict, Optional, Set, Tuple
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLNamedType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_argument_values,
+    get_named_type,
+    get_nullable_type,
+    get_operation_ast,
+    get_variable_values,
+    is_composite_type,
+    is_list_type
+)
+from src.core.config import settings
+from src.core.exceptions import QueryComplexityException
+
+class QueryCost:
+    """The computed cost and depth of one operation"""
+    
+    def __init__(self, cost: int, depth: int):
+        self.cost = cost
+        self.depth = depth
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The cost and limits, as reported in response extensions"""
+        return {
+            "cost": self.cost,
+            "maxCost": settings.GRAPHQL_MAX_COST,
+            "depth": self.depth,
+            "maxDepth": settings.GRAPHQL_MAX_DEPTH
+        }
+
+def operation_cost(schema: GraphQLSchema, document: DocumentNode, operation_name: Optional[str] = None,
+                   variables: Optional[Dict[str, Any]] = None) -> QueryCost:
+    """Compute the cost and depth of the operation a request will run with the given variables"""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return QueryCost(0, 0)
+    values = get_variable_values(schema, operation.variable_definitions or [], variables or {})
+    # Bad variables fail execution anyway; price the operation as if they were left out
+    values = values if isinstance(values, dict) else {}
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    cost, depth = _selection_cost(
+        schema, schema.get_root_type(operation.operation), operation.selection_set, fragments, set(), values
+    )
+    return QueryCost(cost, depth)
+
+def check_cost(schema: GraphQLSchema, document: DocumentNode, operation_name: Optional[str] = None,
+               variables: Optional[Dict[str, Any]] = None) -> QueryCost:
+    """Compute an operation's cost, raising ``QueryComplexityException`` if it is over either limit"""
+    query_cost = operation_cost(schema, document, operation_name, variables)
+    if query_cost.depth > settings.GRAPHQL_MAX_DEPTH or query_cost.cost > settings.GRAPHQL_MAX_COST:
+        raise QueryComplexityException(
+            query_cost.cost, query_cost.depth, settings.GRAPHQL_MAX_COST, settings.GRAPHQL_MAX_DEPTH
+        )
+    return query_cost
+
+def _selection_cost(schema: GraphQLSchema, parent_type: Optional[GraphQLNamedType], selection_set: Optional[SelectionSetNode],
+                    fragments: Dict[str, FragmentDefinitionNode], visited: Set[str], variables: Dict[str, Any],
+                    page_size: Optional[int] = None) -> Tuple[int, int]:
+    """Cost and depth of a selection set on ``parent_type``
+    
+    ``page_size`` is given when ``parent_type`` is a connection, and sizes its edges.
+    """
+    cost, depth = 0, 0
+    if selection_set is None or not hasattr(parent_type, "fields"):
+        return cost, depth
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            name = selection.name.value
+            field = parent_type.fields.get(name)
+            if name.startswith("__") or field is None:
+                # Introspection is free, and unknown fields are left to validation
+                continue
+            field_type = get_named_type(field.type)
+            child_cost, child_depth = _selection_cost(
+                schema, field_type, selection.selection_set, fragments, visited, variables,
+                _page_size(field, selection, variables) if "first" in field.args else None
+            )
+            key = f"{parent_type.name}.{name}"
+            weight = settings.GRAPHQL_FIELD_WEIGHTS.get(key, 1 if is_composite_type(field_type) else 0)
+            size = 1
+            if is_list_type(get_nullable_type(field.type)):
+                size = page_size or settings.GRAPHQL_LIST_SIZES.get(key, settings.GRAPHQL_DEFAULT_LIST_SIZE)
+            cost += size * (weight + child_cost)
+            depth = max(depth, child_depth + 1)
+        elif isinstance(selection, InlineFragmentNode):
+            fragment_type = parent_type
+            if selection.type_condition:
+                fragment_type = schema.get_type(selection.type_condition.name.value)
+            fragment_cost, fragment_depth = _selection_cost(
+                schema, fragment_type, selection.selection_set, fragments, visited, variables, page_size
+            )
+            cost += fragment_cost
+            depth = max(depth, fragment_depth)
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            fragment = fragments.get(name)
+            # A fragment that spreads itself is a validation error; just don't loop on it
+            if fragment is None or name in visited:
+                continue
+            fragment_cost, fragment_depth = _selection_cost(
+                schema,
+                schema.get_type(fragment.type_condition.name.value),
+                fragment.selection_set,
+                fragments,
+                visited | {name},
+                variables,
+                page_size
+            )
+            cost += fragment_cost
+            depth = max(depth, fragment_depth)
+    return cost, depth
+
+def _page_size(field: GraphQLField, selection: FieldNode, variables: Dict[str, Any]) -> int:
+    """The number of items a connection field asks for, or the most it may return if that can't be told"""
+    try:
+        first = get_argument_values(field, selection, variables).get("first")
+    except GraphQLError:
+        return settings.GRAPHQL_MAX_PAGE_SIZE
+    if first is None:
+        return settings.GRAPHQL_DEFAULT_PAGE_SIZE
+    return max(1, min(first, settings.GRAPHQL_MAX_PAGE_SIZE))
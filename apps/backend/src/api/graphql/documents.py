@@ -0,0 +1,87 @@
+"""Cache of parsed and validated GraphQL documents
+
+Clients send the same few documents over and over, and parsing and
+validating one can cost more than running it. Results are kept in an LRU
+keyed by the query text, validation errors included, so a repeated document
+goes straight to execution. Memory is bounded by ``GRAPHQL_DOCUMENT_CACHE_SIZE``
+entries; texts longer than ``GRAPHQL_DOCUMENT_CACHE_MAX_QUERY_LENGTH`` are
+parsed every time rather than cached.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from graphql import DocumentNode, GraphQLError, GraphQLSchema, parse, validate
+from src.api.graphql.schema import schema
+from src.core.config import settings
+import threading
+
+class ParsedDocument:
+    """A parsed document and its validation errors; ``document`` is None if it didn't parse"""
+    
+    def __init__(self, document: Optional[DocumentNode], errors: List[GraphQLError]):
+        self.document = document
+        self.errors = errors
+
+class DocumentCache:
+    """Thread-safe LRU of parsed documents for one schema, counting hits and misses"""
+    
+    def __init__(self, graphql_schema: GraphQLSchema, max_entries: int, max_query_length: int):
+        self.graphql_schema = graphql_schema
+        self.max_entries = max_entries
+        self.max_query_length = max_query_length
+        self._entries: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    def get_or_parse(self, query: str) -> ParsedDocument:
+        """Parse and validate a document, or return the cached result for the same text"""
+        with self._lock:
+            parsed = self._entries.get(query)
+            if parsed is not None:
+                self._entries.move_to_end(query)
+                self._hits += 1
+                return parsed
+            self._misses += 1
+        
+        # Parsing happens outside the lock; two requests racing on one text both parse it
+        parsed = self._parse(query)
+        if len(query) <= self.max_query_length:
+            with self._lock:
+                self._entries[query] = parsed
+                self._entries.move_to_end(query)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return parsed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters since the process started"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hitRate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions
+            }
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def _parse(self, query: str) -> ParsedDocument:
+        try:
+            document = parse(query)
+        except GraphQLError as error:
+            return ParsedDocument(None, [error])
+        return ParsedDocument(document, validate(self.graphql_schema, document))
+
+documents = DocumentCache(
+    schema.graphql_schema,
+    settings.GRAPHQL_DOCUMENT_CACHE_SIZE,
+    settings.GRAPHQL_DOCUMENT_CACHE_MAX_QUERY_LENGTH
+)
@@ -6,7 +6,10 @@ from src.core.exceptions import (
     NotFoundException,
     ValidationException,
     DatabaseException,
-    ConflictException
+    ConflictException,
+    ConcurrentModificationException,
+    QueryComplexityException,
+    PersistedQueryException
 )
 import logging
 
@@ -51,6 +54,20 @@ def format_error(error: GraphQLError):
             formatted_error["code"] = "CONFLICT"
             formatted_error["resourceType"] = original_error.resource_type
             formatted_error["identifier"] = original_error.identifier
+            
+        elif isinstance(original_error, ConcurrentModificationException):
+            formatted_error["code"] = "CONCURRENT_MODIFICATION"
+            formatted_error["resourceType"] = original_error.resource_type
+            
+        elif isinstance(original_error, QueryComplexityException):
+            formatted_error["code"] = "QUERY_TOO_COMPLEX"
+            formatted_error["cost"] = original_error.cost
+            formatted_error["maxCost"] = original_error.max_cost
+            formatted_error["depth"] = original_error.depth
+            formatted_error["maxDepth"] = original_error.max_depth
+            
+        elif isinstance(original_error, PersistedQueryException):
+            formatted_error["code"] = original_error.code
     
     # Log the error
     logger.error(f"GraphQL error: {formatted_error['message']}")
@@ -0,0 +1,83 @@
+"""ETags for GraphQL queries sent over GET
+
+A query's ETag hashes the document, its variables and the versions of the
+data its root fields read. Fields scoped to one board depend only on that
+board's version; anything else depends on ``ALL_BOARDS``, which every write
+bumps. Root fields that read data outside boards, such as ``job``, make the
+response uncacheable.
+"""
+
+from typing import Any, Dict, List, Optional
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    GraphQLError,
+    GraphQLSchema,
+    get_argument_values,
+    get_operation_ast
+)
+from src.core.versions import ALL_BOARDS, board_version_key, versions
+import hashlib
+import json
+
+# Root fields scoped to one board, and the argument holding its ID
+BOARD_FIELDS = {
+    "board": "id",
+    "columns": "boardId",
+    "boardStats": "boardId"
+}
+
+# Root fields whose results don't follow board versions
+UNCACHEABLE_FIELDS = {"job"}
+
+def version_keys(schema: GraphQLSchema, document: DocumentNode, operation_name: Optional[str],
+                 variables: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+    """Version keys the operation's result depends on, or None if it can't be cached"""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return None
+    query_type = schema.query_type
+    keys = set()
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            # Fragments at the root are rare; don't try to scope them
+            keys.add(ALL_BOARDS)
+            continue
+        name = selection.name.value
+        if name.startswith("__"):
+            continue
+        if name in UNCACHEABLE_FIELDS:
+            return None
+        argument = BOARD_FIELDS.get(name)
+        board_id = None
+        if argument:
+            try:
+                board_id = get_argument_values(query_type.fields[name], selection, variables).get(argument)
+            except GraphQLError:
+                # Bad variables fail execution anyway; the response isn't cached
+                return None
+        keys.add(board_version_key(board_id) if board_id else ALL_BOARDS)
+    return sorted(keys)
+
+def query_etag(schema: GraphQLSchema, document: DocumentNode, operation_name: Optional[str],
+               variables: Optional[Dict[str, Any]]) -> Optional[str]:
+    """A strong ETag for the operation's current result, or None if it can't be cached"""
+    keys = version_keys(schema, document, operation_name, variables)
+    if keys is None:
+        return None
+    payload = json.dumps(
+        [document.loc.source.body, operation_name, variables, keys, versions.get(keys)],
+        sort_keys=True,
+        default=str
+    )
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag, using the weak comparison HTTP asks for"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,75 @@
+"""Request-scoped DataLoaders for nested board, column and card fields
+
+A query such as ``boards { columns { cards } }`` resolves the columns of
+every board and then the cards of every column. The loaders collect the
+parent IDs asked for at one level of the query and read them with a single
+service call, so the number of reads follows the depth of the query rather
+than the number of boards and columns. A fresh set of loaders is put in the
+context of each request, so nothing loaded is shared between requests.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from graphene.utils.dataloader import DataLoader
+from starlette.background import BackgroundTasks
+from starlette.requests import HTTPConnection
+from src.db.models.column import Column
+from src.db.models.card import Card
+from src.services.column import ColumnService
+from src.services.card import CardService
+from src.core.executor import run_blocking
+
+class ColumnsByBoardLoader(DataLoader):
+    """Loads each board's columns, in order, by board ID"""
+    
+    def __init__(self, attributes: Optional[List[str]] = None):
+        super().__init__()
+        self.attributes = attributes
+    
+    async def batch_load_fn(self, board_ids: List[str]) -> List[List[Column]]:
+        return await run_blocking(ColumnService.get_columns_by_board_ids, list(board_ids), self.attributes)
+
+class CardsByColumnLoader(DataLoader):
+    """Loads each column's cards, in order, by (board ID, column ID)"""
+    
+    def __init__(self, attributes: Optional[List[str]] = None):
+        super().__init__()
+        self.attributes = attributes
+    
+    async def batch_load_fn(self, columns: List[Tuple[str, str]]) -> List[List[Card]]:
+        return await run_blocking(CardService.get_cards_by_columns, list(columns), self.attributes)
+
+class Loaders:
+    """The loaders of one request, one per projection so reads of different attributes don't mix"""
+    
+    def __init__(self):
+        self._loaders: Dict[Tuple[type, Optional[Tuple[str, ...]]], DataLoader] = {}
+    
+    def columns_by_board(self, attributes: Optional[List[str]] = None) -> ColumnsByBoardLoader:
+        return self._get(ColumnsByBoardLoader, attributes)
+    
+    def cards_by_column(self, attributes: Optional[List[str]] = None) -> CardsByColumnLoader:
+        return self._get(CardsByColumnLoader, attributes)
+    
+    def _get(self, loader_class: type, attributes: Optional[List[str]]) -> DataLoader:
+        key = (loader_class, None if attributes is None else tuple(attributes))
+        if key not in self._loaders:
+            self._loaders[key] = loader_class(attributes)
+        return self._loaders[key]
+
+def graphql_context(request: HTTPConnection) -> Dict[str, Any]:
+    """Context for one GraphQL request, with loaders of its own"""
+    return {
+        "request": request,
+        "background": BackgroundTasks(),
+        "loaders": Loaders()
+    }
+
+def get_loaders(info) -> Loaders:
+    """The loaders of the request being resolved"""
+    context = info.context
+    if isinstance(context, dict):
+        if "loaders" not in context:
+            context["loaders"] = Loaders()
+        return context["loaders"]
+    # Without a context to keep them in, each field gets loaders of its own
+    return Loaders()
@@ -0,0 +1,66 @@
+"""Relay-style cursor pagination for connection fields
+
+Connection fields such as ``cardsConnection`` return a list one page at a
+time, as ``edges`` of ``node`` and ``cursor`` plus a ``pageInfo``. Each page
+is read from storage with ``ExclusiveStartKey``, so the next page costs the
+same however far into the list it starts. A cursor is opaque to clients: it
+holds the storage key of its item and the item's index in the list, so a
+page can resume after any edge and keep numbering items where it left off.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from graphene import relay
+from src.db.engine import Page
+from src.core.config import settings
+from src.core.exceptions import ValidationException
+import base64
+import binascii
+import json
+
+def page_size(first: Optional[int]) -> int:
+    """The number of items to read for a ``first`` argument"""
+    if first is None:
+        return settings.GRAPHQL_DEFAULT_PAGE_SIZE
+    if first < 1 or first > settings.GRAPHQL_MAX_PAGE_SIZE:
+        raise ValidationException(f"first must be between 1 and {settings.GRAPHQL_MAX_PAGE_SIZE}")
+    return first
+
+def encode_cursor(key: Dict[str, Any], index: int) -> str:
+    """The cursor of the item at ``index`` with the given storage key"""
+    payload = json.dumps({"key": key, "index": index}, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Optional[Dict[str, Any]], int]:
+    """The storage key to read after and the index of the next item, for an ``after`` argument"""
+    if not cursor:
+        return None, 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        key, index = payload["key"], payload["index"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise ValidationException("Invalid cursor")
+    # Every key attribute is a string; anything else didn't come from this server
+    if (not isinstance(key, dict) or not all(isinstance(value, str) for value in key.values())
+            or not isinstance(index, int) or index < 0):
+        raise ValidationException("Invalid cursor")
+    return key, index + 1
+
+def connection(connection_type: Type[relay.Connection], page: Page, offset: int,
+               node: Callable[[Any, int], Any]) -> relay.Connection:
+    """Build a connection from a page whose first item is at index ``offset``
+    
+    ``node`` turns each item and its index into the GraphQL object of its edge.
+    """
+    edges = [
+        connection_type.Edge(node=node(item, offset + number), cursor=encode_cursor(key, offset + number))
+        for number, (item, key) in enumerate(zip(page.items, page.keys))
+    ]
+    return connection_type(
+        edges=edges,
+        page_info=relay.PageInfo(
+            has_next_page=page.has_more,
+            has_previous_page=offset > 0,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None
+        )
+    )
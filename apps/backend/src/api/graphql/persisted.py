@@ -0,0 +1,107 @@
+"""Automatic persisted queries (APQ)
+
+Clients send ``extensions.persistedQuery.sha256Hash`` instead of the query
+text. A known hash runs the document stored for it; an unknown one gets a
+``PersistedQueryNotFound`` error, and the client resends the hash together
+with the text once to register it. This follows the protocol Apollo clients
+speak. Stored documents are parsed through the document cache like any other.
+
+``GRAPHQL_PERSISTED_QUERIES`` chooses the mode: ``auto`` registers any valid
+document, ``allowlist`` runs only the documents listed in the
+``GRAPHQL_PERSISTED_QUERY_ALLOWLIST`` file (a JSON object mapping hashes to
+documents), whether they are sent by hash or in full, and ``off`` turns
+persisted queries off.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from src.core.config import settings
+from src.core.exceptions import PersistedQueryException
+import hashlib
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+ALLOWLIST = "allowlist"
+OFF = "off"
+
+def query_hash(query: str) -> str:
+    """The SHA-256 hex digest clients use to name a document"""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+class PersistedQueryStore:
+    """Thread-safe LRU of registered document texts by hash, plus the allowlisted ones"""
+    
+    def __init__(self, max_entries: int, allowlist: Optional[Dict[str, str]] = None):
+        self.max_entries = max_entries
+        self.allowlist = allowlist or {}
+        self._queries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, sha256_hash: str) -> Optional[str]:
+        """The document text registered or allowlisted under a hash, or None"""
+        with self._lock:
+            query = self._queries.get(sha256_hash)
+            if query is not None:
+                self._queries.move_to_end(sha256_hash)
+                return query
+        return self.allowlist.get(sha256_hash)
+    
+    def register(self, sha256_hash: str, query: str):
+        """Keep a valid document's text under its hash, evicting the least recently used"""
+        with self._lock:
+            self._queries[sha256_hash] = query
+            self._queries.move_to_end(sha256_hash)
+            while len(self._queries) > self.max_entries:
+                self._queries.popitem(last=False)
+    
+    def is_allowed(self, sha256_hash: str) -> bool:
+        """Whether a document may run in the current mode"""
+        return settings.GRAPHQL_PERSISTED_QUERIES != ALLOWLIST or sha256_hash in self.allowlist
+
+def persisted_query_hash(query: Optional[str], extensions: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The hash a request's document is stored under, or None when it isn't persisted
+    
+    Raises ``PersistedQueryException`` when the request can't be served as
+    sent: an unsupported version, a hash that doesn't match the text, or a
+    document outside the allowlist.
+    """
+    persisted = (extensions or {}).get("persistedQuery")
+    if settings.GRAPHQL_PERSISTED_QUERIES == OFF:
+        if persisted:
+            raise PersistedQueryException("PersistedQueryNotSupported", "PERSISTED_QUERY_NOT_SUPPORTED")
+        return None
+    
+    if persisted:
+        if persisted.get("version") != 1 or not persisted.get("sha256Hash"):
+            raise PersistedQueryException("Unsupported persisted query version", "PERSISTED_QUERY_NOT_SUPPORTED")
+        sha256_hash = persisted["sha256Hash"]
+        if query is not None and query_hash(query) != sha256_hash:
+            raise PersistedQueryException("Provided sha256Hash does not match the query", "INVALID_PERSISTED_QUERY")
+    elif query is not None and settings.GRAPHQL_PERSISTED_QUERIES == ALLOWLIST:
+        # Full documents are allowed too, as long as they are on the list
+        sha256_hash = query_hash(query)
+    else:
+        return None
+    
+    if not persisted_queries.is_allowed(sha256_hash):
+        raise PersistedQueryException("Query is not on the allowlist", "PERSISTED_QUERY_NOT_ALLOWED")
+    return sha256_hash
+
+def _load_allowlist(path: str) -> Dict[str, str]:
+    if not path:
+        return {}
+    with open(path) as f:
+        allowlist = json.load(f)
+    for sha256_hash, query in allowlist.items():
+        if query_hash(query) != sha256_hash:
+            raise ValueError(f"Allowlisted query {sha256_hash} does not match its hash")
+    logger.info(f"Loaded {len(allowlist)} allowlisted queries from {path}")
+    return allowlist
+
+persisted_queries = PersistedQueryStore(
+    settings.GRAPHQL_PERSISTED_QUERY_CACHE_SIZE,
+    _load_allowlist(settings.GRAPHQL_PERSISTED_QUERY_ALLOWLIST)
+)
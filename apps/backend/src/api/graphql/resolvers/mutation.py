@@ -1,14 +1,35 @@
 import graphene
 import uuid
+from typing import Dict, List
 from src.api.graphql.types.board import BoardType
 from src.api.graphql.types.column import ColumnType
-from src.api.graphql.types.card import CardType
+from src.api.graphql.types.card import CardType, CardResultType, CreateCardInput, UpdateCardInput
+from src.api.graphql.types.job import JobType
 from src.services.board import BoardService
 from src.services.column import ColumnService
 from src.services.card import CardService
+from src.services.event import (
+    EventService,
+    BOARD_UPDATED,
+    BOARD_DELETED,
+    COLUMN_CREATED,
+    COLUMN_UPDATED,
+    COLUMN_DELETED,
+    COLUMNS_REORDERED,
+    CARD_CREATED,
+    CARD_UPDATED,
+    CARD_MOVED,
+    CARD_DELETED,
+    CARDS_CHANGED
+)
 from src.db.models.board import Board
 from src.db.models.column import Column
 from src.db.models.card import Card
+from src.core.config import settings
+from src.core.exceptions import ValidationException
+from src.core.executor import non_blocking
+from src.core.cache import invalidate_boards, invalidate_columns
+from src.core.versions import bump_boards
 
 # Board Mutations
 class CreateBoard(graphene.Mutation):
@@ -18,10 +39,13 @@ class CreateBoard(graphene.Mutation):
     
     board = graphene.Field(BoardType)
     
+    @non_blocking
     def mutate(self, info, title):
         board_id = f"board-{uuid.uuid4().hex[:8]}"
         board = Board(id=board_id, title=title)
         created_board = BoardService.create_board(board)
+        # Nobody can be subscribed to a board that didn't exist, so there is no change to publish
+        bump_boards(created_board.id)
         return CreateBoard(board=BoardType(
             id=created_board.id,
             title=created_board.title
@@ -35,32 +59,40 @@ class UpdateBoard(graphene.Mutation):
     
     board = graphene.Field(BoardType)
     
+    @non_blocking
     def mutate(self, info, id, title):
-        board = BoardService.get_board_by_id(id)
-        if not board:
-            raise Exception(f"Board with ID {id} not found")
-        
-        board.title = title
+        # The repository's conditional write reports a missing board
+        board = Board(id=id, title=title)
         updated_board = BoardService.update_board(board)
+        invalidate_boards(id)
+        bump_boards(id)
+        EventService.publish_board_change([id], BOARD_UPDATED, title=updated_board.title)
         return UpdateBoard(board=BoardType(
             id=updated_board.id,
             title=updated_board.title
         ))
 
 class DeleteBoard(graphene.Mutation):
-    """Mutation to delete a board"""
+    """Mutation to delete a board
+    
+    The board is removed right away; its columns and cards are deleted by a
+    background job whose progress can be followed with the ``job`` query.
+    """
     class Arguments:
         id = graphene.ID(required=True)
     
     success = graphene.Boolean()
+    job = graphene.Field(JobType)
     
+    @non_blocking
     def mutate(self, info, id):
-        board = BoardService.get_board_by_id(id)
-        if not board:
-            raise Exception(f"Board with ID {id} not found")
-        
+        # The repository's conditional delete reports a missing board
         success = BoardService.delete_board(id)
-        return DeleteBoard(success=success)
+        invalidate_boards(id)
+        bump_boards(id)
+        EventService.publish_board_change([id], BOARD_DELETED)
+        job = BoardService.delete_board_contents(id)
+        return DeleteBoard(success=success, job=JobType.from_job(job))
 
 # Column Mutations
 class CreateColumn(graphene.Mutation):
@@ -72,6 +104,7 @@ class CreateColumn(graphene.Mutation):
     
     column = graphene.Field(ColumnType)
     
+    @non_blocking
     def mutate(self, info, title, board_id, order):
         # Verify board exists
         board = BoardService.get_board_by_id(board_id)
@@ -79,13 +112,18 @@ class CreateColumn(graphene.Mutation):
             raise Exception(f"Board with ID {board_id} not found")
         
         column_id = f"col-{uuid.uuid4().hex[:8]}"
-        column = Column(id=column_id, title=title, board_id=board_id, order=order)
-        created_column = ColumnService.create_column(column)
+        column = Column(id=column_id, title=title, board_id=board_id)
+        # The column is given a position between its neighbours at that index
+        created_column = ColumnService.create_column(column, order)
+        invalidate_boards(board_id)
+        bump_boards(board_id)
+        EventService.publish_board_change([board_id], COLUMN_CREATED, column=created_column)
         return CreateColumn(column=ColumnType(
             id=created_column.id,
             title=created_column.title,
             board_id=created_column.board_id,
-            order=created_column.order
+            order=created_column.order,
+            position=created_column.position
         ))
 
 class UpdateColumn(graphene.Mutation):
@@ -97,38 +135,51 @@ class UpdateColumn(graphene.Mutation):
     
     column = graphene.Field(ColumnType)
     
+    @non_blocking
     def mutate(self, info, id, title=None, order=None):
-        column = ColumnService.get_column_by_id(id)
-        if not column:
-            raise Exception(f"Column with ID {id} not found")
-        
-        if title is not None:
-            column.title = title
+        # Write only the fields that were given, without reading the column first
+        changes = {"title": title}
+        updated_column = ColumnService.patch_column(
+            id, **{field: value for field, value in changes.items() if value is not None}
+        )
         if order is not None:
-            column.order = order
-        
-        updated_column = ColumnService.update_column(column)
+            updated_column = ColumnService.move_column(updated_column, order)
+        invalidate_boards(updated_column.board_id)
+        bump_boards(updated_column.board_id)
+        EventService.publish_board_change([updated_column.board_id], COLUMN_UPDATED, column=updated_column)
         return UpdateColumn(column=ColumnType(
             id=updated_column.id,
             title=updated_column.title,
             board_id=updated_column.board_id,
-            order=updated_column.order
+            order=updated_column.order,
+            position=updated_column.position
         ))
 
 class DeleteColumn(graphene.Mutation):
-    """Mutation to delete a column"""
+    """Mutation to delete a column
+    
+    The column is removed right away; its cards are deleted by a background
+    job whose progress can be followed with the ``job`` query.
+    """
     class Arguments:
         id = graphene.ID(required=True)
     
     success = graphene.Boolean()
+    job = graphene.Field(JobType)
     
+    @non_blocking
     def mutate(self, info, id):
         column = ColumnService.get_column_by_id(id)
         if not column:
             raise Exception(f"Column with ID {id} not found")
         
-        success = ColumnService.delete_column(id)
-        return DeleteColumn(success=success)
+        success = ColumnService.delete_column(column)
+        invalidate_boards(column.board_id)
+        invalidate_columns(id)
+        bump_boards(column.board_id)
+        EventService.publish_board_change([column.board_id], COLUMN_DELETED, column=column)
+        job = ColumnService.delete_column_contents(column)
+        return DeleteColumn(success=success, job=JobType.from_job(job))
 
 class UpdateColumnOrder(graphene.Mutation):
     """Mutation to update the order of columns"""
@@ -137,16 +188,17 @@ class UpdateColumnOrder(graphene.Mutation):
     
     success = graphene.Boolean()
     
+    @non_blocking
     def mutate(self, info, columns):
-        # Update the order of each column based on its position in the list
-        for index, column_id in enumerate(columns):
-            column = ColumnService.get_column_by_id(column_id)
-            if not column:
-                raise Exception(f"Column with ID {column_id} not found")
-            
-            column.order = index
-            ColumnService.update_column(column)
-        
+        # Only columns that are out of place get a new position; the service
+        # drops the cached boards itself, even if a write fails part way
+        reordered = ColumnService.reorder_columns(columns)
+        for board_id in {column.board_id for column in reordered}:
+            EventService.publish_board_change(
+                [board_id],
+                COLUMNS_REORDERED,
+                column_ids=[column.id for column in reordered if column.board_id == board_id]
+            )
         return UpdateColumnOrder(success=True)
 
 # Card Mutations
@@ -160,30 +212,28 @@ class CreateCard(graphene.Mutation):
     
     card = graphene.Field(CardType)
     
+    @non_blocking
     def mutate(self, info, title, column_id, description="", order=None):
         # Verify column exists
         column = ColumnService.get_column_by_id(column_id)
         if not column:
             raise Exception(f"Column with ID {column_id} not found")
         
-        # If order is not specified, get the highest order in the column and add 1
-        if order is None:
-            cards = CardService.get_cards_by_column_id(column_id)
-            if cards:
-                highest_order = max(card.order for card in cards)
-                order = highest_order + 1
-            else:
-                order = 0
-        
+        # Without an order the card goes to the end of the column, which only
+        # needs the last card's position rather than the whole column
         card_id = f"card-{uuid.uuid4().hex[:8]}"
-        card = Card(id=card_id, title=title, description=description, column_id=column_id, order=order)
-        created_card = CardService.create_card(card)
+        card = Card(id=card_id, title=title, description=description, column_id=column_id)
+        created_card = CardService.create_card(card, order)
+        invalidate_columns(column_id)
+        bump_boards(column.board_id)
+        EventService.publish_board_change([column.board_id], CARD_CREATED, card=created_card)
         return CreateCard(card=CardType(
             id=created_card.id,
             title=created_card.title,
             description=created_card.description,
             column_id=created_card.column_id,
-            order=created_card.order
+            order=created_card.order,
+            position=created_card.position
         ))
 
 class UpdateCard(graphene.Mutation):
@@ -197,31 +247,38 @@ class UpdateCard(graphene.Mutation):
     
     card = graphene.Field(CardType)
     
+    @non_blocking
     def mutate(self, info, id, title=None, description=None, column_id=None, order=None):
-        card = CardService.get_card_by_id(id)
-        if not card:
-            raise Exception(f"Card with ID {id} not found")
-        
-        if title is not None:
-            card.title = title
-        if description is not None:
-            card.description = description
         if column_id is not None:
             # Verify column exists
             column = ColumnService.get_column_by_id(column_id)
             if not column:
                 raise Exception(f"Column with ID {column_id} not found")
-            card.column_id = column_id
-        if order is not None:
-            card.order = order
         
-        updated_card = CardService.update_card(card)
+        # Write only the text fields that were given, without reading the card first
+        changes = {"title": title, "description": description}
+        updated_card = CardService.patch_card(
+            id, **{field: value for field, value in changes.items() if value is not None}
+        )
+        original_column_id = updated_card.column_id
+        moved = column_id is not None or order is not None
+        try:
+            if moved:
+                updated_card = CardService.move_card(updated_card, column_id or updated_card.column_id, order)
+        finally:
+            invalidate_columns(original_column_id, updated_card.column_id)
+            board_ids = ColumnService.get_board_ids([original_column_id, updated_card.column_id])
+            bump_boards(*board_ids)
+        EventService.publish_board_change(
+            board_ids, CARD_MOVED if moved else CARD_UPDATED, card=updated_card
+        )
         return UpdateCard(card=CardType(
             id=updated_card.id,
             title=updated_card.title,
             description=updated_card.description,
             column_id=updated_card.column_id,
-            order=updated_card.order
+            order=updated_card.order,
+            position=updated_card.position
         ))
 
 class DeleteCard(graphene.Mutation):
@@ -231,12 +288,17 @@ class DeleteCard(graphene.Mutation):
     
     success = graphene.Boolean()
     
+    @non_blocking
     def mutate(self, info, id):
         card = CardService.get_card_by_id(id)
         if not card:
             raise Exception(f"Card with ID {id} not found")
         
-        success = CardService.delete_card(id)
+        success = CardService.delete_card(card)
+        invalidate_columns(card.column_id)
+        board_ids = ColumnService.get_board_ids([card.column_id])
+        bump_boards(*board_ids)
+        EventService.publish_board_change(board_ids, CARD_DELETED, card=card)
         return DeleteCard(success=success)
 
 class MoveCard(graphene.Mutation):
@@ -248,6 +310,7 @@ class MoveCard(graphene.Mutation):
     
     card = graphene.Field(CardType)
     
+    @non_blocking
     def mutate(self, info, id, column_id, order=None):
         # Verify card exists
         card = CardService.get_card_by_id(id)
@@ -259,55 +322,23 @@ class MoveCard(graphene.Mutation):
         if not column:
             raise Exception(f"Column with ID {column_id} not found")
         
-        # Store original column ID and order
+        # Only the moved card is written, with a position between its new neighbours
         original_column_id = card.column_id
-        original_order = card.order
-        
-        # If moving to a new column and order is not specified, add to the end
-        if card.column_id != column_id and order is None:
-            target_column_cards = CardService.get_cards_by_column_id(column_id)
-            if target_column_cards:
-                highest_order = max(c.order for c in target_column_cards)
-                order = highest_order + 1
-            else:
-                order = 0
-        
-        # 1. Update the source column cards (close the gap)
-        if original_column_id != column_id:  # Only if moving to a different column
-            source_column_cards = CardService.get_cards_by_column_id(original_column_id)
-            for c in source_column_cards:
-                # Skip the card being moved
-                if c.id == id:
-                    continue
-                # Shift cards after the moved card up one spot
-                if c.order > original_order:
-                    c.order -= 1
-                    CardService.update_card(c)
-        
-        # 2. Update the target column cards (make space)
-        if order is not None:
-            target_column_cards = CardService.get_cards_by_column_id(column_id)
-            for c in target_column_cards:
-                # Skip the card being moved
-                if c.id == id:
-                    continue
-                # Shift cards at or after the insertion point down one spot
-                if c.order >= order:
-                    c.order += 1
-                    CardService.update_card(c)
-        
-        # 3. Finally, update the moved card's column and order
-        card.column_id = column_id
-        if order is not None:
-            card.order = order
-            
-        updated_card = CardService.update_card(card)
+        try:
+            updated_card = CardService.move_card(card, column_id, order)
+        finally:
+            # Also drop cached cards when the write loses a race, so a retry reads fresh positions
+            invalidate_columns(original_column_id, column_id)
+            board_ids = ColumnService.get_board_ids([original_column_id, column_id])
+            bump_boards(*board_ids)
+        EventService.publish_board_change(board_ids, CARD_MOVED, card=updated_card)
         return MoveCard(card=CardType(
             id=updated_card.id,
             title=updated_card.title,
             description=updated_card.description,
             column_id=updated_card.column_id,
-            order=updated_card.order
+            order=updated_card.order,
+            position=updated_card.position
         ))
 
 class UpdateCardOrder(graphene.Mutation):
@@ -318,49 +349,141 @@ class UpdateCardOrder(graphene.Mutation):
     
     card = graphene.Field(CardType)
     
+    @non_blocking
     def mutate(self, info, id, order):
         # Get the card to be reordered
         card = CardService.get_card_by_id(id)
         if not card:
             raise Exception(f"Card with ID {id} not found")
         
-        # Get all cards in the same column
-        column_cards = CardService.get_cards_by_column_id(card.column_id)
-        
-        # Store the original order of the card being moved
-        original_order = card.order
-        
-        # Update the order of all affected cards in the column
-        for c in column_cards:
-            # Skip the card being moved
-            if c.id == id:
-                continue
-                
-            # If moving card down (to a higher order)
-            if order > original_order:
-                # Shift cards between original position and new position up one spot
-                if original_order < c.order <= order:
-                    c.order -= 1
-                    CardService.update_card(c)
-            # If moving card up (to a lower order)
-            elif order < original_order:
-                # Shift cards between new position and original position down one spot
-                if order <= c.order < original_order:
-                    c.order += 1
-                    CardService.update_card(c)
-        
-        # Finally, update the moved card's order
-        card.order = order
-        updated_card = CardService.update_card(card)
+        # Only the moved card is written, with a position between its new neighbours
+        try:
+            updated_card = CardService.move_card(card, card.column_id, order)
+        finally:
+            # Also drop cached cards when the write loses a race, so a retry reads fresh positions
+            invalidate_columns(card.column_id)
+            board_ids = ColumnService.get_board_ids([card.column_id])
+            bump_boards(*board_ids)
+        EventService.publish_board_change(board_ids, CARD_MOVED, card=updated_card)
         
         return UpdateCardOrder(card=CardType(
             id=updated_card.id,
             title=updated_card.title,
             description=updated_card.description,
             column_id=updated_card.column_id,
-            order=updated_card.order
+            order=updated_card.order,
+            position=updated_card.position
         ))
 
+# Bulk card mutations
+def _check_bulk_size(items: list):
+    if len(items) > settings.BULK_MUTATION_MAX_ITEMS:
+        raise ValidationException(
+            f"At most {settings.BULK_MUTATION_MAX_ITEMS} cards can be sent at once, got {len(items)}"
+        )
+
+def _publish_cards_changed(columns: Dict[str, str]):
+    """Tell each board's subscribers which of its columns to refetch"""
+    column_ids_by_board: Dict[str, List[str]] = {}
+    for column_id, board_id in columns.items():
+        column_ids_by_board.setdefault(board_id, []).append(column_id)
+    for board_id, column_ids in column_ids_by_board.items():
+        EventService.publish_board_change([board_id], CARDS_CHANGED, column_ids=sorted(column_ids))
+
+class CreateCards(graphene.Mutation):
+    """Mutation to create several cards at once
+    
+    Each card is created at its order within its column, or at the end, as
+    if the cards had been created one after another. Cards whose column
+    doesn't exist are reported in the results and the rest are still created.
+    """
+    class Arguments:
+        cards = graphene.List(graphene.NonNull(CreateCardInput), required=True)
+    
+    results = graphene.List(CardResultType)
+    created = graphene.Int()
+    
+    @non_blocking
+    def mutate(self, info, cards):
+        _check_bulk_size(cards)
+        new_cards = [
+            (
+                Card(
+                    id=f"card-{uuid.uuid4().hex[:8]}",
+                    title=item.title,
+                    description=item.description or "",
+                    column_id=item.column_id
+                ),
+                item.order
+            )
+            for item in cards
+        ]
+        # The service drops cached cards and bumps versions itself, even if a write fails part way
+        results, columns = CardService.create_cards(new_cards)
+        _publish_cards_changed(columns)
+        return CreateCards(
+            results=[
+                CardResultType.from_result(index, None, result)
+                for index, result in enumerate(results)
+            ],
+            created=sum(1 for result in results if isinstance(result, Card))
+        )
+
+class UpdateCards(graphene.Mutation):
+    """Mutation to update several cards at once
+    
+    Each card's given fields are written, and a column or order moves it as
+    ``updateCard`` would. Cards that can't be updated are reported in the
+    results and the rest are still updated.
+    """
+    class Arguments:
+        cards = graphene.List(graphene.NonNull(UpdateCardInput), required=True)
+    
+    results = graphene.List(CardResultType)
+    updated = graphene.Int()
+    
+    @non_blocking
+    def mutate(self, info, cards):
+        _check_bulk_size(cards)
+        changes = [
+            (item.id, {"title": item.title, "description": item.description}, item.column_id, item.order)
+            for item in cards
+        ]
+        results, columns = CardService.patch_cards(changes)
+        _publish_cards_changed(columns)
+        return UpdateCards(
+            results=[
+                CardResultType.from_result(index, item.id, result)
+                for index, (item, result) in enumerate(zip(cards, results))
+            ],
+            updated=sum(1 for result in results if isinstance(result, Card))
+        )
+
+class DeleteCards(graphene.Mutation):
+    """Mutation to delete several cards at once
+    
+    Cards that don't exist are reported in the results and the rest are
+    still deleted.
+    """
+    class Arguments:
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+    
+    results = graphene.List(CardResultType)
+    deleted = graphene.Int()
+    
+    @non_blocking
+    def mutate(self, info, ids):
+        _check_bulk_size(ids)
+        results, columns = CardService.delete_cards(ids)
+        _publish_cards_changed(columns)
+        return DeleteCards(
+            results=[
+                CardResultType.from_result(index, card_id, result)
+                for index, (card_id, result) in enumerate(zip(ids, results))
+            ],
+            deleted=sum(1 for result in results if isinstance(result, Card))
+        )
+
 class Mutation(graphene.ObjectType):
     """Root GraphQL Mutation"""
     # Board mutations
@@ -380,3 +503,6 @@ class Mutation(graphene.ObjectType):
     delete_card = DeleteCard.Field()
     move_card = MoveCard.Field()
     update_card_order = UpdateCardOrder.Field()
+    create_cards = CreateCards.Field()
+    update_cards = UpdateCards.Field()
+    delete_cards = DeleteCards.Field()
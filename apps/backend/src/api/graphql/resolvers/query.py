@@ -1,21 +1,36 @@
 import graphene
-from src.api.graphql.types.board import BoardType
-from src.api.graphql.types.column import ColumnType
-from src.api.graphql.types.card import CardType
+from src.api.graphql.types.board import BoardConnection, BoardType
+from src.api.graphql.types.column import ColumnType, column_projection
+from src.api.graphql.types.card import CardConnection, CardType, card_projection
+from src.api.graphql.types.job import JobType
+from src.api.graphql.types.stats import BoardStatsType
 from src.services.board import BoardService
 from src.services.column import ColumnService
 from src.services.card import CardService
+from src.api.graphql.selection import selected_fields
+from src.api.graphql.loaders import get_loaders
+from src.api.graphql.pagination import connection, decode_cursor, page_size
+from src.core.executor import non_blocking, run_blocking
+from src.core.jobs import jobs
 
 class Query(graphene.ObjectType):
     """Root GraphQL Query"""
     boards = graphene.List(BoardType)
+    boards_connection = graphene.Field(BoardConnection, first=graphene.Int(), after=graphene.String())
     board = graphene.Field(BoardType, id=graphene.ID(required=True))
     columns = graphene.List(ColumnType, board_id=graphene.ID())
     cards = graphene.List(CardType, column_id=graphene.ID())
+    cards_connection = graphene.Field(
+        CardConnection, column_id=graphene.ID(required=True), first=graphene.Int(), after=graphene.String()
+    )
+    job = graphene.Field(JobType, id=graphene.ID(required=True))
+    board_stats = graphene.Field(BoardStatsType, board_id=graphene.ID(required=True))
     
+    @non_blocking
     def resolve_boards(self, info):
         """Resolve all boards"""
-        boards = BoardService.get_all_boards()
+        # Consume the stream here, on the resolver pool, not on the event loop
+        boards = BoardService.iter_all_boards()
         return [
             BoardType(
                 id=board.id,
@@ -24,6 +39,15 @@ class Query(graphene.ObjectType):
             for board in boards
         ]
     
+    @non_blocking
+    def resolve_boards_connection(self, info, first=None, after=None):
+        """Resolve one page of boards, starting after the ``after`` cursor"""
+        count = page_size(first)
+        start, offset = decode_cursor(after)
+        page = BoardService.get_boards_page(count, start)
+        return connection(BoardConnection, page, offset, lambda board, _: BoardType(id=board.id, title=board.title))
+    
+    @non_blocking
     def resolve_board(self, info, id):
         """Resolve a single board by ID"""
         board = BoardService.get_board_by_id(id)
@@ -34,29 +58,33 @@ class Query(graphene.ObjectType):
             )
         return None
     
-    def resolve_columns(self, info, board_id=None):
+    async def resolve_columns(self, info, board_id=None):
         """Resolve columns, optionally filtered by board_id"""
+        attributes = column_projection(selected_fields(info))
         if board_id:
-            columns = ColumnService.get_columns_by_board_id(board_id)
+            columns = await get_loaders(info).columns_by_board(attributes).load(board_id)
         else:
-            columns = ColumnService.get_all_columns()
+            columns = await run_blocking(ColumnService.get_all_columns, attributes=attributes)
         
         return [
             ColumnType(
                 id=column.id,
                 title=column.title,
                 board_id=column.board_id,
-                order=column.order
+                order=column.order,
+                position=column.position
             ) 
             for column in columns
         ]
     
+    @non_blocking
     def resolve_cards(self, info, column_id=None):
         """Resolve cards, optionally filtered by column_id"""
+        attributes = card_projection(selected_fields(info))
         if column_id:
-            cards = CardService.get_cards_by_column_id(column_id)
+            cards = CardService.get_cards_by_column_id(column_id, attributes=attributes)
         else:
-            cards = CardService.get_all_cards()
+            cards = CardService.get_all_cards(attributes=attributes)
         
         return [
             CardType(
@@ -64,7 +92,32 @@ class Query(graphene.ObjectType):
                 title=card.title,
                 description=card.description,
                 column_id=card.column_id,
-                order=card.order
+                order=card.order,
+                position=card.position
             ) 
             for card in cards
         ]
+    
+    @non_blocking
+    def resolve_cards_connection(self, info, column_id, first=None, after=None):
+        """Resolve one page of a column's cards, starting after the ``after`` cursor"""
+        count = page_size(first)
+        start, offset = decode_cursor(after)
+        page = CardService.get_cards_page(
+            column_id, None, count, start,
+            attributes=card_projection(selected_fields(info, "edges", "node"))
+        )
+        return connection(CardConnection, page, offset, CardType.from_card)
+    
+    @non_blocking
+    def resolve_board_stats(self, info, board_id):
+        """Resolve a board's card and column counts from its maintained counters"""
+        board, columns = BoardService.get_board_stats(board_id)
+        return BoardStatsType.from_board(board, columns)
+    
+    def resolve_job(self, info, id):
+        """Resolve the progress of a background job, or null once it has aged out"""
+        job = jobs.get(id)
+        if job:
+            return JobType.from_job(job)
+        return None
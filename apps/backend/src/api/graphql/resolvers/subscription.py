@@ -0,0 +1,25 @@
+import graphene
+from src.api.graphql.types.event import BoardEventType
+from src.api.graphql.loaders import Loaders
+from src.services.event import EventService
+
+class Subscription(graphene.ObjectType):
+    """Root GraphQL Subscription"""
+    board_changed = graphene.Field(BoardEventType, board_id=graphene.ID(required=True))
+    
+    async def subscribe_board_changed(root, info, board_id):
+        """Yield each change to a board until the client unsubscribes"""
+        subscriber = EventService.subscribe_board(board_id)
+        try:
+            while True:
+                yield await subscriber.get()
+        finally:
+            subscriber.close()
+    
+    def resolve_board_changed(message, info, board_id):
+        """Resolve one change to a board"""
+        # A subscription's context lives as long as it does; nested fields of
+        # each event must read fresh data, not what earlier events loaded
+        if isinstance(info.context, dict):
+            info.context["loaders"] = Loaders()
+        return BoardEventType.from_message(board_id, message)
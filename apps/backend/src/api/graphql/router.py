@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 from starlette.applications import Starlette
-from starlette_graphene3 import GraphQLApp, make_graphiql_handler
+from starlette_graphene3 import make_graphiql_handler
 from src.api.graphql.schema import schema
+from src.api.graphql.app import KanladinGraphQLApp
 from src.api.graphql.error_formatter import format_error
+from src.api.graphql.loaders import graphql_context
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,14 +12,16 @@ logger = logging.getLogger(__name__)
 # Create GraphQL router
 router = APIRouter()
 
-# Create a GraphQLApp instance with custom error formatter
-graphql_app = GraphQLApp(
+# Create a GraphQLApp instance with custom error formatter, per-request loaders and query cost limits
+graphql_app = KanladinGraphQLApp(
     schema, 
     on_get=make_graphiql_handler(),
+    context_value=graphql_context,
     error_formatter=format_error
 )
 
-# Add the GraphQL endpoint to the router
+# Add the GraphQL endpoint to the router, over HTTP and over WebSocket for subscriptions
 router.add_route("/graphql", graphql_app)
+router.add_websocket_route("/graphql", graphql_app)
 
 logger.info("GraphQL router initialized")
@@ -1,6 +1,7 @@
 import graphene
 from src.api.graphql.resolvers.query import Query
 from src.api.graphql.resolvers.mutation import Mutation
+from src.api.graphql.resolvers.subscription import Subscription
 
-# Create the GraphQL schema with both queries and mutations
-schema = graphene.Schema(query=Query, mutation=Mutation)
+# Create the GraphQL schema with queries, mutations and live subscriptions
+schema = graphene.Schema(query=Query, mutation=Mutation, subscription=Subscription)
@@ -0,0 +1,43 @@
+"""Helpers for inspecting which fields a GraphQL query selects"""
+
+from typing import Iterable, Iterator, List, Set
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, SelectionSetNode
+
+def selected_fields(info, *path: str) -> Set[str]:
+    """Names of the fields selected directly beneath the field being resolved
+    
+    Passing a ``path`` of field names looks further down instead, e.g.
+    ``selected_fields(info, "cards")`` from a columns resolver gives the card
+    fields selected under each column.
+    """
+    selection_sets = [field_node.selection_set for field_node in info.field_nodes]
+    for name in path:
+        selection_sets = [
+            node.selection_set
+            for selection_set in selection_sets
+            for node in _field_nodes(selection_set, info)
+            if node.name.value == name
+        ]
+    return {node.name.value for selection_set in selection_sets for node in _field_nodes(selection_set, info)}
+
+def projected_attributes(selected: Set[str], required: Iterable[str], optional: Iterable[str]) -> List[str]:
+    """Item attributes to read so that the selected fields can be resolved
+    
+    GraphQL field names are the camel-cased model fields, which are also the
+    item attribute names, so ``optional`` attributes are read only when a field
+    of the same name is selected. ``required`` attributes are always read.
+    """
+    return sorted(set(required) | (set(optional) & selected))
+
+def _field_nodes(selection_set: SelectionSetNode, info) -> Iterator[FieldNode]:
+    if not selection_set:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from _field_nodes(selection.selection_set, info)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = info.fragments.get(selection.name.value)
+            if fragment:
+                yield from _field_nodes(fragment.selection_set, info)
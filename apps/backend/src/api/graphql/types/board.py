@@ -1,22 +1,47 @@
 import graphene
-from src.api.graphql.types.column import ColumnType
+from src.api.graphql.types.column import ColumnConnection, ColumnType, column_projection
+from src.api.graphql.selection import selected_fields
+from src.api.graphql.loaders import get_loaders
+from src.api.graphql.pagination import connection, decode_cursor, page_size
 from src.services.column import ColumnService
+from src.core.executor import non_blocking
 
 class BoardType(graphene.ObjectType):
     """GraphQL type for Board"""
     id = graphene.ID()
     title = graphene.String()
     columns = graphene.List(ColumnType)
+    columns_connection = graphene.Field(ColumnConnection, first=graphene.Int(), after=graphene.String())
     
-    def resolve_columns(self, info):
-        """Resolve columns for this board"""
-        columns = ColumnService.get_columns_by_board_id(self.id)
+    async def resolve_columns(self, info):
+        """Resolve columns for this board, read together with the other boards in the query"""
+        columns = await get_loaders(info).columns_by_board(
+            column_projection(selected_fields(info))
+        ).load(self.id)
         return [
             ColumnType(
                 id=column.id,
                 title=column.title,
                 board_id=column.board_id,
-                order=column.order
+                order=column.order,
+                position=column.position
             ) 
             for column in columns
         ]
+    
+    @non_blocking
+    def resolve_columns_connection(self, info, first=None, after=None):
+        """Resolve one page of this board's columns, starting after the ``after`` cursor"""
+        count = page_size(first)
+        start, offset = decode_cursor(after)
+        page = ColumnService.get_columns_page(
+            self.id, count, start,
+            attributes=column_projection(selected_fields(info, "edges", "node"))
+        )
+        return connection(ColumnConnection, page, offset, ColumnType.from_column)
+
+class BoardConnection(graphene.relay.Connection):
+    """GraphQL type for a page of boards"""
+    
+    class Meta:
+        node = BoardType
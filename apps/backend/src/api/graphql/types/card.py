@@ -1,4 +1,25 @@
 import graphene
+from typing import List, Optional, Set, Union
+from src.api.graphql.selection import projected_attributes
+from src.db.models.card import Card
+from src.services.card import CardService
+from src.core.exceptions import (
+    ConcurrentModificationException,
+    ConflictException,
+    KanladinException,
+    NotFoundException,
+    ValidationException
+)
+from src.core.executor import run_blocking
+
+# Card attributes every read needs to order and group cards
+CARD_REQUIRED_ATTRIBUTES = ("id", "columnId", "position")
+# Text attributes, read only when the query selects them
+CARD_OPTIONAL_ATTRIBUTES = ("title", "description")
+
+def card_projection(selected: Set[str]) -> List[str]:
+    """Card attributes to read for the selected CardType fields"""
+    return projected_attributes(selected, CARD_REQUIRED_ATTRIBUTES, CARD_OPTIONAL_ATTRIBUTES)
 
 class CardType(graphene.ObjectType):
     """GraphQL type for Card"""
@@ -7,3 +28,82 @@ class CardType(graphene.ObjectType):
     description = graphene.String()
     column_id = graphene.String()
     order = graphene.Int()
+    position = graphene.String()
+    
+    @classmethod
+    def from_card(cls, card: Card, order: Optional[int] = None) -> 'CardType':
+        """Build the type from a card, numbered ``order`` within its column when known"""
+        return cls(
+            id=card.id,
+            title=card.title,
+            description=card.description,
+            column_id=card.column_id,
+            order=card.order if order is None else order,
+            position=card.position
+        )
+    
+    def resolve_order(self, info):
+        """Resolve the card's index within its column"""
+        # Listed cards are numbered as they are read; a single card is looked up in its column
+        if self.order is not None or self.column_id is None:
+            return self.order
+        return run_blocking(CardService.get_card_order, self.id, self.column_id)
+
+class CardConnection(graphene.relay.Connection):
+    """GraphQL type for a page of cards, in position order"""
+    
+    class Meta:
+        node = CardType
+
+class CreateCardInput(graphene.InputObjectType):
+    """One card of a createCards mutation"""
+    title = graphene.String(required=True)
+    description = graphene.String()
+    column_id = graphene.ID(required=True)
+    order = graphene.Int()
+
+class UpdateCardInput(graphene.InputObjectType):
+    """One card of an updateCards mutation; fields left out are not changed"""
+    id = graphene.ID(required=True)
+    title = graphene.String()
+    description = graphene.String()
+    column_id = graphene.ID()
+    order = graphene.Int()
+
+class CardResultType(graphene.ObjectType):
+    """GraphQL type for the outcome of one item of a bulk card mutation"""
+    index = graphene.Int()
+    id = graphene.ID()
+    card = graphene.Field(CardType)
+    error = graphene.String()
+    code = graphene.String()
+    
+    @classmethod
+    def from_result(cls, index: int, card_id: Optional[str], result: Union[Card, KanladinException]) -> 'CardResultType':
+        """Describe the card written for an item, or the error that kept it out"""
+        if isinstance(result, KanladinException):
+            return cls(index=index, id=card_id, error=result.message, code=_error_code(result))
+        return cls(
+            index=index,
+            id=result.id,
+            card=CardType(
+                id=result.id,
+                title=result.title,
+                description=result.description,
+                column_id=result.column_id,
+                order=result.order,
+                position=result.position
+            )
+        )
+
+def _error_code(error: KanladinException) -> Optional[str]:
+    # The same codes the error formatter gives whole-request errors
+    if isinstance(error, NotFoundException):
+        return "NOT_FOUND"
+    if isinstance(error, ValidationException):
+        return "VALIDATION_ERROR"
+    if isinstance(error, ConflictException):
+        return "CONFLICT"
+    if isinstance(error, ConcurrentModificationException):
+        return "CONCURRENT_MODIFICATION"
+    return None
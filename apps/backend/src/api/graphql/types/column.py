@@ -1,6 +1,22 @@
 import graphene
-from src.api.graphql.types.card import CardType
+from typing import List, Optional, Set
+from src.api.graphql.types.card import CardConnection, CardType, card_projection
+from src.api.graphql.selection import selected_fields, projected_attributes
+from src.api.graphql.loaders import get_loaders
+from src.api.graphql.pagination import connection, decode_cursor, page_size
+from src.db.models.column import Column
+from src.services.column import ColumnService
 from src.services.card import CardService
+from src.core.executor import non_blocking, run_blocking
+
+# Column attributes every read needs to order and group columns
+COLUMN_REQUIRED_ATTRIBUTES = ("id", "boardId", "position")
+# Text attributes, read only when the query selects them
+COLUMN_OPTIONAL_ATTRIBUTES = ("title",)
+
+def column_projection(selected: Set[str]) -> List[str]:
+    """Column attributes to read for the selected ColumnType fields"""
+    return projected_attributes(selected, COLUMN_REQUIRED_ATTRIBUTES, COLUMN_OPTIONAL_ATTRIBUTES)
 
 class ColumnType(graphene.ObjectType):
     """GraphQL type for Column"""
@@ -8,18 +24,58 @@ class ColumnType(graphene.ObjectType):
     title = graphene.String()
     board_id = graphene.String()
     order = graphene.Int()
+    position = graphene.String()
     cards = graphene.List(CardType)
+    cards_connection = graphene.Field(CardConnection, first=graphene.Int(), after=graphene.String())
+    
+    @classmethod
+    def from_column(cls, column: Column, order: Optional[int] = None) -> 'ColumnType':
+        """Build the type from a column, numbered ``order`` on its board when known"""
+        return cls(
+            id=column.id,
+            title=column.title,
+            board_id=column.board_id,
+            order=column.order if order is None else order,
+            position=column.position
+        )
+    
+    def resolve_order(self, info):
+        """Resolve the column's index on its board"""
+        # Listed columns are numbered as they are read; a single column is looked up on its board
+        if self.order is not None or self.board_id is None:
+            return self.order
+        return run_blocking(ColumnService.get_column_order, self.id, self.board_id)
     
-    def resolve_cards(self, info):
-        """Resolve cards for this column"""
-        cards = CardService.get_cards_by_column_id(self.id)
+    async def resolve_cards(self, info):
+        """Resolve cards for this column, read together with the other columns in the query"""
+        cards = await get_loaders(info).cards_by_column(
+            card_projection(selected_fields(info))
+        ).load((self.board_id, self.id))
         return [
             CardType(
                 id=card.id,
                 title=card.title,
                 description=card.description,
                 column_id=card.column_id,
-                order=card.order
+                order=card.order,
+                position=card.position
             ) 
             for card in cards
         ]
+    
+    @non_blocking
+    def resolve_cards_connection(self, info, first=None, after=None):
+        """Resolve one page of this column's cards, starting after the ``after`` cursor"""
+        count = page_size(first)
+        start, offset = decode_cursor(after)
+        page = CardService.get_cards_page(
+            self.id, self.board_id, count, start,
+            attributes=card_projection(selected_fields(info, "edges", "node"))
+        )
+        return connection(CardConnection, page, offset, CardType.from_card)
+
+class ColumnConnection(graphene.relay.Connection):
+    """GraphQL type for a page of columns, in position order"""
+    
+    class Meta:
+        node = ColumnType
@@ -0,0 +1,45 @@
+import graphene
+from typing import Any, Dict
+from src.api.graphql.types.column import ColumnType
+from src.api.graphql.types.card import CardType
+
+class BoardEventType(graphene.ObjectType):
+    """GraphQL type for one change to a board, sent to its subscribers
+    
+    ``kind`` says what changed and which of the other fields are set. A
+    ``RESYNC`` event means changes were missed and the board should be
+    fetched again.
+    """
+    board_id = graphene.ID()
+    kind = graphene.String()
+    title = graphene.String()
+    column = graphene.Field(ColumnType)
+    card = graphene.Field(CardType)
+    column_ids = graphene.List(graphene.ID)
+    
+    @classmethod
+    def from_message(cls, board_id: str, message: Dict[str, Any]) -> 'BoardEventType':
+        """Build an event from a broker message"""
+        column = message.get("column")
+        card = message.get("card")
+        return cls(
+            board_id=board_id,
+            kind=message["kind"],
+            title=message.get("title"),
+            column=column and ColumnType(
+                id=column["id"],
+                title=column.get("title"),
+                board_id=column.get("boardId"),
+                order=column.get("order"),
+                position=column.get("position")
+            ),
+            card=card and CardType(
+                id=card["id"],
+                title=card.get("title"),
+                description=card.get("description"),
+                column_id=card.get("columnId"),
+                order=card.get("order"),
+                position=card.get("position")
+            ),
+            column_ids=message.get("columnIds")
+        )
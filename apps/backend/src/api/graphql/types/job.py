@@ -0,0 +1,27 @@
+import graphene
+from src.core.jobs import Job
+
+class JobType(graphene.ObjectType):
+    """GraphQL type for a background job, such as a cascading delete"""
+    id = graphene.ID()
+    kind = graphene.String()
+    target_id = graphene.String()
+    status = graphene.String()
+    processed = graphene.Int()
+    error = graphene.String()
+    created_at = graphene.DateTime()
+    finished_at = graphene.DateTime()
+    
+    @classmethod
+    def from_job(cls, job: Job) -> 'JobType':
+        """Snapshot a job's current progress"""
+        return cls(
+            id=job.id,
+            kind=job.kind,
+            target_id=job.target_id,
+            status=job.status,
+            processed=job.processed,
+            error=job.error,
+            created_at=job.created_at,
+            finished_at=job.finished_at
+        )
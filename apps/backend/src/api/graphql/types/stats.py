@@ -0,0 +1,38 @@
+import graphene
+from typing import List
+from src.db.models.board import Board
+from src.db.models.column import Column
+
+class ColumnStatsType(graphene.ObjectType):
+    """GraphQL type for the counters kept on a column"""
+    column_id = graphene.ID()
+    title = graphene.String()
+    order = graphene.Int()
+    card_count = graphene.Int()
+
+class BoardStatsType(graphene.ObjectType):
+    """GraphQL type for the counters kept on a board and its columns"""
+    board_id = graphene.ID()
+    title = graphene.String()
+    column_count = graphene.Int()
+    card_count = graphene.Int()
+    columns = graphene.List(ColumnStatsType)
+    
+    @classmethod
+    def from_board(cls, board: Board, columns: List[Column]) -> 'BoardStatsType':
+        """Build the stats from a board and its numbered columns"""
+        return cls(
+            board_id=board.id,
+            title=board.title,
+            column_count=board.column_count,
+            card_count=board.card_count,
+            columns=[
+                ColumnStatsType(
+                    column_id=column.id,
+                    title=column.title,
+                    order=column.order,
+                    card_count=column.card_count
+                )
+                for column in columns
+            ]
+        )
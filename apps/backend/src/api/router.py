@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 from src.api.graphql.router import router as graphql_router
+from src.api.transfer import router as transfer_router
+from src.api.graphql.documents import documents
+from src.core.cache import cache
 
 # Create main API router
 router = APIRouter()
@@ -7,7 +10,20 @@ router = APIRouter()
 # Include GraphQL router
 router.include_router(graphql_router)
 
+# Include board export and import endpoints
+router.include_router(transfer_router)
+
 # Health check endpoint
 @router.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+# Read cache hit/miss counters
+@router.get("/cache/stats")
+async def cache_stats():
+    return cache.stats()
+
+# Parsed GraphQL document cache hit/miss counters
+@router.get("/cache/documents/stats")
+async def document_cache_stats():
+    return documents.stats()
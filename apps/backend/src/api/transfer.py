@@ -0,0 +1,78 @@
+"""Board export and import endpoints
+
+``GET /boards/{board_id}/export`` streams a board as NDJSON, and
+``POST /boards/import`` reads one from the request body as it arrives and
+creates a new board from it. Neither holds the whole board in memory.
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from src.services.transfer import BoardImport, TransferService
+from src.core.config import settings
+from src.core.exceptions import NotFoundException, ValidationException
+from src.core.executor import run_blocking
+import json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# A line longer than this is rejected rather than buffered
+MAX_LINE_BYTES = 1024 * 1024
+
+router = APIRouter()
+
+@router.get("/boards/{board_id}/export")
+async def export_board(board_id: str):
+    try:
+        chunks = await run_blocking(TransferService.export_board, board_id)
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    # Starlette pulls the chunks on a worker thread, so the reads behind them don't block the loop
+    return StreamingResponse(
+        chunks,
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{board_id}.ndjson"'}
+    )
+
+@router.post("/boards/import", status_code=201)
+async def import_board(request: Request):
+    board_import = BoardImport()
+    try:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for line_number, record in _ndjson_records(request.stream()):
+            batch.append((line_number, record))
+            if len(batch) >= settings.TRANSFER_BATCH_SIZE:
+                await run_blocking(board_import.write, batch)
+                batch = []
+        if batch:
+            await run_blocking(board_import.write, batch)
+        board = await run_blocking(board_import.finish)
+    except ValidationException as e:
+        await run_blocking(board_import.abort)
+        raise HTTPException(status_code=400, detail=e.message)
+    except Exception:
+        await run_blocking(board_import.abort)
+        raise
+    return {"boardId": board.id, "title": board.title, "columns": board.column_count, "cards": board.card_count}
+
+async def _ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """Parse NDJSON from a stream of byte chunks, yielding (line number, record) for each non-blank line"""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ValidationException(f"Line {line_number + len(lines) + 1} is longer than {MAX_LINE_BYTES} bytes")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, _parse(line_number, line)
+    if buffer.strip():
+        yield line_number + 1, _parse(line_number + 1, buffer)
+
+def _parse(line_number: int, line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        raise ValidationException(f"Line {line_number} is not valid JSON")
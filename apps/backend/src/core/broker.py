@@ -0,0 +1,179 @@
+"""Publish/subscribe broker for live updates
+
+Messages are JSON-serializable dicts published to named topics. Publishers
+may run on any thread, such as the resolver pool; each subscriber receives
+messages on the event loop it subscribed from, through a bounded queue of
+its own. A subscriber that falls ``SUBSCRIPTION_QUEUE_SIZE`` messages behind
+has its backlog dropped and is sent a single ``RESYNC`` message instead, so
+one slow client can't hold memory for everyone else.
+
+``SUBSCRIPTION_BROKER`` chooses the implementation: ``memory`` fans out
+within this process, and ``redis`` relays messages through Redis pub/sub so
+that subscribers on every worker see every message.
+"""
+
+from typing import Any, Dict, Set
+from src.core.config import settings
+import asyncio
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Sent in place of a subscriber's backlog when it overflows; the client should refetch
+RESYNC = "RESYNC"
+
+class Subscriber:
+    """One subscription to a topic, read with ``get`` on the event loop that created it"""
+    
+    def __init__(self, broker: "MemoryBroker", topic: str, queue_size: int):
+        self.broker = broker
+        self.topic = topic
+        self.dropped = 0
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+    
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next message"""
+        return await self._queue.get()
+    
+    def offer(self, message: Dict[str, Any]):
+        """Queue a message from any thread"""
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The subscriber's loop has closed; it will never read again
+            self.close()
+    
+    def close(self):
+        self.broker.unsubscribe(self)
+    
+    def _put(self, message: Dict[str, Any]):
+        if self._queue.full():
+            self.dropped += self._queue.qsize() + 1
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait({"kind": RESYNC})
+            logger.warning(f"Subscriber to {self.topic} fell behind; {self.dropped} messages dropped so far")
+        else:
+            self._queue.put_nowait(message)
+
+class Broker:
+    """Interface for brokers"""
+    
+    def subscribe(self, topic: str) -> Subscriber:
+        """Start receiving the messages published to a topic; must be called on an event loop"""
+        raise NotImplementedError
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        """Stop delivering messages to a subscriber"""
+        raise NotImplementedError
+    
+    def publish(self, topic: str, message: Dict[str, Any]):
+        """Send a message to every subscriber of a topic"""
+        raise NotImplementedError
+
+class MemoryBroker(Broker):
+    """Thread-safe fan-out to the subscribers in this process"""
+    
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, topic: str) -> Subscriber:
+        subscriber = Subscriber(self, topic, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.topic]
+    
+    def publish(self, topic: str, message: Dict[str, Any]):
+        self._deliver(topic, message)
+    
+    def _deliver(self, topic: str, message: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            subscriber.offer(message)
+    
+    def _deliver_to_all(self, message: Dict[str, Any]):
+        with self._lock:
+            subscribers = [subscriber for topic in self._subscribers.values() for subscriber in topic]
+        for subscriber in subscribers:
+            subscriber.offer(message)
+
+class RedisBroker(MemoryBroker):
+    """Messages relayed through Redis pub/sub, then fanned out to this process's subscribers
+    
+    Requires the optional ``redis`` package. One listener thread per process
+    reads every topic, started by the first subscription. Published messages
+    come back through the listener, so every worker delivers them in the same
+    order. When the listener loses Redis, local subscribers are sent
+    ``RESYNC`` once it reconnects, since messages may have been missed.
+    """
+    
+    CHANNEL_PREFIX = "kanladin:events:"
+    
+    def __init__(self, url: str, queue_size: int):
+        super().__init__(queue_size)
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SUBSCRIPTION_BROKER=redis requires the 'redis' package to be installed") from e
+        self._errors = redis.RedisError
+        self._redis = redis.Redis.from_url(url)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+    
+    def subscribe(self, topic: str) -> Subscriber:
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="broker-listener", daemon=True)
+                self._listener.start()
+        return super().subscribe(topic)
+    
+    def publish(self, topic: str, message: Dict[str, Any]):
+        try:
+            self._redis.publish(f"{self.CHANNEL_PREFIX}{topic}", json.dumps(message))
+        except self._errors as e:
+            # Other workers miss this message; at least this one's subscribers get it
+            logger.error(f"Publish to {topic} failed: {str(e)}")
+            self._deliver(topic, message)
+    
+    def _listen(self):
+        reconnecting = False
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
+                if reconnecting:
+                    self._deliver_to_all({"kind": RESYNC})
+                    reconnecting = False
+                for item in pubsub.listen():
+                    channel = item["channel"].decode()
+                    self._deliver(channel[len(self.CHANNEL_PREFIX):], json.loads(item["data"]))
+            except self._errors as e:
+                logger.error(f"Broker listener lost Redis: {str(e)}")
+                reconnecting = True
+                time.sleep(1)
+
+def create_broker() -> Broker:
+    """Build the broker selected by ``SUBSCRIPTION_BROKER``"""
+    backend = settings.SUBSCRIPTION_BROKER
+    if backend == "memory":
+        return MemoryBroker(settings.SUBSCRIPTION_QUEUE_SIZE)
+    if backend == "redis":
+        return RedisBroker(settings.SUBSCRIPTION_REDIS_URL, settings.SUBSCRIPTION_QUEUE_SIZE)
+    raise ValueError(f"Unknown subscription broker: {backend}")
+
+broker = create_broker()
@@ -0,0 +1,323 @@
+"""Read-through cache for board and column reads
+
+Entries are grouped by the board or column they were read from, e.g. a
+board's columns live in the ``board:<id>`` group and a column's cards in the
+``column:<id>`` group. Each group holds one entry per variant of a read (such
+as a projection), and a write drops the whole group, so mutations only need
+to know which boards and columns they touched.
+
+Dropping a group also moves it on to a new generation. A value is only stored
+if its group is still at the generation read before the value was loaded, so
+a read that raced with a write can't put data from before the write back
+into the cache.
+
+The default backend is an in-process LRU with a TTL. ``CACHE_BACKEND=redis``
+shares entries between workers instead, and ``none`` turns caching off.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+from src.core.config import settings
+import logging
+import pickle
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Returned by backends when there is no live entry, since None is a valid value
+MISSING = object()
+
+class CacheBackend:
+    """Storage for cached values, grouped so that a whole group can be dropped at once"""
+    
+    def get(self, group: str, variant: str) -> Any:
+        """Return the cached value, or ``MISSING``"""
+        raise NotImplementedError
+    
+    def generation(self, group: str) -> Any:
+        """Token for the group's current generation, read before loading a value to ``set``"""
+        raise NotImplementedError
+    
+    def set(self, group: str, variant: str, value: Any, generation: Any):
+        """Store a value, unless the group has moved on from ``generation``"""
+        raise NotImplementedError
+    
+    def invalidate(self, group: str):
+        """Drop every variant cached for a group and move it on to a new generation"""
+        raise NotImplementedError
+    
+    def clear(self):
+        """Drop everything"""
+        raise NotImplementedError
+
+class NullCacheBackend(CacheBackend):
+    """Backend that never stores anything, so every read goes to the database"""
+    
+    def get(self, group: str, variant: str) -> Any:
+        return MISSING
+    
+    def generation(self, group: str) -> Any:
+        return None
+    
+    def set(self, group: str, variant: str, value: Any, generation: Any):
+        pass
+    
+    def invalidate(self, group: str):
+        pass
+    
+    def clear(self):
+        pass
+
+class MemoryCacheBackend(CacheBackend):
+    """Thread-safe in-process LRU whose entries also expire after ``ttl`` seconds
+    
+    Generations are ticks of one counter. The tick at which each group was
+    last invalidated is kept for the ``max_entries`` most recent invalidations;
+    older ones are folded into a floor that every generation is checked
+    against, which at worst skips caching a value that was still fresh.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._groups: Dict[str, Set[str]] = {}
+        self._clock = 0
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()
+        self._floor = 0
+        self._lock = threading.Lock()
+    
+    def get(self, group: str, variant: str) -> Any:
+        key = (group, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+    
+    def generation(self, group: str) -> Any:
+        with self._lock:
+            return self._clock
+    
+    def set(self, group: str, variant: str, value: Any, generation: Any):
+        key = (group, variant)
+        with self._lock:
+            if max(self._floor, self._invalidated.get(group, 0)) > generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self._groups.setdefault(group, set()).add(variant)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+    
+    def invalidate(self, group: str):
+        with self._lock:
+            for variant in self._groups.pop(group, ()):
+                self._entries.pop((group, variant), None)
+            self._clock += 1
+            self._invalidated[group] = self._clock
+            self._invalidated.move_to_end(group)
+            while len(self._invalidated) > self.max_entries:
+                _, self._floor = self._invalidated.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._clock += 1
+            self._invalidated.clear()
+            self._floor = self._clock
+    
+    def _discard(self, key: Tuple[str, str]):
+        group, variant = key
+        self._entries.pop(key, None)
+        variants = self._groups.get(group)
+        if variants is not None:
+            variants.discard(variant)
+            if not variants:
+                del self._groups[group]
+
+class RedisCacheBackend(CacheBackend):
+    """Backend shared between workers, storing each group as one Redis hash
+    
+    A group's generation is a counter next to its hash, and values are
+    written in a transaction that watches it. Requires the optional ``redis``
+    package. Redis errors are logged and treated as misses, so an
+    unavailable cache slows reads down rather than failing them.
+    """
+    
+    KEY_PREFIX = "kanladin:cache:"
+    GENERATION_PREFIX = "kanladin:cache-generation:"
+    # Generation counters only need to outlive loads that started before they moved
+    GENERATION_TTL_SECONDS = 3600
+    
+    def __init__(self, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package to be installed") from e
+        self._errors = redis.RedisError
+        self._conflict = redis.WatchError
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+    
+    def _key(self, group: str) -> str:
+        return f"{self.KEY_PREFIX}{group}"
+    
+    def _generation_key(self, group: str) -> str:
+        return f"{self.GENERATION_PREFIX}{group}"
+    
+    def get(self, group: str, variant: str) -> Any:
+        try:
+            raw = self._redis.hget(self._key(group), variant)
+        except self._errors as e:
+            logger.warning(f"Cache read failed for {group}: {str(e)}")
+            return MISSING
+        if raw is None:
+            return MISSING
+        return pickle.loads(raw)
+    
+    def generation(self, group: str) -> Any:
+        try:
+            return self._redis.get(self._generation_key(group))
+        except self._errors as e:
+            logger.warning(f"Cache generation read failed for {group}: {str(e)}")
+            # Matches no stored generation, so the loaded value isn't cached
+            return object()
+    
+    def set(self, group: str, variant: str, value: Any, generation: Any):
+        generation_key = self._generation_key(group)
+        try:
+            with self._redis.pipeline() as pipeline:
+                pipeline.watch(generation_key)
+                if pipeline.get(generation_key) != generation:
+                    return
+                pipeline.multi()
+                pipeline.hset(self._key(group), variant, pickle.dumps(value))
+                pipeline.expire(self._key(group), int(self.ttl) or 1)
+                pipeline.execute()
+        except self._conflict:
+            # The group was invalidated while the value was being written
+            pass
+        except self._errors as e:
+            logger.warning(f"Cache write failed for {group}: {str(e)}")
+    
+    def invalidate(self, group: str):
+        generation_key = self._generation_key(group)
+        try:
+            pipeline = self._redis.pipeline()
+            pipeline.delete(self._key(group))
+            pipeline.incr(generation_key)
+            pipeline.expire(generation_key, self.GENERATION_TTL_SECONDS)
+            pipeline.execute()
+        except self._errors as e:
+            # Other workers keep serving the stale group until its TTL runs out
+            logger.error(f"Cache invalidation failed for {group}: {str(e)}")
+    
+    def clear(self):
+        try:
+            for key in self._redis.scan_iter(match=f"{self.KEY_PREFIX}*"):
+                self._redis.delete(key)
+        except self._errors as e:
+            logger.error(f"Cache clear failed: {str(e)}")
+
+class ReadThroughCache:
+    """Cache front end that loads missing entries and counts hits and misses"""
+    
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+    
+    def get_or_load(self, group: str, variant: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached value, calling ``loader`` and caching its result on a miss
+        
+        The result isn't cached if the group is invalidated while it loads.
+        """
+        value = self.peek(group, variant)
+        if value is MISSING:
+            generation = self.backend.generation(group)
+            value = loader()
+            self.backend.set(group, variant, value, generation)
+        return value
+    
+    def peek(self, group: str, variant: str) -> Any:
+        """Return the cached value or ``MISSING``, counting the lookup"""
+        value = self.backend.get(group, variant)
+        with self._lock:
+            if value is MISSING:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+    
+    def generation(self, group: str) -> Any:
+        """Token to read before loading a value some other way, and to pass to ``put``"""
+        return self.backend.generation(group)
+    
+    def put(self, group: str, variant: str, value: Any, generation: Any):
+        """Store a value that was loaded some other way, unless the group was invalidated since ``generation``"""
+        self.backend.set(group, variant, value, generation)
+    
+    def invalidate(self, groups: Iterable[str]):
+        """Drop every entry in the given groups"""
+        for group in set(groups):
+            self.backend.invalidate(group)
+            with self._lock:
+                self._invalidations += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters since the process started"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hitRate": self._hits / lookups if lookups else 0.0,
+                "invalidations": self._invalidations
+            }
+
+def board_group(board_id: str) -> str:
+    """Cache group for reads scoped to a board, such as its columns"""
+    return f"board:{board_id}"
+
+def column_group(column_id: str) -> str:
+    """Cache group for reads scoped to a column, such as its cards"""
+    return f"column:{column_id}"
+
+def cache_variant(kind: str, attributes: Optional[Iterable[str]] = None) -> str:
+    """Name an entry within a group by what was read and which attributes were projected"""
+    if attributes is None:
+        return f"{kind}:*"
+    return f"{kind}:{','.join(attributes)}"
+
+def invalidate_boards(*board_ids: str):
+    """Drop cached reads for the given boards"""
+    cache.invalidate(board_group(board_id) for board_id in board_ids if board_id)
+
+def invalidate_columns(*column_ids: str):
+    """Drop cached reads for the given columns"""
+    cache.invalidate(column_group(column_id) for column_id in column_ids if column_id)
+
+def create_cache_backend() -> CacheBackend:
+    """Build the backend selected by ``CACHE_BACKEND``"""
+    backend = settings.CACHE_BACKEND
+    if backend == "memory":
+        return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    if backend == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL, settings.CACHE_TTL_SECONDS)
+    if backend == "none":
+        return NullCacheBackend()
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+cache = ReadThroughCache(create_cache_backend())
@@ -20,17 +20,99 @@ class Settings(BaseSettings):
     CORS_ALLOW_METHODS: List[str] = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     CORS_ALLOW_HEADERS: List[str] = ["Content-Type", "Authorization", "Accept"]
     
+    # Storage engine: "dynamodb" or "memory" (in-process, for tests and load-test baselines)
+    STORAGE_ENGINE: str = os.getenv("STORAGE_ENGINE", "dynamodb")
+    
     # DynamoDB settings
     DYNAMODB_ENDPOINT_URL: str = os.getenv("DYNAMODB_ENDPOINT_URL", "http://dynamodb-local:8000")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
     
+    # DynamoDB connection settings; each resolver thread has its own client and connection pool
+    DYNAMODB_MAX_POOL_CONNECTIONS: int = int(os.getenv("DYNAMODB_MAX_POOL_CONNECTIONS", "50"))
+    DYNAMODB_TCP_KEEPALIVE: bool = os.getenv("DYNAMODB_TCP_KEEPALIVE", "true").lower() in ("true", "1", "t")
+    DYNAMODB_CONNECT_TIMEOUT: float = float(os.getenv("DYNAMODB_CONNECT_TIMEOUT", "2"))
+    DYNAMODB_READ_TIMEOUT: float = float(os.getenv("DYNAMODB_READ_TIMEOUT", "5"))
+    DYNAMODB_RETRY_MODE: str = os.getenv("DYNAMODB_RETRY_MODE", "standard")
+    DYNAMODB_MAX_ATTEMPTS: int = int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "5"))
+    
     # DynamoDB table names
     DYNAMODB_BOARDS_TABLE: str = os.getenv("DYNAMODB_BOARDS_TABLE", "boards")
     DYNAMODB_COLUMNS_TABLE: str = os.getenv("DYNAMODB_COLUMNS_TABLE", "columns")
     DYNAMODB_CARDS_TABLE: str = os.getenv("DYNAMODB_CARDS_TABLE", "cards")
     
+    # DynamoDB storage layout: "multi_table" (one table per entity) or "single_table"
+    DYNAMODB_STORAGE_LAYOUT: str = os.getenv("DYNAMODB_STORAGE_LAYOUT", "multi_table")
+    DYNAMODB_SINGLE_TABLE: str = os.getenv("DYNAMODB_SINGLE_TABLE", "kanladin")
+    DYNAMODB_SINGLE_TABLE_ID_INDEX: str = os.getenv("DYNAMODB_SINGLE_TABLE_ID_INDEX", "id-index")
+    DYNAMODB_SINGLE_TABLE_BOARD_INDEX: str = os.getenv("DYNAMODB_SINGLE_TABLE_BOARD_INDEX", "boardList-id-index")
+    
+    # DynamoDB secondary index names
+    DYNAMODB_COLUMNS_BY_BOARD_INDEX: str = os.getenv("DYNAMODB_COLUMNS_BY_BOARD_INDEX", "boardId-position-index")
+    DYNAMODB_CARDS_BY_COLUMN_INDEX: str = os.getenv("DYNAMODB_CARDS_BY_COLUMN_INDEX", "columnId-position-index")
+    
+    # DynamoDB batch operation settings
+    DYNAMODB_BATCH_MAX_RETRIES: int = int(os.getenv("DYNAMODB_BATCH_MAX_RETRIES", "8"))
+    DYNAMODB_BATCH_BACKOFF_BASE: float = float(os.getenv("DYNAMODB_BATCH_BACKOFF_BASE", "0.05"))
+    DYNAMODB_BATCH_BACKOFF_MAX: float = float(os.getenv("DYNAMODB_BATCH_BACKOFF_MAX", "2.0"))
+    
+    # Resolver execution settings
+    RESOLVER_MAX_WORKERS: int = int(os.getenv("RESOLVER_MAX_WORKERS", "32"))
+    
+    # Position keys longer than this get their column or board respread in the background
+    POSITION_REBALANCE_LENGTH: int = int(os.getenv("POSITION_REBALANCE_LENGTH", "24"))
+    
+    # Background work (cascading deletes, rebalances) runs on its own pool of this many threads
+    BACKGROUND_MAX_WORKERS: int = int(os.getenv("BACKGROUND_MAX_WORKERS", "4"))
+    
+    # Background job settings: cascading deletes remove children this many at a time
+    CASCADE_DELETE_CHUNK_SIZE: int = int(os.getenv("CASCADE_DELETE_CHUNK_SIZE", "500"))
+    JOB_HISTORY_SIZE: int = int(os.getenv("JOB_HISTORY_SIZE", "100"))
+    
+    # Bulk card mutations (createCards, updateCards, deleteCards) accept at most this many items
+    BULK_MUTATION_MAX_ITEMS: int = int(os.getenv("BULK_MUTATION_MAX_ITEMS", "100"))
+    
+    # Board export reads and import writes are done this many items at a time
+    TRANSFER_BATCH_SIZE: int = int(os.getenv("TRANSFER_BATCH_SIZE", "500"))
+    
+    # GraphQL query limits: operations deeper or costlier than these are rejected before they run.
+    # Weights and list sizes are keyed by "Type.field"; unlisted object fields weigh 1 and scalars 0
+    GRAPHQL_MAX_DEPTH: int = int(os.getenv("GRAPHQL_MAX_DEPTH", "10"))
+    GRAPHQL_MAX_COST: int = int(os.getenv("GRAPHQL_MAX_COST", "25000"))
+    GRAPHQL_DEFAULT_LIST_SIZE: int = int(os.getenv("GRAPHQL_DEFAULT_LIST_SIZE", "20"))
+    GRAPHQL_LIST_SIZES: Dict[str, int] = json.loads(os.getenv(
+        "GRAPHQL_LIST_SIZES",
+        '{"Query.boards": 20, "Query.columns": 100, "Query.cards": 500, "BoardType.columns": 10, "ColumnType.cards": 50}'
+    ))
+    GRAPHQL_FIELD_WEIGHTS: Dict[str, int] = json.loads(os.getenv("GRAPHQL_FIELD_WEIGHTS", "{}"))
+    
+    # Connection fields return `first` items per page: this many when it is left out, and never more than the maximum
+    GRAPHQL_DEFAULT_PAGE_SIZE: int = int(os.getenv("GRAPHQL_DEFAULT_PAGE_SIZE", "50"))
+    GRAPHQL_MAX_PAGE_SIZE: int = int(os.getenv("GRAPHQL_MAX_PAGE_SIZE", "500"))
+    
+    # Parsed and validated GraphQL documents are cached by query text
+    GRAPHQL_DOCUMENT_CACHE_SIZE: int = int(os.getenv("GRAPHQL_DOCUMENT_CACHE_SIZE", "500"))
+    GRAPHQL_DOCUMENT_CACHE_MAX_QUERY_LENGTH: int = int(os.getenv("GRAPHQL_DOCUMENT_CACHE_MAX_QUERY_LENGTH", "20000"))
+    
+    # Persisted queries: "auto" (clients register documents by hash), "allowlist" (only the documents
+    # in the allowlist file, a JSON object of SHA-256 hash to document, may run) or "off"
+    GRAPHQL_PERSISTED_QUERIES: str = os.getenv("GRAPHQL_PERSISTED_QUERIES", "auto")
+    GRAPHQL_PERSISTED_QUERY_CACHE_SIZE: int = int(os.getenv("GRAPHQL_PERSISTED_QUERY_CACHE_SIZE", "1000"))
+    GRAPHQL_PERSISTED_QUERY_ALLOWLIST: str = os.getenv("GRAPHQL_PERSISTED_QUERY_ALLOWLIST", "")
+    
+    # Read cache settings: CACHE_BACKEND is "memory", "redis" or "none"
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    
+    # Live updates: SUBSCRIPTION_BROKER is "memory" (subscribers of this process only) or "redis"
+    # (subscribers of every worker). Subscribers more than SUBSCRIPTION_QUEUE_SIZE messages behind are resynced
+    SUBSCRIPTION_BROKER: str = os.getenv("SUBSCRIPTION_BROKER", "memory")
+    SUBSCRIPTION_QUEUE_SIZE: int = int(os.getenv("SUBSCRIPTION_QUEUE_SIZE", "100"))
+    SUBSCRIPTION_REDIS_URL: str = os.getenv("SUBSCRIPTION_REDIS_URL", os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    
     # Logging settings
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
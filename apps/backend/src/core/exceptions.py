@@ -1,5 +1,7 @@
 """Custom exceptions for the application"""
 
+from typing import List, Optional
+
 class KanladinException(Exception):
     """Base exception for all application exceptions"""
     def __init__(self, message: str = "An error occurred"):
@@ -33,6 +35,12 @@ class DatabaseException(KanladinException):
         super().__init__(message)
 
 
+class ConditionFailedException(DatabaseException):
+    """Exception raised when a conditional write finds the item in an unexpected state"""
+    def __init__(self, operation: str, details: str = ""):
+        super().__init__(operation, details)
+
+
 class ConflictException(KanladinException):
     """Exception raised when a resource already exists"""
     def __init__(self, resource_type: str, identifier: str):
@@ -40,3 +48,40 @@ class ConflictException(KanladinException):
         self.identifier = identifier
         message = f"{resource_type} with identifier '{identifier}' already exists"
         super().__init__(message)
+
+
+class ConcurrentModificationException(KanladinException):
+    """Exception raised when a write is rejected because the data changed since it was read
+    
+    For a cancelled transaction, ``reasons`` holds the cancellation reason
+    code of each operation in turn.
+    """
+    def __init__(self, resource_type: str, details: str = "", reasons: Optional[List[str]] = None):
+        self.resource_type = resource_type
+        self.details = details
+        self.reasons = reasons
+        message = f"{resource_type} was modified by another request"
+        if details:
+            message += f": {details}"
+        super().__init__(message)
+
+
+class QueryComplexityException(KanladinException):
+    """Exception raised when a GraphQL operation is too deep or too costly to run"""
+    def __init__(self, cost: int, depth: int, max_cost: int, max_depth: int):
+        self.cost = cost
+        self.depth = depth
+        self.max_cost = max_cost
+        self.max_depth = max_depth
+        if depth > max_depth:
+            message = f"Query depth {depth} exceeds the limit of {max_depth}"
+        else:
+            message = f"Query cost {cost} exceeds the limit of {max_cost}"
+        super().__init__(message)
+
+
+class PersistedQueryException(KanladinException):
+    """Exception raised when a persisted query can't be found or isn't allowed to run"""
+    def __init__(self, message: str, code: str):
+        self.code = code
+        super().__init__(message)
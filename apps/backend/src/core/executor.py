@@ -0,0 +1,60 @@
+"""Bounded thread pools for running blocking DynamoDB work off the event loop
+
+Resolvers run on one pool and background work on another, smaller one, so
+a burst of cascading deletes or rebalances can't hold up requests.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial, wraps
+from typing import Any, Callable
+from src.core.config import settings
+import asyncio
+import contextvars
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Each thread builds its own DynamoDB client, so this only bounds how many reads and writes run at once
+_executor = ThreadPoolExecutor(
+    max_workers=settings.RESOLVER_MAX_WORKERS,
+    thread_name_prefix="resolver"
+)
+
+# Small, so background work never takes more than a few DynamoDB connections
+_background_executor = ThreadPoolExecutor(
+    max_workers=settings.BACKGROUND_MAX_WORKERS,
+    thread_name_prefix="background"
+)
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking callable on the resolver pool and await its result"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, partial(context.run, func, *args, **kwargs))
+
+def non_blocking(resolver: Callable[..., Any]) -> Callable[..., Any]:
+    """Turn a synchronous resolver or mutate method into an awaitable that runs on the resolver pool"""
+    @wraps(resolver)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(resolver, *args, **kwargs)
+    return wrapper
+
+def run_in_background(func: Callable[..., Any], *args, **kwargs) -> Future:
+    """Start blocking housekeeping work on the background pool without waiting for it, logging any failure"""
+    future = _background_executor.submit(func, *args, **kwargs)
+    future.add_done_callback(_log_background_failure)
+    return future
+
+def _log_background_failure(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Background task failed", exc_info=future.exception())
+
+def shutdown_executor():
+    """Stop accepting work, drop queued background work and wait for in-flight resolvers to finish
+    
+    Queued background work is cancelled, and work that is already running
+    isn't waited for here.
+    """
+    logger.info("Shutting down resolver and background executors")
+    _background_executor.shutdown(wait=False, cancel_futures=True)
+    _executor.shutdown(wait=True)
@@ -0,0 +1,89 @@
+"""Background jobs whose progress can be queried while they run
+
+Long bulk work such as cascading deletes runs on the background pool after
+the request that started it has returned. Each job is kept in an in-process
+registry, so its status can be read by ID until it ages out of the history.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from src.core.config import settings
+from src.core.executor import run_in_background
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+
+class Job:
+    """One background job and how far it has got"""
+    
+    def __init__(self, id: str, kind: str, target_id: str):
+        self.id = id
+        self.kind = kind
+        self.target_id = target_id
+        self.status = PENDING
+        self.processed = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+    
+    def advance(self, count: int):
+        """Record that ``count`` more items were processed"""
+        self.processed += count
+
+class JobRegistry:
+    """Thread-safe registry of recent jobs, keeping at most ``history_size`` finished ones"""
+    
+    def __init__(self, history_size: int):
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def start(self, kind: str, target_id: str, work: Callable[[Job], None]) -> Job:
+        """Register a job and run ``work(job)`` in the background"""
+        job = Job(f"job-{uuid.uuid4().hex[:8]}", kind, target_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        run_in_background(self._run, job, work)
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID, or None if it is unknown or has aged out"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def _run(self, job: Job, work: Callable[[Job], None]):
+        job.status = RUNNING
+        logger.info(f"Started {job.kind} job {job.id} for {job.target_id}")
+        try:
+            work(job)
+            job.status = SUCCEEDED
+            logger.info(f"Finished {job.kind} job {job.id}: {job.processed} items processed")
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            raise
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            with self._lock:
+                self._prune()
+    
+    def _prune(self):
+        # Running jobs are never dropped, however many there are
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history_size)]:
+            del self._jobs[job_id]
+
+jobs = JobRegistry(settings.JOB_HISTORY_SIZE)
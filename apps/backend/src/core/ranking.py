@@ -0,0 +1,203 @@
+"""Fractional position keys for ordering cards and columns
+
+A position is a string of base-36 digits read as the fraction after a
+decimal point, so ``"h"`` sits at 17/36 and plain string comparison gives
+the display order. A key can always be generated between two neighbours,
+which lets a moved item be written on its own without renumbering the rest
+of its column or board. Keys never end in ``"0"``, which keeps string order
+and numeric order the same.
+
+Keys grow by a digit every 35 appends or prepends, and every five or so
+inserts at the same spot in the middle of a list; ``needs_rebalance`` tells
+callers when to respread a list with ``spread_positions``.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from src.core.config import settings
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+def _digit(key: str, index: int) -> int:
+    return DIGITS.index(key[index])
+
+def position_between(before: Optional[str], after: Optional[str]) -> str:
+    """Generate a key that sorts strictly between ``before`` and ``after``
+    
+    ``None`` stands for the start or the end of the list. Raises
+    ``ValueError`` if ``before`` does not sort before ``after``.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Cannot place a position between '{before}' and '{after}'")
+    # Appending and prepending step one digit at a time instead of halving the gap,
+    # so keys for the common "add to the end" case grow slowly
+    appending = after is None and before is not None
+    prepending = before is None and after is not None
+    before = before or ""
+    
+    result = []
+    index = 0
+    while True:
+        low = _digit(before, index) if index < len(before) else 0
+        high = _digit(after, index) if after is not None and index < len(after) else BASE
+        if low == high:
+            result.append(DIGITS[low])
+            index += 1
+            continue
+        if appending and low + 1 < high:
+            result.append(DIGITS[low + 1])
+            return "".join(result)
+        if prepending and high - 1 > low:
+            result.append(DIGITS[high - 1])
+            return "".join(result)
+        middle = (low + high) // 2
+        if middle > low:
+            result.append(DIGITS[middle])
+            return "".join(result)
+        # The digits are adjacent, so keep the lower one; anything longer
+        # than ``before`` from here on is already below ``after``
+        result.append(DIGITS[low])
+        after = None
+        index += 1
+
+def position_at(positions: Sequence[str], index: int) -> str:
+    """Generate a key that places an item at ``index`` among sorted ``positions``"""
+    before = positions[index - 1] if index > 0 else None
+    after = positions[index] if index < len(positions) else None
+    return position_between(before, after)
+
+def spread_positions(count: int) -> List[str]:
+    """``count`` evenly spaced, short keys in increasing order"""
+    # Use the fewest digits that still leave a gap of at least two between keys
+    width = 1
+    while BASE ** width < (count + 1) * 2:
+        width += 1
+    keys = []
+    for index in range(1, count + 1):
+        value = index * BASE ** width // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, remainder = divmod(value, BASE)
+            digits.append(DIGITS[remainder])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+def rebalance_plan(positions: Sequence[Optional[str]]) -> List[Tuple[int, str]]:
+    """The items of a sorted list to respread, as (index, new key) pairs in a safe write order
+    
+    Items whose key comes down are listed first, from the start of the list,
+    then items whose key goes up, from its end. Writing them one at a time in
+    that order keeps the list sorted after every write, so a rebalance split
+    across several transactions never shows items out of order.
+    """
+    targets = spread_positions(len(positions))
+    down = [(index, key) for index, key in enumerate(targets) if positions[index] is None or key < positions[index]]
+    up = [(index, key) for index, key in enumerate(targets) if positions[index] is not None and key > positions[index]]
+    return down + list(reversed(up))
+
+def positions_between(before: Optional[str], after: Optional[str], count: int) -> List[str]:
+    """``count`` increasing keys between ``before`` and ``after``, for inserting a run of items at once
+    
+    The gap is bisected rather than stepped through, so the keys stay short
+    however many items are inserted.
+    """
+    if count <= 0:
+        return []
+    if before is None and after is None:
+        return spread_positions(count)
+    middle = count // 2
+    key = position_between(before, after)
+    return positions_between(before, key, middle) + [key] + positions_between(key, after, count - middle - 1)
+
+def positions_for_inserts(positions: Sequence[str], orders: Sequence[Optional[int]]) -> List[Tuple[str, int]]:
+    """Keys and final indexes for new items inserted among sorted ``positions``
+    
+    Items are inserted in turn, each at its order clamped to the list as it
+    has grown so far, or at the end when its order is None. Every run of new
+    items between two existing ones is then given keys in one pass. Raises
+    ``ValueError`` if existing neighbours of a run share a position.
+    """
+    # Existing items are kept as their position, new ones as None with their index in ``orders``
+    sequence: List[Tuple[Optional[str], int]] = [(position, -1) for position in positions]
+    for item, order in enumerate(orders):
+        index = len(sequence) if order is None else max(0, min(order, len(sequence)))
+        sequence.insert(index, (None, item))
+    
+    placed: List[Tuple[str, int]] = [None] * len(orders)
+    run: List[Tuple[int, int]] = []
+    before = None
+    for index, (position, item) in enumerate(sequence + [(None, -1)]):
+        if position is None and item >= 0:
+            run.append((item, index))
+            continue
+        # An existing item, or the end of the list, closes the run
+        for (run_item, run_index), key in zip(run, positions_between(before, position, len(run))):
+            placed[run_item] = (key, run_index)
+        run = []
+        before = position
+    return placed
+
+def is_position(value: Any) -> bool:
+    """Whether a value is a well-formed key: a non-empty string of ``DIGITS`` that doesn't end in ``"0"``"""
+    return (isinstance(value, str) and value != "" and not value.endswith(DIGITS[0])
+            and all(digit in DIGITS for digit in value))
+
+def needs_rebalance(position: Optional[str]) -> bool:
+    """Whether a key has grown long enough that its list should be respread"""
+    return position is not None and len(position) > settings.POSITION_REBALANCE_LENGTH
+
+def number_by_position(items: List[Any], parent: Callable[[Any], Optional[str]] = lambda item: None) -> List[Any]:
+    """Sort items by position and set each one's ``order`` to its index within its parent"""
+    ordered = sorted(items, key=lambda item: (parent(item) or "", item.position or ""))
+    counts: Dict[Optional[str], int] = {}
+    for item in ordered:
+        item.order = counts.get(parent(item), 0)
+        counts[parent(item)] = item.order + 1
+    return ordered
+
+def positions_for_order(current: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """New positions that put items in the order given, moving as few as possible
+    
+    ``current`` holds the items' present positions in their desired order.
+    The longest run that is already in increasing order keeps its keys (the
+    result holds ``None`` for those); every other item gets a key between its
+    new neighbours.
+    """
+    keep = set(_increasing_run(current))
+    result: List[Optional[str]] = []
+    previous = None
+    for index, position in enumerate(current):
+        if index in keep:
+            result.append(None)
+            previous = position
+            continue
+        following = next((current[later] for later in range(index + 1, len(current)) if later in keep), None)
+        previous = position_between(previous, following)
+        result.append(previous)
+    return result
+
+def _increasing_run(positions: Sequence[Optional[str]]) -> List[int]:
+    """Indexes of a longest strictly increasing subsequence of ``positions``"""
+    tails: List[int] = []
+    parents: List[Optional[int]] = [None] * len(positions)
+    for index, position in enumerate(positions):
+        if position is None:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if positions[tails[middle]] < position:
+                low = middle + 1
+            else:
+                high = middle
+        parents[index] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(index)
+        else:
+            tails[low] = index
+    run = []
+    index = tails[-1] if tails else None
+    while index is not None:
+        run.append(index)
+        index = parents[index]
+    return list(reversed(run))
@@ -0,0 +1,127 @@
+"""Per-board data versions for HTTP caching
+
+Every write to a board, its columns or its cards bumps the board's version,
+and every write at all bumps the ``ALL_BOARDS`` version that reads spanning
+boards depend on. GraphQL responses to GET requests carry an ETag built from
+the versions they were read at, so an unchanged board can be answered with
+304 Not Modified. Writes drop their cached reads before bumping, and the read
+cache never stores a value that raced with a drop, so a read at a new version
+can't be answered from data older than it; a response is only tagged if its
+versions didn't move while it ran.
+
+Versions live where the read cache does: in process memory, or in Redis when
+``CACHE_BACKEND=redis`` so that every worker sees every bump. A version that
+is lost (a restart, a Redis flush) starts again from a random value, so an
+old ETag never matches newer data. Memory versions can't see writes made by
+other workers or scripts, so they also change every ``CACHE_TTL_SECONDS``,
+which makes a 304 no staler than the read cache; with caching off, no ETag
+ever matches.
+"""
+
+from typing import Dict, Iterable, List
+from src.core.config import settings
+import logging
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ALL_BOARDS = "boards"
+
+def board_version_key(board_id: str) -> str:
+    """Version key for everything stored under a board"""
+    return f"board:{board_id}"
+
+class VersionStore:
+    """Interface for version stores"""
+    
+    def get(self, keys: Iterable[str]) -> List[str]:
+        """Current versions of the given keys, in order"""
+        raise NotImplementedError
+    
+    def bump(self, keys: Iterable[str]):
+        """Move the given keys on to new versions"""
+        raise NotImplementedError
+
+class MemoryVersionStore(VersionStore):
+    """Thread-safe versions kept in this process, prefixed by a per-process epoch
+    
+    Every version also moves on when a ``ttl``-second window ends. With a
+    ``ttl`` of zero every read gets a random version, so nothing is answered
+    with 304.
+    """
+    
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._epoch = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, keys: Iterable[str]) -> List[str]:
+        if self._ttl <= 0:
+            return [secrets.token_hex(8) for _ in keys]
+        window = int(time.time() // self._ttl)
+        with self._lock:
+            return [f"{self._epoch}.{window}.{self._versions.get(key, 0)}" for key in keys]
+    
+    def bump(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+class RedisVersionStore(VersionStore):
+    """Versions shared between workers as Redis counters
+    
+    Requires the optional ``redis`` package. When Redis can't be reached,
+    reads get a random version, so responses are sent in full rather than
+    risking a stale 304.
+    """
+    
+    KEY_PREFIX = "kanladin:version:"
+    
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package to be installed") from e
+        self._errors = redis.RedisError
+        self._redis = redis.Redis.from_url(url)
+    
+    def get(self, keys: Iterable[str]) -> List[str]:
+        keys = [f"{self.KEY_PREFIX}{key}" for key in keys]
+        try:
+            pipeline = self._redis.pipeline()
+            for key in keys:
+                # Counters that don't exist yet start at a random value
+                pipeline.set(key, secrets.randbits(48), nx=True)
+            pipeline.mget(keys)
+            values = pipeline.execute()[-1]
+            return [value.decode() for value in values]
+        except self._errors as e:
+            logger.warning(f"Version read failed: {str(e)}")
+            return [secrets.token_hex(8) for _ in keys]
+    
+    def bump(self, keys: Iterable[str]):
+        try:
+            pipeline = self._redis.pipeline()
+            for key in keys:
+                pipeline.set(f"{self.KEY_PREFIX}{key}", secrets.randbits(48), nx=True)
+                pipeline.incr(f"{self.KEY_PREFIX}{key}")
+            pipeline.execute()
+        except self._errors as e:
+            # Other workers may answer 304 for this board until its next successful bump
+            logger.error(f"Version bump failed: {str(e)}")
+
+def create_version_store() -> VersionStore:
+    """Build the store that matches ``CACHE_BACKEND``"""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisVersionStore(settings.CACHE_REDIS_URL)
+    # Without a shared store, a 304 is allowed to be as stale as a cached read and no staler
+    return MemoryVersionStore(settings.CACHE_TTL_SECONDS if settings.CACHE_BACKEND == "memory" else 0)
+
+versions = create_version_store()
+
+def bump_boards(*board_ids: str):
+    """Record a write to the given boards, and to the set of boards as a whole"""
+    versions.bump([ALL_BOARDS, *(board_version_key(board_id) for board_id in set(board_ids) if board_id)])
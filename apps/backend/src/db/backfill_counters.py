@@ -0,0 +1,36 @@
+"""Recount the card and column counters kept on boards and columns
+
+Run with ``python -m src.db.backfill_counters`` once after deploying the
+counters, and again whenever they are suspected to have drifted. Counts are
+taken from the stored cards and columns and overwrite the counters, so writes
+made while it runs can leave a counter off by those writes; run it when the
+board is quiet.
+"""
+
+from src.db.repositories.registry import BoardRepository, ColumnRepository, CardRepository
+from src.core.versions import bump_boards
+import logging
+
+logger = logging.getLogger(__name__)
+
+def backfill_counters() -> int:
+    """Rewrite every board's and column's counters, returning how many boards were recounted"""
+    recounted = 0
+    for board in BoardRepository.iter_all():
+        columns = ColumnRepository.get_by_board_id(board.id, attributes=["boardId", "id", "position"])
+        card_count = 0
+        for column in columns:
+            # Counting needs only the attributes that place each card
+            count = len(CardRepository.get_by_column_id(column.id, attributes=["columnId", "id", "position"]))
+            ColumnRepository.patch(column.id, card_count=count)
+            card_count += count
+        BoardRepository.patch(board.id, column_count=len(columns), card_count=card_count)
+        # Cached responses hold the old counts
+        bump_boards(board.id)
+        recounted += 1
+    logger.info(f"Recounted counters on {recounted} boards")
+    return recounted
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    backfill_counters()
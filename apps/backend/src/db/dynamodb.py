@@ -1,25 +1,88 @@
 import boto3
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from src.core.config import settings
-from src.core.exceptions import DatabaseException, NotFoundException
-from typing import Dict, Any, List, Optional
+from src.db.engine import StorageEngine, BATCH_GET_LIMIT, BATCH_WRITE_LIMIT, TRANSACT_WRITE_LIMIT, KEY_LOOKUP_LIMIT
+from src.core.exceptions import (
+    DatabaseException,
+    NotFoundException,
+    ConcurrentModificationException,
+    ConditionFailedException
+)
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 import logging
+import random
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-class DynamoDBClient:
+def build_client_config() -> Config:
+    """Build the botocore connection pool, timeout and retry configuration from settings"""
+    return Config(
+        max_pool_connections=settings.DYNAMODB_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=settings.DYNAMODB_TCP_KEEPALIVE,
+        connect_timeout=settings.DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=settings.DYNAMODB_READ_TIMEOUT,
+        retries={
+            'mode': settings.DYNAMODB_RETRY_MODE,
+            'max_attempts': settings.DYNAMODB_MAX_ATTEMPTS
+        }
+    )
+
+def projection_args(attributes: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Request arguments that limit a read to the given attributes
+    
+    Every name goes through a placeholder, so reserved words such as
+    ``order`` can be projected. Returns no arguments when ``attributes`` is
+    None, which reads whole items.
+    """
+    if attributes is None:
+        return {}
+    names = {f"#p{index}": name for index, name in enumerate(attributes)}
+    return {
+        'ProjectionExpression': ", ".join(names),
+        'ExpressionAttributeNames': names
+    }
+
+class DynamoDBClient(StorageEngine):
     """Client for interacting with DynamoDB Local"""
     
     def __init__(self):
         """Initialize the DynamoDB client"""
-        self.client = boto3.resource(
-            'dynamodb',
-            endpoint_url=settings.DYNAMODB_ENDPOINT_URL,
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
-        self.tables = {}
+        self._local = threading.local()
+    
+    @property
+    def client(self):
+        """The DynamoDB resource for the calling thread
+        
+        Each thread builds its resource from a session of its own. A resource
+        registers its serialization and condition-building handlers on its
+        low-level client under fixed IDs, so resources sharing one client
+        would all share the first one's handlers, which aren't thread-safe.
+        """
+        resource = getattr(self._local, 'resource', None)
+        if resource is None:
+            session = boto3.session.Session(
+                region_name=settings.AWS_REGION,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+            )
+            resource = session.resource(
+                'dynamodb',
+                endpoint_url=settings.DYNAMODB_ENDPOINT_URL,
+                config=build_client_config()
+            )
+            self._local.resource = resource
+        return resource
+    
+    @property
+    def tables(self) -> Dict[str, Any]:
+        """Table resources cached for the calling thread"""
+        if not hasattr(self._local, 'tables'):
+            self._local.tables = {}
+        return self._local.tables
     
     def get_table(self, table_name: str):
         """Get a DynamoDB table by name"""
@@ -28,12 +91,18 @@ class DynamoDBClient:
         return self.tables[table_name]
     
     def create_table_if_not_exists(self, table_name: str, key_schema: List[Dict[str, str]], 
-                                  attribute_definitions: List[Dict[str, str]]):
+                                  attribute_definitions: List[Dict[str, str]],
+                                  global_secondary_indexes: Optional[List[Dict[str, Any]]] = None):
         """Create a DynamoDB table if it doesn't exist"""
         try:
             # Check if table exists
-            self.client.meta.client.describe_table(TableName=table_name)
+            description = self.client.meta.client.describe_table(TableName=table_name)
             logger.info(f"Table {table_name} already exists")
+            # Tables created before the indexes were introduced need them added
+            if global_secondary_indexes:
+                self._ensure_global_secondary_indexes(
+                    table_name, description['Table'], attribute_definitions, global_secondary_indexes
+                )
             # Make sure the table is active and ready for use
             self.tables[table_name] = self.client.Table(table_name)
             return self.tables[table_name]
@@ -42,15 +111,18 @@ class DynamoDBClient:
                 try:
                     # Create the table
                     logger.info(f"Creating table {table_name}...")
-                    table = self.client.create_table(
-                        TableName=table_name,
-                        KeySchema=key_schema,
-                        AttributeDefinitions=attribute_definitions,
-                        ProvisionedThroughput={
+                    create_args = {
+                        'TableName': table_name,
+                        'KeySchema': key_schema,
+                        'AttributeDefinitions': attribute_definitions,
+                        'ProvisionedThroughput': {
                             'ReadCapacityUnits': 5,
                             'WriteCapacityUnits': 5
                         }
-                    )
+                    }
+                    if global_secondary_indexes:
+                        create_args['GlobalSecondaryIndexes'] = global_secondary_indexes
+                    table = self.client.create_table(**create_args)
                     # Wait for table to be created
                     logger.info(f"Waiting for table {table_name} to be created...")
                     table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
@@ -70,26 +142,77 @@ class DynamoDBClient:
         
         return self.get_table(table_name)
     
-    def put_item(self, table_name: str, item: Dict[str, Any]):
-        """Add an item to a DynamoDB table"""
+    def table_exists(self, table_name: str) -> bool:
+        """Check whether a table exists"""
+        try:
+            self.client.meta.client.describe_table(TableName=table_name)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                return False
+            raise DatabaseException("describe_table", str(e))
+    
+    def _ensure_global_secondary_indexes(self, table_name: str, table_description: Dict[str, Any],
+                                         attribute_definitions: List[Dict[str, str]],
+                                         global_secondary_indexes: List[Dict[str, Any]]):
+        """Add any missing global secondary indexes to an existing table"""
+        existing = {
+            index['IndexName'] for index in table_description.get('GlobalSecondaryIndexes', [])
+        }
+        for index in global_secondary_indexes:
+            if index['IndexName'] in existing:
+                continue
+            try:
+                # DynamoDB only accepts one index creation per update_table call
+                logger.info(f"Adding index {index['IndexName']} to table {table_name}...")
+                self.client.meta.client.update_table(
+                    TableName=table_name,
+                    AttributeDefinitions=attribute_definitions,
+                    GlobalSecondaryIndexUpdates=[{'Create': index}]
+                )
+                self._wait_for_index(table_name, index['IndexName'])
+                logger.info(f"Index {index['IndexName']} on table {table_name} is active")
+            except ClientError as e:
+                error_msg = f"Failed to add index {index['IndexName']} to {table_name}: {str(e)}"
+                logger.error(error_msg)
+                raise DatabaseException("create_index", error_msg) from e
+    
+    def _wait_for_index(self, table_name: str, index_name: str, delay: float = 1.0, max_attempts: int = 60):
+        """Block until a global secondary index has finished backfilling"""
+        for _ in range(max_attempts):
+            description = self.client.meta.client.describe_table(TableName=table_name)
+            for index in description['Table'].get('GlobalSecondaryIndexes', []):
+                if index['IndexName'] == index_name and index['IndexStatus'] == 'ACTIVE':
+                    return
+            time.sleep(delay)
+        raise DatabaseException("create_index", f"Index {index_name} on {table_name} did not become active")
+    
+    def put_item(self, table_name: str, item: Dict[str, Any], condition_expression=None):
+        """Add an item to a DynamoDB table, optionally only if a condition holds"""
         table = self.get_table(table_name)
+        put_args = {'Item': item}
+        if condition_expression is not None:
+            put_args['ConditionExpression'] = condition_expression
         try:
-            response = table.put_item(Item=item)
+            response = table.put_item(**put_args)
             return response
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
+            if error_code == 'ConditionalCheckFailedException':
+                raise ConditionFailedException("put_item", error_message)
             logger.error(f"Error putting item into {table_name}: {error_code} - {error_message}")
             raise DatabaseException("put_item", f"{error_code}: {error_message}")
         except Exception as e:
             logger.error(f"Unexpected error putting item into {table_name}: {str(e)}")
             raise DatabaseException("put_item", str(e))
     
-    def get_item(self, table_name: str, key: Dict[str, Any]):
-        """Get an item from a DynamoDB table"""
+    def get_item(self, table_name: str, key: Dict[str, Any],
+                 attributes: Optional[Iterable[str]] = None):
+        """Get an item from a DynamoDB table, optionally reading only some of its attributes"""
         table = self.get_table(table_name)
         try:
-            response = table.get_item(Key=key)
+            response = table.get_item(Key=key, **projection_args(attributes))
             return response.get('Item')
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -100,74 +223,301 @@ class DynamoDBClient:
             logger.error(f"Unexpected error getting item from {table_name}: {str(e)}")
             raise DatabaseException("get_item", str(e))
     
-    def query(self, table_name: str, key_condition_expression, expression_attribute_values):
-        """Query items from a DynamoDB table"""
-        table = self.get_table(table_name)
-        try:
-            response = table.query(
-                KeyConditionExpression=key_condition_expression,
-                ExpressionAttributeValues=expression_attribute_values
+    def batch_get_item(self, table_name: str, keys: List[Dict[str, Any]],
+                       attributes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Get many items by key in as few round trips as possible
+        
+        Keys are sent in chunks of ``BATCH_GET_LIMIT``; any ``UnprocessedKeys``
+        are retried with exponential backoff. Found items are returned in the
+        order their keys were requested, and missing items are left out.
+        ``attributes`` limits what is read; key attributes are always included.
+        """
+        if not keys:
+            return []
+        
+        key_names = list(keys[0].keys())
+        projection = {}
+        if attributes is not None:
+            projection = projection_args(key_names + [name for name in attributes if name not in key_names])
+        
+        def identity(item: Dict[str, Any]):
+            return tuple(item[name] for name in key_names)
+        
+        # A batch may not contain the same key twice
+        unique_keys = list({identity(key): key for key in keys}.values())
+        found = {}
+        
+        for start in range(0, len(unique_keys), BATCH_GET_LIMIT):
+            request_items = {table_name: {'Keys': unique_keys[start:start + BATCH_GET_LIMIT], **projection}}
+            attempt = 0
+            while request_items:
+                try:
+                    response = self.client.batch_get_item(RequestItems=request_items)
+                except ClientError as e:
+                    error_code = e.response['Error']['Code']
+                    error_message = e.response['Error']['Message']
+                    logger.error(f"Error batch getting items from {table_name}: {error_code} - {error_message}")
+                    raise DatabaseException("batch_get_item", f"{error_code}: {error_message}")
+                except Exception as e:
+                    logger.error(f"Unexpected error batch getting items from {table_name}: {str(e)}")
+                    raise DatabaseException("batch_get_item", str(e))
+                
+                for item in response.get('Responses', {}).get(table_name, []):
+                    found[identity(item)] = item
+                
+                request_items = response.get('UnprocessedKeys') or {}
+                if request_items:
+                    attempt += 1
+                    self._backoff("batch_get_item", table_name, attempt)
+        
+        return [found[identity(key)] for key in keys if identity(key) in found]
+    
+    def batch_write(self, table_name: str, put_items: Optional[List[Dict[str, Any]]] = None,
+                    delete_keys: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Put and delete many items with as few BatchWriteItem requests as possible
+        
+        Operations are flushed in groups of ``BATCH_WRITE_LIMIT`` and any
+        ``UnprocessedItems`` are retried with exponential backoff. Returns the
+        number of operations written.
+        """
+        requests = [{'PutRequest': {'Item': item}} for item in put_items or []]
+        requests += [{'DeleteRequest': {'Key': key}} for key in delete_keys or []]
+        
+        for start in range(0, len(requests), BATCH_WRITE_LIMIT):
+            request_items = {table_name: requests[start:start + BATCH_WRITE_LIMIT]}
+            attempt = 0
+            while request_items:
+                try:
+                    response = self.client.batch_write_item(RequestItems=request_items)
+                except ClientError as e:
+                    error_code = e.response['Error']['Code']
+                    error_message = e.response['Error']['Message']
+                    logger.error(f"Error batch writing items to {table_name}: {error_code} - {error_message}")
+                    raise DatabaseException("batch_write_item", f"{error_code}: {error_message}")
+                except Exception as e:
+                    logger.error(f"Unexpected error batch writing items to {table_name}: {str(e)}")
+                    raise DatabaseException("batch_write_item", str(e))
+                
+                request_items = response.get('UnprocessedItems') or {}
+                if request_items:
+                    attempt += 1
+                    self._backoff("batch_write_item", table_name, attempt)
+        
+        return len(requests)
+    
+    def transact_write(self, operations: List[Dict[str, Any]], resource_type: str = "Item"):
+        """Apply several writes atomically in a single TransactWriteItems request
+        
+        Each operation is a one-key dict (``Put``, ``Update``, ``Delete`` or
+        ``ConditionCheck``) using the same shapes as the table resource: plain
+        Python values for ``Item``/``Key``/``ExpressionAttributeValues`` and a
+        boto3 condition object or string for ``ConditionExpression``. Either
+        every operation is applied or none is; a failed condition raises
+        ``ConcurrentModificationException`` for ``resource_type``.
+        """
+        if not operations:
+            return None
+        if len(operations) > TRANSACT_WRITE_LIMIT:
+            raise DatabaseException(
+                "transact_write_items",
+                f"{len(operations)} operations exceed the limit of {TRANSACT_WRITE_LIMIT} per transaction"
             )
-            return response.get('Items', [])
+        
+        transact_items = [self._build_transact_operation(operation) for operation in operations]
+        try:
+            # The resource's client serializes the attribute values for us
+            return self.client.meta.client.transact_write_items(TransactItems=transact_items)
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            logger.error(f"Error querying {table_name}: {error_code} - {error_message}")
-            raise DatabaseException("query", f"{error_code}: {error_message}")
+            reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+            if error_code == 'TransactionCanceledException' and 'ConditionalCheckFailed' in reasons:
+                logger.warning(f"Transaction rejected by a condition check: {reasons}")
+                raise ConcurrentModificationException(resource_type, error_message, reasons)
+            logger.error(f"Error running transaction: {error_code} - {error_message}")
+            raise DatabaseException("transact_write_items", f"{error_code}: {error_message}")
         except Exception as e:
-            logger.error(f"Unexpected error querying {table_name}: {str(e)}")
-            raise DatabaseException("query", str(e))
+            logger.error(f"Unexpected error running transaction: {str(e)}")
+            raise DatabaseException("transact_write_items", str(e))
+    
+    def _build_transact_operation(self, operation: Dict[str, Any]) -> Dict[str, Any]:
+        """Render a boto3 condition object inside a transaction operation into an expression string"""
+        (operation_type, request), = operation.items()
+        condition = request.get('ConditionExpression')
+        if not isinstance(condition, ConditionBase):
+            return operation
+        
+        built = ConditionExpressionBuilder().build_expression(condition)
+        request = dict(request)
+        request['ConditionExpression'] = built.condition_expression
+        names = {**request.get('ExpressionAttributeNames', {}), **built.attribute_name_placeholders}
+        values = {**request.get('ExpressionAttributeValues', {}), **built.attribute_value_placeholders}
+        # DynamoDB rejects empty placeholder maps, e.g. for attribute_exists checks
+        if names:
+            request['ExpressionAttributeNames'] = names
+        if values:
+            request['ExpressionAttributeValues'] = values
+        return {operation_type: request}
+    
+    def _backoff(self, operation: str, table_name: str, attempt: int):
+        """Sleep before retrying throttled batch work, giving up after the configured retries"""
+        if attempt > settings.DYNAMODB_BATCH_MAX_RETRIES:
+            error_msg = f"Unprocessed items remained in {table_name} after {settings.DYNAMODB_BATCH_MAX_RETRIES} retries"
+            logger.error(error_msg)
+            raise DatabaseException(operation, error_msg)
+        # Exponential backoff with full jitter
+        delay = min(settings.DYNAMODB_BATCH_BACKOFF_MAX, settings.DYNAMODB_BATCH_BACKOFF_BASE * (2 ** attempt))
+        logger.warning(f"Retrying unprocessed {operation} work on {table_name} (attempt {attempt})")
+        time.sleep(random.uniform(0, delay))
+    
+    def iter_query(self, table_name: str, key_condition_expression,
+                   expression_attribute_values: Optional[Dict[str, Any]] = None,
+                   index_name: Optional[str] = None, limit: Optional[int] = None,
+                   exclusive_start_key: Optional[Dict[str, Any]] = None,
+                   filter_expression=None,
+                   attributes: Optional[Iterable[str]] = None,
+                   scan_forward: bool = True) -> Iterator[Dict[str, Any]]:
+        """Lazily yield queried items, fetching the next page only when the current one is used up"""
+        query_args = {'KeyConditionExpression': key_condition_expression, **projection_args(attributes)}
+        if expression_attribute_values:
+            query_args['ExpressionAttributeValues'] = expression_attribute_values
+        if index_name:
+            query_args['IndexName'] = index_name
+        if filter_expression is not None:
+            query_args['FilterExpression'] = filter_expression
+        if not scan_forward:
+            query_args['ScanIndexForward'] = False
+        for page in self._iter_pages("query", table_name, query_args, limit, exclusive_start_key):
+            yield from page.get('Items', [])
     
-    def scan(self, table_name: str):
-        """Scan all items from a DynamoDB table"""
+    def iter_scan(self, table_name: str, limit: Optional[int] = None,
+                  exclusive_start_key: Optional[Dict[str, Any]] = None,
+                  filter_expression=None,
+                  attributes: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield scanned items, fetching the next page only when the current one is used up"""
+        scan_args = projection_args(attributes)
+        if filter_expression is not None:
+            scan_args['FilterExpression'] = filter_expression
+        for page in self._iter_pages("scan", table_name, scan_args, limit, exclusive_start_key):
+            yield from page.get('Items', [])
+    
+    def query_many(self, table_name: str, key_name: str, values: Iterable[Any],
+                   index_name: Optional[str] = None,
+                   attributes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Every item whose partition key ``key_name`` is one of ``values``, in no particular order
+        
+        Values are looked up ``KEY_LOOKUP_LIMIT`` at a time with a PartiQL
+        ``IN`` condition on the partition key, which DynamoDB serves as
+        queries rather than a scan, so each chunk costs one round trip.
+        """
+        values = list(dict.fromkeys(values))
+        source = f'"{table_name}"."{index_name}"' if index_name else f'"{table_name}"'
+        selected = ", ".join(f'"{name}"' for name in attributes) if attributes is not None else "*"
+        items = []
+        for start in range(0, len(values), KEY_LOOKUP_LIMIT):
+            chunk = values[start:start + KEY_LOOKUP_LIMIT]
+            # The resource's client serializes the parameters and deserializes the items for us
+            request_args = {
+                'Statement': f'SELECT {selected} FROM {source} WHERE "{key_name}" IN [{", ".join("?" for _ in chunk)}]',
+                'Parameters': chunk
+            }
+            while True:
+                try:
+                    response = self.client.meta.client.execute_statement(**request_args)
+                except ClientError as e:
+                    error_code = e.response['Error']['Code']
+                    error_message = e.response['Error']['Message']
+                    logger.error(f"Error looking up items in {table_name}: {error_code} - {error_message}")
+                    raise DatabaseException("execute_statement", f"{error_code}: {error_message}")
+                except Exception as e:
+                    logger.error(f"Unexpected error looking up items in {table_name}: {str(e)}")
+                    raise DatabaseException("execute_statement", str(e))
+                items.extend(response.get('Items', []))
+                if not response.get('NextToken'):
+                    break
+                request_args['NextToken'] = response['NextToken']
+        return items
+    
+    def _iter_pages(self, operation: str, table_name: str, request_args: Dict[str, Any],
+                    limit: Optional[int] = None,
+                    exclusive_start_key: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Follow LastEvaluatedKey across pages of a scan or query
+        
+        ``limit`` is passed through as the DynamoDB page size, and
+        ``exclusive_start_key`` resumes from a previously returned key.
+        """
         table = self.get_table(table_name)
-        try:
-            response = table.scan()
-            return response.get('Items', [])
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            error_message = e.response['Error']['Message']
-            logger.error(f"Error scanning {table_name}: {error_code} - {error_message}")
-            raise DatabaseException("scan", f"{error_code}: {error_message}")
-        except Exception as e:
-            logger.error(f"Unexpected error scanning {table_name}: {str(e)}")
-            raise DatabaseException("scan", str(e))
+        request_args = dict(request_args)
+        if limit:
+            request_args['Limit'] = limit
+        if exclusive_start_key:
+            request_args['ExclusiveStartKey'] = exclusive_start_key
+        
+        while True:
+            try:
+                response = getattr(table, operation)(**request_args)
+            except ClientError as e:
+                error_code = e.response['Error']['Code']
+                error_message = e.response['Error']['Message']
+                logger.error(f"Error running {operation} on {table_name}: {error_code} - {error_message}")
+                raise DatabaseException(operation, f"{error_code}: {error_message}")
+            except Exception as e:
+                logger.error(f"Unexpected error running {operation} on {table_name}: {str(e)}")
+                raise DatabaseException(operation, str(e))
+            
+            yield response
+            
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                return
+            request_args['ExclusiveStartKey'] = last_evaluated_key
     
     def update_item(self, table_name: str, key: Dict[str, Any], 
-                    update_expression: str, expression_attribute_values: Dict[str, Any]):
+                    update_expression: str, expression_attribute_values: Dict[str, Any],
+                    expression_attribute_names: Optional[Dict[str, str]] = None,
+                    condition_expression=None, return_values: str = "UPDATED_NEW"):
         """Update an item in a DynamoDB table"""
         table = self.get_table(table_name)
+        update_args = {
+            'Key': key,
+            'UpdateExpression': update_expression,
+            'ExpressionAttributeValues': expression_attribute_values,
+            'ReturnValues': return_values
+        }
+        if expression_attribute_names:
+            update_args['ExpressionAttributeNames'] = expression_attribute_names
+        if condition_expression is not None:
+            update_args['ConditionExpression'] = condition_expression
         try:
-            response = table.update_item(
-                Key=key,
-                UpdateExpression=update_expression,
-                ExpressionAttributeValues=expression_attribute_values,
-                ReturnValues="UPDATED_NEW"
-            )
+            response = table.update_item(**update_args)
             return response
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
+            if error_code == 'ConditionalCheckFailedException':
+                raise ConditionFailedException("update_item", error_message)
             logger.error(f"Error updating item in {table_name}: {error_code} - {error_message}")
             raise DatabaseException("update_item", f"{error_code}: {error_message}")
         except Exception as e:
             logger.error(f"Unexpected error updating item in {table_name}: {str(e)}")
             raise DatabaseException("update_item", str(e))
     
-    def delete_item(self, table_name: str, key: Dict[str, Any]):
-        """Delete an item from a DynamoDB table"""
+    def delete_item(self, table_name: str, key: Dict[str, Any], condition_expression=None):
+        """Delete an item from a DynamoDB table, optionally only if a condition holds"""
         table = self.get_table(table_name)
+        delete_args = {'Key': key}
+        if condition_expression is not None:
+            delete_args['ConditionExpression'] = condition_expression
         try:
-            response = table.delete_item(Key=key)
+            response = table.delete_item(**delete_args)
             return response
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
+            if error_code == 'ConditionalCheckFailedException':
+                raise ConditionFailedException("delete_item", error_message)
             logger.error(f"Error deleting item from {table_name}: {error_code} - {error_message}")
             raise DatabaseException("delete_item", f"{error_code}: {error_message}")
         except Exception as e:
             logger.error(f"Unexpected error deleting item from {table_name}: {str(e)}")
             raise DatabaseException("delete_item", str(e))
-
-# Create a global DynamoDB client instance
-dynamodb = DynamoDBClient()
@@ -0,0 +1,245 @@
+"""Storage engine interface shared by the DynamoDB and in-memory backends
+
+Repositories talk to ``src.db.storage.storage``, which is whichever engine
+``STORAGE_ENGINE`` selects. Engines speak DynamoDB's data model: items are
+plain dicts, keys follow the table's key schema, and conditions are boto3
+condition objects (``Attr``/``Key``).
+"""
+
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from boto3.dynamodb.conditions import Key
+from src.core.exceptions import ConcurrentModificationException, ValidationException
+import logging
+
+logger = logging.getLogger(__name__)
+
+# DynamoDB rejects BatchGetItem requests with more than 100 keys
+BATCH_GET_LIMIT = 100
+# DynamoDB rejects BatchWriteItem requests with more than 25 operations
+BATCH_WRITE_LIMIT = 25
+# DynamoDB rejects TransactWriteItems requests with more than 100 operations
+TRANSACT_WRITE_LIMIT = 100
+# DynamoDB PartiQL accepts at most 50 partition key values in one IN list
+KEY_LOOKUP_LIMIT = 50
+
+class Page:
+    """One page of a query or scan: its items, the key of each, and whether any follow
+    
+    Each key can be passed as ``exclusive_start_key`` to read on from its item.
+    """
+    
+    def __init__(self, items: List[Any], keys: List[Dict[str, Any]], has_more: bool):
+        self.items = items
+        self.keys = keys
+        self.has_more = has_more
+    
+    def map(self, convert: Callable[[Any], Any]) -> "Page":
+        """The same page with every item converted, such as from an item to a model"""
+        return Page([convert(item) for item in self.items], self.keys, self.has_more)
+
+def read_page(items: Iterator[Dict[str, Any]], count: int, key_names: Iterable[str]) -> Page:
+    """Take one page of ``count`` items from a query or scan started with ``limit=count + 1``
+    
+    Reading one item past the page tells whether more follow without another
+    request, where DynamoDB's own LastEvaluatedKey is set whenever a page is
+    full. Keys are built from ``key_names``, which the items must include.
+    """
+    page = list(islice(items, count + 1))
+    return Page(
+        page[:count],
+        [{name: item[name] for name in key_names} for item in page[:count]],
+        len(page) > count
+    )
+
+def set_attributes_operation(table_name: str, key: Dict[str, Any], attributes: Dict[str, Any],
+                             condition_expression=None) -> Dict[str, Any]:
+    """A ``transact_write`` operation that overwrites only the given attributes of an item"""
+    request = {
+        'TableName': table_name,
+        'Key': key,
+        'UpdateExpression': "SET " + ", ".join(f"#a{index} = :a{index}" for index in range(len(attributes))),
+        'ExpressionAttributeNames': {f"#a{index}": name for index, name in enumerate(attributes)},
+        'ExpressionAttributeValues': {f":a{index}": value for index, value in enumerate(attributes.values())}
+    }
+    if condition_expression is not None:
+        request['ConditionExpression'] = condition_expression
+    return {'Update': request}
+
+def start_key(after: Optional[Dict[str, Any]], key_names: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """Check a key to resume a page after, which must hold exactly ``key_names`` as strings
+    
+    These keys come back from clients in cursors, so one that doesn't fit
+    the page's query is rejected as invalid instead of failing in storage.
+    """
+    if after is None:
+        return None
+    if set(after) != set(key_names) or not all(isinstance(value, str) for value in after.values()):
+        raise ValidationException("Invalid cursor")
+    return after
+
+class StorageEngine:
+    """Operations the repositories need from a storage backend"""
+    
+    def create_table_if_not_exists(self, table_name: str, key_schema: List[Dict[str, str]],
+                                   attribute_definitions: List[Dict[str, str]],
+                                   global_secondary_indexes: Optional[List[Dict[str, Any]]] = None):
+        """Create a table and its secondary indexes if they don't exist"""
+        raise NotImplementedError
+    
+    def table_exists(self, table_name: str) -> bool:
+        """Whether a table exists and can be used"""
+        raise NotImplementedError
+    
+    def get_item(self, table_name: str, key: Dict[str, Any],
+                 attributes: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Get one item by key, or None"""
+        raise NotImplementedError
+    
+    def put_item(self, table_name: str, item: Dict[str, Any], condition_expression=None):
+        """Write a whole item, raising ``ConditionFailedException`` if the condition fails"""
+        raise NotImplementedError
+    
+    def delete_item(self, table_name: str, key: Dict[str, Any], condition_expression=None):
+        """Delete an item, raising ``ConditionFailedException`` if the condition fails"""
+        raise NotImplementedError
+    
+    def update_item(self, table_name: str, key: Dict[str, Any],
+                    update_expression: str, expression_attribute_values: Dict[str, Any],
+                    expression_attribute_names: Optional[Dict[str, str]] = None,
+                    condition_expression=None, return_values: str = "UPDATED_NEW"):
+        """Apply an update expression to an item and return the response"""
+        raise NotImplementedError
+    
+    def batch_get_item(self, table_name: str, keys: List[Dict[str, Any]],
+                       attributes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Get many items by key, in the order requested, leaving out missing ones"""
+        raise NotImplementedError
+    
+    def batch_write(self, table_name: str, put_items: Optional[List[Dict[str, Any]]] = None,
+                    delete_keys: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Put and delete many items, returning the number of operations written"""
+        raise NotImplementedError
+    
+    def transact_write(self, operations: List[Dict[str, Any]], resource_type: str = "Item"):
+        """Apply ``Put``/``Update``/``Delete``/``ConditionCheck`` operations atomically"""
+        raise NotImplementedError
+    
+    def transact_write_each(self, groups: List[List[Dict[str, Any]]], resource_type: str = "Item") -> List[bool]:
+        """Apply groups of operations in as few transactions as fit, returning whether each group was written
+        
+        A group is never split between transactions. When conditions cancel a
+        transaction, the groups they belong to are left out and the rest of
+        the transaction is retried, so every group is written unless its own
+        condition fails.
+        """
+        written = [False] * len(groups)
+        transactions = [[]]
+        for index, operations in enumerate(groups):
+            if len(operations) > TRANSACT_WRITE_LIMIT:
+                raise ValueError(f"A group of {len(operations)} operations can't fit in one transaction")
+            if sum(len(groups[member]) for member in transactions[-1]) + len(operations) > TRANSACT_WRITE_LIMIT:
+                transactions.append([])
+            transactions[-1].append(index)
+        
+        for members in transactions:
+            while members:
+                owners = [member for member in members for _ in groups[member]]
+                try:
+                    self.transact_write(
+                        [operation for member in members for operation in groups[member]], resource_type=resource_type
+                    )
+                except ConcurrentModificationException as e:
+                    failed = {owner for owner, reason in zip(owners, e.reasons or ()) if reason == 'ConditionalCheckFailed'}
+                    if not failed:
+                        raise
+                    members = [member for member in members if member not in failed]
+                    continue
+                for member in members:
+                    written[member] = True
+                break
+        if len(transactions) > 1:
+            logger.info(f"Wrote {len(groups)} {resource_type} groups in {len(transactions)} transactions")
+        return written
+    
+    def iter_query(self, table_name: str, key_condition_expression,
+                   expression_attribute_values: Optional[Dict[str, Any]] = None,
+                   index_name: Optional[str] = None, limit: Optional[int] = None,
+                   exclusive_start_key: Optional[Dict[str, Any]] = None,
+                   filter_expression=None,
+                   attributes: Optional[Iterable[str]] = None,
+                   scan_forward: bool = True) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the items matching a key condition, in sort key order or reversed"""
+        raise NotImplementedError
+    
+    def iter_scan(self, table_name: str, limit: Optional[int] = None,
+                  exclusive_start_key: Optional[Dict[str, Any]] = None,
+                  filter_expression=None,
+                  attributes: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield every item in a table"""
+        raise NotImplementedError
+    
+    def query_many(self, table_name: str, key_name: str, values: Iterable[Any],
+                   index_name: Optional[str] = None,
+                   attributes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Every item whose partition key ``key_name`` is one of ``values``, in no particular order"""
+        items = []
+        for value in dict.fromkeys(values):
+            items.extend(self.iter_query(table_name, Key(key_name).eq(value), index_name=index_name, attributes=attributes))
+        return items
+    
+    def query(self, table_name: str, key_condition_expression,
+              expression_attribute_values: Optional[Dict[str, Any]] = None,
+              index_name: Optional[str] = None,
+              attributes: Optional[Iterable[str]] = None,
+              scan_forward: bool = True) -> List[Dict[str, Any]]:
+        """Query all matching items from a table, or from one of its secondary indexes"""
+        return list(self.iter_query(
+            table_name,
+            key_condition_expression,
+            expression_attribute_values=expression_attribute_values,
+            index_name=index_name,
+            attributes=attributes,
+            scan_forward=scan_forward
+        ))
+    
+    def scan(self, table_name: str, attributes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Scan all items from a table"""
+        return list(self.iter_scan(table_name, attributes=attributes))
+    
+    def set_attributes(self, table_name: str, key: Dict[str, Any], attributes: Dict[str, Any],
+                       condition_expression=None) -> Dict[str, Any]:
+        """Overwrite only the given attributes of an item and return the whole item as updated"""
+        names = {f"#a{index}": name for index, name in enumerate(attributes)}
+        values = {f":a{index}": value for index, value in enumerate(attributes.values())}
+        update_expression = "SET " + ", ".join(f"#a{index} = :a{index}" for index in range(len(attributes)))
+        response = self.update_item(
+            table_name,
+            key,
+            update_expression,
+            values,
+            expression_attribute_names=names,
+            condition_expression=condition_expression,
+            return_values="ALL_NEW"
+        )
+        return response.get('Attributes', {})
+    
+    def add_to_attributes(self, table_name: str, key: Dict[str, Any], deltas: Dict[str, int],
+                          condition_expression=None) -> Dict[str, Any]:
+        """Atomically add to numeric attributes of an item and return the whole item as updated
+        
+        Missing attributes count as zero, so counters need no initialisation.
+        """
+        names = {f"#a{index}": name for index, name in enumerate(deltas)}
+        values = {f":a{index}": delta for index, delta in enumerate(deltas.values())}
+        update_expression = "ADD " + ", ".join(f"#a{index} :a{index}" for index in range(len(deltas)))
+        response = self.update_item(
+            table_name,
+            key,
+            update_expression,
+            values,
+            expression_attribute_names=names,
+            condition_expression=condition_expression,
+            return_values="ALL_NEW"
+        )
+        return response.get('Attributes', {})
@@ -1,14 +1,79 @@
-from src.db.dynamodb import dynamodb
+from src.db.storage import storage
 from src.core.config import settings
+from src.core.exceptions import DatabaseException, ConditionFailedException
 from src.db import mock_data
+from src.db.repositories.single_table import iter_single_table_items
+from boto3.dynamodb.conditions import Attr, Key
+from typing import Any, Dict, Iterable
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _ordered_index(index_name: str, partition_key: str):
+    """Build a global secondary index on a parent ID, sorted by position"""
+    return {
+        'IndexName': index_name,
+        'KeySchema': [
+            {'AttributeName': partition_key, 'KeyType': 'HASH'},
+            {'AttributeName': 'position', 'KeyType': 'RANGE'}
+        ],
+        'Projection': {'ProjectionType': 'ALL'},
+        'ProvisionedThroughput': {
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    }
+
+def create_single_table():
+    """Create the single-table layout table if it doesn't exist"""
+    storage.create_table_if_not_exists(
+        table_name=settings.DYNAMODB_SINGLE_TABLE,
+        key_schema=[
+            {'AttributeName': 'PK', 'KeyType': 'HASH'},
+            {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+        ],
+        attribute_definitions=[
+            {'AttributeName': 'PK', 'AttributeType': 'S'},
+            {'AttributeName': 'SK', 'AttributeType': 'S'},
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'boardList', 'AttributeType': 'S'}
+        ],
+        global_secondary_indexes=[
+            {
+                'IndexName': settings.DYNAMODB_SINGLE_TABLE_ID_INDEX,
+                'KeySchema': [
+                    {'AttributeName': 'id', 'KeyType': 'HASH'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {
+                    'ReadCapacityUnits': 5,
+                    'WriteCapacityUnits': 5
+                }
+            },
+            {
+                # Sparse: only board items have a boardList, so listing boards reads nothing else
+                'IndexName': settings.DYNAMODB_SINGLE_TABLE_BOARD_INDEX,
+                'KeySchema': [
+                    {'AttributeName': 'boardList', 'KeyType': 'HASH'},
+                    {'AttributeName': 'id', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {
+                    'ReadCapacityUnits': 5,
+                    'WriteCapacityUnits': 5
+                }
+            }
+        ]
+    )
+
 def create_tables():
     """Create DynamoDB tables if they don't exist"""
+    if settings.DYNAMODB_STORAGE_LAYOUT == "single_table":
+        create_single_table()
+        return
+    
     # Create Boards table
-    dynamodb.create_table_if_not_exists(
+    storage.create_table_if_not_exists(
         table_name=settings.DYNAMODB_BOARDS_TABLE,
         key_schema=[
             {'AttributeName': 'id', 'KeyType': 'HASH'}
@@ -18,44 +83,83 @@ def create_tables():
         ]
     )
     
-    # Create Columns table
-    dynamodb.create_table_if_not_exists(
+    # Create Columns table, indexed by board so a board's columns come back in order
+    storage.create_table_if_not_exists(
         table_name=settings.DYNAMODB_COLUMNS_TABLE,
         key_schema=[
             {'AttributeName': 'id', 'KeyType': 'HASH'}
         ],
         attribute_definitions=[
-            {'AttributeName': 'id', 'AttributeType': 'S'}
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'boardId', 'AttributeType': 'S'},
+            {'AttributeName': 'position', 'AttributeType': 'S'}
+        ],
+        global_secondary_indexes=[
+            _ordered_index(settings.DYNAMODB_COLUMNS_BY_BOARD_INDEX, 'boardId')
         ]
     )
     
-    # Create Cards table
-    dynamodb.create_table_if_not_exists(
+    # Create Cards table, indexed by column so a column's cards come back in order
+    storage.create_table_if_not_exists(
         table_name=settings.DYNAMODB_CARDS_TABLE,
         key_schema=[
             {'AttributeName': 'id', 'KeyType': 'HASH'}
         ],
         attribute_definitions=[
-            {'AttributeName': 'id', 'AttributeType': 'S'}
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'columnId', 'AttributeType': 'S'},
+            {'AttributeName': 'position', 'AttributeType': 'S'}
+        ],
+        global_secondary_indexes=[
+            _ordered_index(settings.DYNAMODB_CARDS_BY_COLUMN_INDEX, 'columnId')
         ]
     )
 
+def _seed(table_name: str, items: Iterable[Dict[str, Any]], hash_key: str, stored=None) -> int:
+    """Write the seed items that aren't stored yet, returning how many were written
+    
+    Seeding runs on every startup, so each item is written only if its key
+    is free; ``stored`` can also skip items already stored under another key.
+    """
+    written = 0
+    for item in items:
+        if stored is not None and stored(item):
+            continue
+        try:
+            storage.put_item(table_name, item, condition_expression=Attr(hash_key).not_exists())
+            written += 1
+        except ConditionFailedException:
+            pass
+    return written
+
+def _in_single_table(item: Dict[str, Any]) -> bool:
+    # Columns and cards move to new sort keys, so look them up by ID rather than by key
+    return bool(storage.query(
+        settings.DYNAMODB_SINGLE_TABLE,
+        Key("id").eq(item["id"]),
+        index_name=settings.DYNAMODB_SINGLE_TABLE_ID_INDEX,
+        attributes=["id"]
+    ))
+
 def seed_data():
-    """Seed the DynamoDB tables with initial data"""
-    # Seed Boards
-    for board in mock_data.boards_data:
-        dynamodb.put_item(settings.DYNAMODB_BOARDS_TABLE, board)
-        logger.info(f"Added board: {board['id']}")
+    """Seed the DynamoDB tables with initial data, leaving items already stored untouched"""
+    if settings.DYNAMODB_STORAGE_LAYOUT == "single_table":
+        items = iter_single_table_items(
+            mock_data.boards_data, mock_data.columns_data, mock_data.cards_data
+        )
+        written = _seed(settings.DYNAMODB_SINGLE_TABLE, items, "PK", _in_single_table)
+        logger.info(f"Seeded {written} items into {settings.DYNAMODB_SINGLE_TABLE}")
+        return
     
-    # Seed Columns
-    for column in mock_data.columns_data:
-        dynamodb.put_item(settings.DYNAMODB_COLUMNS_TABLE, column)
-        logger.info(f"Added column: {column['id']}")
+    seeds = [
+        (settings.DYNAMODB_BOARDS_TABLE, mock_data.boards_data),
+        (settings.DYNAMODB_COLUMNS_TABLE, mock_data.columns_data),
+        (settings.DYNAMODB_CARDS_TABLE, mock_data.cards_data)
+    ]
     
-    # Seed Cards
-    for card in mock_data.cards_data:
-        dynamodb.put_item(settings.DYNAMODB_CARDS_TABLE, card)
-        logger.info(f"Added card: {card['id']}")
+    for table_name, items in seeds:
+        written = _seed(table_name, items, "id")
+        logger.info(f"Seeded {written} items into {table_name}")
 
 def init_database():
     """Initialize the database by creating tables and seeding data"""
@@ -66,16 +170,19 @@ def init_database():
         
         # Verify tables exist before seeding
         logger.info("Verifying tables exist...")
-        tables_to_verify = [
-            settings.DYNAMODB_BOARDS_TABLE,
-            settings.DYNAMODB_COLUMNS_TABLE,
-            settings.DYNAMODB_CARDS_TABLE
-        ]
+        if settings.DYNAMODB_STORAGE_LAYOUT == "single_table":
+            tables_to_verify = [settings.DYNAMODB_SINGLE_TABLE]
+        else:
+            tables_to_verify = [
+                settings.DYNAMODB_BOARDS_TABLE,
+                settings.DYNAMODB_COLUMNS_TABLE,
+                settings.DYNAMODB_CARDS_TABLE
+            ]
         
         for table_name in tables_to_verify:
             try:
-                # This will throw an exception if the table doesn't exist
-                dynamodb.client.meta.client.describe_table(TableName=table_name)
+                if not storage.table_exists(table_name):
+                    raise DatabaseException("verify_table", f"Table {table_name} does not exist")
                 logger.info(f"Verified table {table_name} exists")
             except Exception as e:
                 logger.error(f"Table {table_name} does not exist or is not accessible: {e}")
@@ -0,0 +1,527 @@
+"""In-process storage engine with DynamoDB semantics
+
+Keeps every table in memory, with a sorted hash index for the primary key
+and for each global secondary index, so queries such as "cards in column X by
+order" are a dict lookup followed by an ordered walk instead of a scan. Items
+are normalised through boto3's serializer on the way in, so numbers come back
+as ``Decimal`` and unsupported values are rejected, just as with DynamoDB.
+
+Meant for test suites and load-test baselines: nothing is persisted, and
+each process has its own data.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from boto3.dynamodb.conditions import AttributeBase, ConditionBase, Size
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.db.engine import StorageEngine, BATCH_WRITE_LIMIT, TRANSACT_WRITE_LIMIT
+from src.core.exceptions import (
+    DatabaseException,
+    ConcurrentModificationException,
+    ConditionFailedException
+)
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+# Stands in for an attribute the item doesn't have
+_ABSENT = object()
+
+class _Index:
+    """Primary keys of a table's items, grouped by partition key and kept in sort key order"""
+    
+    def __init__(self, hash_key: str, range_key: Optional[str] = None):
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.partitions: Dict[Any, List[Tuple]] = {}
+    
+    def entry(self, item: Dict[str, Any], primary_key: Tuple) -> Optional[Tuple]:
+        # Like DynamoDB indexes, items without the index's key attributes are left out
+        if self.hash_key not in item:
+            return None
+        if self.range_key is None:
+            return primary_key
+        if self.range_key not in item:
+            return None
+        return (item[self.range_key],) + primary_key
+    
+    def add(self, item: Dict[str, Any], primary_key: Tuple):
+        entry = self.entry(item, primary_key)
+        if entry is not None:
+            insort(self.partitions.setdefault(item[self.hash_key], []), entry)
+    
+    def remove(self, item: Dict[str, Any], primary_key: Tuple):
+        entry = self.entry(item, primary_key)
+        if entry is None:
+            return
+        entries = self.partitions.get(item[self.hash_key], [])
+        position = bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+            if not entries:
+                del self.partitions[item[self.hash_key]]
+    
+    def primary_keys(self, hash_value: Any, reverse: bool = False,
+                     start: Optional[Tuple] = None) -> List[Tuple]:
+        """Primary keys in one partition, in sort key order or reversed
+        
+        ``start`` is the entry of an exclusive start key, as built by ``entry``.
+        Only the keys that sort past it are returned, whether or not its item
+        still exists, just as DynamoDB resumes a query.
+        """
+        entries = self.partitions.get(hash_value, [])
+        if start is not None:
+            if reverse:
+                entries = entries[:bisect_left(entries, start)]
+            else:
+                entries = entries[bisect_right(entries, start):]
+        if reverse:
+            entries = entries[::-1]
+        if self.range_key is None:
+            return list(entries)
+        return [entry[1:] for entry in entries]
+
+class _Table:
+    """One table: its items by primary key, plus the indexes over them"""
+    
+    def __init__(self, name: str, key_schema: List[Dict[str, str]]):
+        self.name = name
+        self.key_names = [_key_name(key_schema, 'HASH')]
+        range_key = _key_name(key_schema, 'RANGE')
+        if range_key:
+            self.key_names.append(range_key)
+        self.items: Dict[Tuple, Dict[str, Any]] = {}
+        self.primary = _Index(self.key_names[0], range_key)
+        self.indexes: Dict[str, _Index] = {}
+    
+    def add_index(self, index: Dict[str, Any]):
+        secondary = _Index(_key_name(index['KeySchema'], 'HASH'), _key_name(index['KeySchema'], 'RANGE'))
+        for primary_key, item in self.items.items():
+            secondary.add(item, primary_key)
+        self.indexes[index['IndexName']] = secondary
+    
+    def key_of(self, item: Dict[str, Any]) -> Tuple:
+        try:
+            return tuple(item[name] for name in self.key_names)
+        except KeyError as e:
+            raise DatabaseException(
+                "validate_key",
+                f"ValidationException: missing key attribute {e} for table {self.name}"
+            )
+    
+    def get(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.items.get(self.key_of(key))
+    
+    def put(self, item: Dict[str, Any]):
+        primary_key = self.key_of(item)
+        self.delete(primary_key)
+        self.items[primary_key] = item
+        for index in self._all_indexes():
+            index.add(item, primary_key)
+    
+    def delete(self, primary_key: Tuple) -> Optional[Dict[str, Any]]:
+        item = self.items.pop(primary_key, None)
+        if item is not None:
+            for index in self._all_indexes():
+                index.remove(item, primary_key)
+        return item
+    
+    def _all_indexes(self) -> Iterable[_Index]:
+        yield self.primary
+        yield from self.indexes.values()
+
+def _key_name(key_schema: List[Dict[str, str]], key_type: str) -> Optional[str]:
+    for key in key_schema:
+        if key['KeyType'] == key_type:
+            return key['AttributeName']
+    return None
+
+def _normalize(value: Any) -> Any:
+    """Round-trip a value through DynamoDB's type system"""
+    try:
+        return _deserializer.deserialize(_serializer.serialize(value))
+    except TypeError as e:
+        raise DatabaseException("serialize", f"ValidationException: {str(e)}")
+
+def _normalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: _normalize(value) for name, value in item.items()}
+
+def _project(item: Dict[str, Any], attributes: Optional[Iterable[str]]) -> Dict[str, Any]:
+    if attributes is None:
+        return dict(item)
+    return {name: item[name] for name in attributes if name in item}
+
+def _operand(value: Any, item: Dict[str, Any]) -> Any:
+    if isinstance(value, Size):
+        attribute = _operand(value.get_expression()['values'][0], item)
+        return _ABSENT if attribute is _ABSENT else len(attribute)
+    if isinstance(value, AttributeBase):
+        return item.get(value.name, _ABSENT)
+    return value
+
+def _compare(operator: str, left: Any, right: Any) -> bool:
+    if left is _ABSENT or right is _ABSENT:
+        return operator == '<>'
+    try:
+        if operator == '=':
+            return left == right
+        if operator == '<>':
+            return left != right
+        if operator == '<':
+            return left < right
+        if operator == '<=':
+            return left <= right
+        if operator == '>':
+            return left > right
+        if operator == '>=':
+            return left >= right
+    except TypeError:
+        # DynamoDB treats comparisons between different types as false
+        return False
+    raise DatabaseException("evaluate_condition", f"Unsupported comparison '{operator}'")
+
+def matches(condition: ConditionBase, item: Dict[str, Any]) -> bool:
+    """Evaluate a boto3 condition object against an item"""
+    expression = condition.get_expression()
+    operator = expression['operator']
+    values = expression['values']
+    if operator == 'AND':
+        return matches(values[0], item) and matches(values[1], item)
+    if operator == 'OR':
+        return matches(values[0], item) or matches(values[1], item)
+    if operator == 'NOT':
+        return not matches(values[0], item)
+    if operator == 'attribute_exists':
+        return _operand(values[0], item) is not _ABSENT
+    if operator == 'attribute_not_exists':
+        return _operand(values[0], item) is _ABSENT
+    
+    left = _operand(values[0], item)
+    if operator == 'begins_with':
+        return isinstance(left, str) and left.startswith(values[1])
+    if operator == 'contains':
+        return left is not _ABSENT and values[1] in left
+    if operator == 'IN':
+        return left in values[1]
+    if operator == 'BETWEEN':
+        return _compare('>=', left, values[1]) and _compare('<=', left, values[2])
+    return _compare(operator, left, _operand(values[1], item))
+
+def _check(condition, item: Optional[Dict[str, Any]]) -> bool:
+    if condition is None:
+        return True
+    if not isinstance(condition, ConditionBase):
+        raise DatabaseException(
+            "evaluate_condition",
+            "The in-memory engine only accepts boto3 condition objects, not expression strings"
+        )
+    return matches(condition, item or {})
+
+def _partition_value(condition: ConditionBase, hash_key: str) -> Any:
+    """Find the ``Key(hash_key).eq(value)`` clause of a key condition"""
+    expression = condition.get_expression()
+    if expression['operator'] == 'AND':
+        for part in expression['values']:
+            value = _partition_value(part, hash_key)
+            if value is not _ABSENT:
+                return value
+        return _ABSENT
+    left = expression['values'][0]
+    if expression['operator'] == '=' and isinstance(left, AttributeBase) and left.name == hash_key:
+        return expression['values'][1]
+    return _ABSENT
+
+_CLAUSE = re.compile(r'\b(SET|ADD|REMOVE)\b', re.IGNORECASE)
+_ARITHMETIC = re.compile(r'^(.+?)\s*([+-])\s*(.+)$')
+
+def _apply_update(item: Dict[str, Any], update_expression: str, names: Dict[str, str],
+                  values: Dict[str, Any]) -> List[str]:
+    """Apply SET/ADD/REMOVE actions to ``item`` in place, returning the names touched"""
+    def path(token: str) -> str:
+        token = token.strip()
+        return names.get(token, token) if token.startswith('#') else token
+    
+    def operand(token: str) -> Any:
+        token = token.strip()
+        if token.startswith(':'):
+            return values[token]
+        return item.get(path(token), _ABSENT)
+    
+    touched = []
+    parts = _CLAUSE.split(update_expression)
+    for clause, body in zip(parts[1::2], parts[2::2]):
+        clause = clause.upper()
+        for action in (action.strip() for action in body.split(',')):
+            if not action:
+                continue
+            if clause == 'SET':
+                target, value = (part.strip() for part in action.split('=', 1))
+                arithmetic = _ARITHMETIC.match(value)
+                if arithmetic:
+                    left, sign, right = arithmetic.groups()
+                    left, right = operand(left), operand(right)
+                    if left is _ABSENT or right is _ABSENT:
+                        raise DatabaseException(
+                            "update_item",
+                            "ValidationException: an operand in the update expression does not exist"
+                        )
+                    item[path(target)] = left + right if sign == '+' else left - right
+                else:
+                    item[path(target)] = operand(value)
+                touched.append(path(target))
+            elif clause == 'ADD':
+                target, value = action.split(None, 1)
+                current = item.get(path(target), 0)
+                item[path(target)] = current + operand(value)
+                touched.append(path(target))
+            elif clause == 'REMOVE':
+                item.pop(path(action), None)
+                touched.append(path(action))
+    return touched
+
+class InMemoryEngine(StorageEngine):
+    """Storage engine that keeps tables in process memory"""
+    
+    def __init__(self):
+        self._tables: Dict[str, _Table] = {}
+        self._lock = threading.RLock()
+    
+    def _table(self, table_name: str, operation: str) -> _Table:
+        table = self._tables.get(table_name)
+        if table is None:
+            raise DatabaseException(
+                operation,
+                f"ResourceNotFoundException: Requested resource not found: Table: {table_name} not found"
+            )
+        return table
+    
+    def create_table_if_not_exists(self, table_name: str, key_schema: List[Dict[str, str]],
+                                   attribute_definitions: List[Dict[str, str]],
+                                   global_secondary_indexes: Optional[List[Dict[str, Any]]] = None):
+        """Create a table if it doesn't exist, adding any missing indexes"""
+        with self._lock:
+            table = self._tables.get(table_name)
+            if table is None:
+                logger.info(f"Creating in-memory table {table_name}")
+                table = _Table(table_name, key_schema)
+                self._tables[table_name] = table
+            for index in global_secondary_indexes or []:
+                if index['IndexName'] not in table.indexes:
+                    table.add_index(index)
+            return table
+    
+    def table_exists(self, table_name: str) -> bool:
+        """Check whether a table exists"""
+        return table_name in self._tables
+    
+    def get_item(self, table_name: str, key: Dict[str, Any],
+                 attributes: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Get an item by key, optionally reading only some of its attributes"""
+        with self._lock:
+            item = self._table(table_name, "get_item").get(_normalize_item(key))
+            return _project(item, attributes) if item is not None else None
+    
+    def put_item(self, table_name: str, item: Dict[str, Any], condition_expression=None):
+        """Write a whole item, optionally only if a condition holds"""
+        with self._lock:
+            table = self._table(table_name, "put_item")
+            item = _normalize_item(item)
+            if not _check(condition_expression, table.get(item)):
+                raise ConditionFailedException("put_item", "The conditional request failed")
+            table.put(item)
+            return {}
+    
+    def delete_item(self, table_name: str, key: Dict[str, Any], condition_expression=None):
+        """Delete an item, optionally only if a condition holds"""
+        with self._lock:
+            table = self._table(table_name, "delete_item")
+            key = _normalize_item(key)
+            if not _check(condition_expression, table.get(key)):
+                raise ConditionFailedException("delete_item", "The conditional request failed")
+            table.delete(table.key_of(key))
+            return {}
+    
+    def update_item(self, table_name: str, key: Dict[str, Any],
+                    update_expression: str, expression_attribute_values: Dict[str, Any],
+                    expression_attribute_names: Optional[Dict[str, str]] = None,
+                    condition_expression=None, return_values: str = "UPDATED_NEW"):
+        """Apply an update expression to an item, creating it if needed like UpdateItem does"""
+        with self._lock:
+            table = self._table(table_name, "update_item")
+            key = _normalize_item(key)
+            old = table.get(key)
+            if not _check(condition_expression, old):
+                raise ConditionFailedException("update_item", "The conditional request failed")
+            new = dict(old) if old is not None else dict(key)
+            touched = _apply_update(
+                new,
+                update_expression,
+                expression_attribute_names or {},
+                _normalize_item(expression_attribute_values or {})
+            )
+            table.put(new)
+            
+            if return_values == "ALL_NEW":
+                return {'Attributes': dict(new)}
+            if return_values == "UPDATED_NEW":
+                return {'Attributes': _project(new, touched)}
+            if return_values == "ALL_OLD":
+                return {'Attributes': dict(old)} if old is not None else {}
+            if return_values == "UPDATED_OLD":
+                return {'Attributes': _project(old, touched)} if old is not None else {}
+            return {}
+    
+    def batch_get_item(self, table_name: str, keys: List[Dict[str, Any]],
+                       attributes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Get many items by key, in the order requested, leaving out missing ones"""
+        with self._lock:
+            table = self._table(table_name, "batch_get_item")
+            items = (table.get(_normalize_item(key)) for key in keys)
+            return [_project(item, attributes) for item in items if item is not None]
+    
+    def batch_write(self, table_name: str, put_items: Optional[List[Dict[str, Any]]] = None,
+                    delete_keys: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Put and delete many items, returning the number of operations written"""
+        put_items = [_normalize_item(item) for item in put_items or []]
+        delete_keys = [_normalize_item(key) for key in delete_keys or []]
+        with self._lock:
+            table = self._table(table_name, "batch_write_item")
+            # Apply one BatchWriteItem-sized group at a time, like the DynamoDB engine
+            requests = [('put', item) for item in put_items] + [('delete', key) for key in delete_keys]
+            for start in range(0, len(requests), BATCH_WRITE_LIMIT):
+                for action, item in requests[start:start + BATCH_WRITE_LIMIT]:
+                    if action == 'put':
+                        table.put(item)
+                    else:
+                        table.delete(table.key_of(item))
+            return len(requests)
+    
+    def transact_write(self, operations: List[Dict[str, Any]], resource_type: str = "Item"):
+        """Check every condition first, then apply all of the operations or none of them"""
+        if not operations:
+            return None
+        if len(operations) > TRANSACT_WRITE_LIMIT:
+            raise DatabaseException(
+                "transact_write_items",
+                f"{len(operations)} operations exceed the limit of {TRANSACT_WRITE_LIMIT} per transaction"
+            )
+        with self._lock:
+            planned = []
+            seen = set()
+            for operation in operations:
+                (operation_type, request), = operation.items()
+                table = self._table(request['TableName'], "transact_write_items")
+                key = _normalize_item(request['Item'] if operation_type == 'Put' else request['Key'])
+                identity = (table.name, table.key_of(key))
+                if identity in seen:
+                    raise DatabaseException(
+                        "transact_write_items",
+                        "ValidationException: Transaction request cannot include multiple operations on one item"
+                    )
+                seen.add(identity)
+                planned.append((operation_type, request, table, key))
+            
+            reasons = [
+                'ConditionalCheckFailed'
+                if not _check(request.get('ConditionExpression'), table.get(key)) else 'None'
+                for _, request, table, key in planned
+            ]
+            if 'ConditionalCheckFailed' in reasons:
+                logger.warning(f"Transaction rejected by a condition check: {reasons}")
+                raise ConcurrentModificationException(
+                    resource_type,
+                    f"Transaction cancelled, please refer cancellation reasons for specific reasons [{', '.join(reasons)}]",
+                    reasons
+                )
+            
+            for operation_type, request, table, key in planned:
+                if operation_type == 'Put':
+                    table.put(key)
+                elif operation_type == 'Delete':
+                    table.delete(table.key_of(key))
+                elif operation_type == 'Update':
+                    item = dict(table.get(key) or key)
+                    _apply_update(
+                        item,
+                        request['UpdateExpression'],
+                        request.get('ExpressionAttributeNames', {}),
+                        _normalize_item(request.get('ExpressionAttributeValues', {}))
+                    )
+                    table.put(item)
+            return {}
+    
+    def iter_query(self, table_name: str, key_condition_expression,
+                   expression_attribute_values: Optional[Dict[str, Any]] = None,
+                   index_name: Optional[str] = None, limit: Optional[int] = None,
+                   exclusive_start_key: Optional[Dict[str, Any]] = None,
+                   filter_expression=None,
+                   attributes: Optional[Iterable[str]] = None,
+                   scan_forward: bool = True) -> Iterator[Dict[str, Any]]:
+        """Yield the items in one partition of the table or an index, in sort key order or reversed
+        
+        ``limit`` only sets DynamoDB's page size, so it is ignored here.
+        """
+        with self._lock:
+            table = self._table(table_name, "query")
+            index = table.primary
+            if index_name:
+                if index_name not in table.indexes:
+                    raise DatabaseException(
+                        "query",
+                        f"ValidationException: The table does not have the specified index: {index_name}"
+                    )
+                index = table.indexes[index_name]
+            partition = _partition_value(key_condition_expression, index.hash_key)
+            if partition is _ABSENT:
+                raise DatabaseException(
+                    "query",
+                    f"ValidationException: Query condition missed key schema element: {index.hash_key}"
+                )
+            start = None
+            if exclusive_start_key:
+                start_key = _normalize_item(exclusive_start_key)
+                start = index.entry(start_key, table.key_of(start_key))
+                if start is None:
+                    raise DatabaseException(
+                        "query",
+                        "ValidationException: The provided starting key is invalid: it lacks the index's key attributes"
+                    )
+            primary_keys = index.primary_keys(_normalize(partition), reverse=not scan_forward, start=start)
+        
+        yield from self._iter_items(table, primary_keys, [key_condition_expression, filter_expression], attributes)
+    
+    def iter_scan(self, table_name: str, limit: Optional[int] = None,
+                  exclusive_start_key: Optional[Dict[str, Any]] = None,
+                  filter_expression=None,
+                  attributes: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield every item in the table, in primary key order
+        
+        A scan resumes from the first key past ``exclusive_start_key``, whether
+        or not its item still exists, so pages neither repeat nor skip items
+        that were written or deleted in between.
+        """
+        with self._lock:
+            table = self._table(table_name, "scan")
+            primary_keys = sorted(table.items)
+            if exclusive_start_key:
+                start = table.key_of(_normalize_item(exclusive_start_key))
+                primary_keys = primary_keys[bisect_right(primary_keys, start):]
+        
+        yield from self._iter_items(table, primary_keys, [filter_expression], attributes)
+    
+    def _iter_items(self, table: _Table, primary_keys: List[Tuple], conditions: List[Any],
+                    attributes: Optional[Iterable[str]]) -> Iterator[Dict[str, Any]]:
+        # Keys were snapshotted under the lock; items written since are read as they are now
+        for primary_key in primary_keys:
+            with self._lock:
+                item = table.items.get(primary_key)
+                if item is None or not all(_check(condition, item) for condition in conditions):
+                    continue
+                item = _project(item, attributes)
+            yield item
+
@@ -0,0 +1,96 @@
+"""Give existing columns and cards fractional positions in place of integer orders
+
+Run with ``python -m src.db.migrate_positions`` before serving traffic from
+the new code; it also adds the position indexes to existing tables. Each board's columns and each column's cards keep their
+current display order. Parents whose children all have positions already are
+left alone, so the migration can safely be re-run.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Tuple
+from src.db.storage import storage
+from src.db.init_db import create_tables
+from src.db.models.column import Column
+from src.db.models.card import Card
+from src.db.repositories.single_table import COLUMN_TYPE, CARD_TYPE, column_item, card_item
+from src.db.repositories.registry import BoardRepository
+from src.core.config import settings
+from src.core.ranking import spread_positions
+from src.core.versions import bump_boards
+from boto3.dynamodb.conditions import Attr
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _assign_positions(items: Iterable[Dict[str, Any]], parent_attribute: str) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Yield ``(item, position)`` for every child of a parent that still has unpositioned children"""
+    children = {}
+    for item in items:
+        children.setdefault(item.get(parent_attribute), []).append(item)
+    
+    for siblings in children.values():
+        if all(item.get("position") for item in siblings):
+            continue
+        # Legacy items keep their integer order; anything created since goes after them
+        siblings.sort(key=lambda item: (
+            "order" not in item, item.get("order", 0), item.get("position") or "", item["id"]
+        ))
+        yield from zip(siblings, spread_positions(len(siblings)))
+
+def _migrate_table(table_name: str, parent_attribute: str) -> int:
+    # Only the attributes needed to sort siblings are held in memory
+    items = storage.iter_scan(table_name, attributes=["id", parent_attribute, "order", "position"])
+    migrated = 0
+    for item, position in _assign_positions(items, parent_attribute):
+        storage.update_item(
+            table_name,
+            {"id": item["id"]},
+            "SET #position = :position REMOVE #order",
+            {":position": position},
+            expression_attribute_names={"#position": "position", "#order": "order"}
+        )
+        migrated += 1
+    logger.info(f"Assigned {migrated} positions in {table_name}")
+    return migrated
+
+def _migrate_single_table() -> int:
+    # Sort keys embed the position, so items are rewritten under their new keys
+    migrated = 0
+    for item_type, parent_attribute in ((COLUMN_TYPE, "boardId"), (CARD_TYPE, "columnId")):
+        items = storage.iter_scan(settings.DYNAMODB_SINGLE_TABLE, filter_expression=Attr("type").eq(item_type))
+        fresh, stale_keys = [], []
+        for item, position in _assign_positions(items, parent_attribute):
+            if item_type == COLUMN_TYPE:
+                column = Column.from_dict(item)
+                column.position = position
+                fresh_item = column_item(column)
+            else:
+                card = Card.from_dict(item)
+                card.position = position
+                fresh_item = card_item(card, item["boardId"])
+            fresh.append(fresh_item)
+            if (item["PK"], item["SK"]) != (fresh_item["PK"], fresh_item["SK"]):
+                stale_keys.append({"PK": item["PK"], "SK": item["SK"]})
+        # Fresh items are written before the stale ones are deleted, so nothing is lost if this stops part way
+        migrated += storage.batch_write(settings.DYNAMODB_SINGLE_TABLE, put_items=fresh)
+        storage.batch_write(settings.DYNAMODB_SINGLE_TABLE, delete_keys=stale_keys)
+    logger.info(f"Assigned {migrated} positions in {settings.DYNAMODB_SINGLE_TABLE}")
+    return migrated
+
+def migrate_positions() -> int:
+    """Assign positions to every column and card that has only an integer order"""
+    create_tables()
+    if settings.DYNAMODB_STORAGE_LAYOUT == "single_table":
+        migrated = _migrate_single_table()
+    else:
+        migrated = (
+            _migrate_table(settings.DYNAMODB_COLUMNS_TABLE, "boardId")
+            + _migrate_table(settings.DYNAMODB_CARDS_TABLE, "columnId")
+        )
+    if migrated:
+        # Cached responses were read before the rewrite
+        bump_boards(*(board.id for board in BoardRepository.iter_all()))
+    return migrated
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate_positions()
@@ -0,0 +1,46 @@
+"""Copy boards, columns and cards from the per-entity tables into the single-table layout
+
+Run with ``python -m src.db.migrate_single_table`` before switching
+``DYNAMODB_STORAGE_LAYOUT`` to ``single_table``. The source tables are only
+read, so the migration can safely be re-run.
+"""
+
+from itertools import islice
+from src.db.storage import storage
+from src.db.init_db import create_single_table
+from src.db.repositories.single_table import iter_single_table_items
+from src.core.config import settings
+from src.core.versions import bump_boards
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Items converted and written per step, keeping memory flat for large tables
+MIGRATION_CHUNK_SIZE = 500
+
+def migrate_to_single_table() -> int:
+    """Stream every item from the per-entity tables into the single table"""
+    create_single_table()
+    
+    items = iter_single_table_items(
+        storage.iter_scan(settings.DYNAMODB_BOARDS_TABLE),
+        storage.iter_scan(settings.DYNAMODB_COLUMNS_TABLE),
+        storage.iter_scan(settings.DYNAMODB_CARDS_TABLE)
+    )
+    
+    migrated = 0
+    while True:
+        chunk = list(islice(items, MIGRATION_CHUNK_SIZE))
+        if not chunk:
+            break
+        migrated += storage.batch_write(settings.DYNAMODB_SINGLE_TABLE, put_items=chunk)
+        logger.info(f"Migrated {migrated} items into {settings.DYNAMODB_SINGLE_TABLE}")
+    
+    # Responses cached from the old tables aren't known to match the new one
+    bump_boards(*(item["id"] for item in storage.iter_scan(settings.DYNAMODB_BOARDS_TABLE, attributes=["id"])))
+    logger.info(f"Single-table migration complete: {migrated} items")
+    return migrated
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate_to_single_table()
@@ -1,23 +1,33 @@
 from typing import Dict, Any, List, Optional
 
 class Board:
-    """Board model representing a Kanban board"""
+    """Board model representing a Kanban board
     
-    def __init__(self, id: str, title: str):
+    ``column_count`` and ``card_count`` are counters kept up to date as
+    columns and cards are written, so they can be shown without reading them.
+    """
+    
+    def __init__(self, id: str, title: str, column_count: int = 0, card_count: int = 0):
         self.id = id
         self.title = title
+        self.column_count = column_count
+        self.card_count = card_count
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Board':
         """Create a Board instance from a dictionary"""
         return cls(
             id=data["id"],
-            title=data["title"]
+            title=data["title"],
+            column_count=int(data.get("columnCount", 0)),
+            card_count=int(data.get("cardCount", 0))
         )
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert Board instance to a dictionary"""
         return {
             "id": self.id,
-            "title": self.title
+            "title": self.title,
+            "columnCount": self.column_count,
+            "cardCount": self.card_count
         }
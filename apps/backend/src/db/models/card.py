@@ -1,24 +1,34 @@
 from typing import Optional, Dict, Any
 
 class Card:
-    """Card model representing a task in the Kanban board"""
+    """Card model representing a task in the Kanban board
     
-    def __init__(self, id: str, title: str, description: str, column_id: str, order: int = 0):
+    ``position`` is the stored fractional key cards are sorted by, while
+    ``order`` is the card's index within its column, filled in when the
+    column is listed and None otherwise.
+    """
+    
+    def __init__(self, id: str, title: str, description: str, column_id: str,
+                 order: Optional[int] = None, position: Optional[str] = None):
         self.id = id
         self.title = title
         self.description = description
         self.column_id = column_id
         self.order = order
+        self.position = position
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Card':
-        """Create a Card instance from a dictionary"""
+        """Create a Card instance from a dictionary
+        
+        Attributes left out of a projected read are set to None.
+        """
         return cls(
             id=data["id"],
-            title=data["title"],
-            description=data["description"],
-            column_id=data["columnId"],
-            order=data.get("order", 0)  # Default to 0 if order is not present
+            title=data.get("title"),
+            description=data.get("description"),
+            column_id=data.get("columnId"),
+            position=data.get("position")
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -28,5 +38,5 @@ class Card:
             "title": self.title,
             "description": self.description,
             "columnId": self.column_id,
-            "order": self.order
+            "position": self.position
         }
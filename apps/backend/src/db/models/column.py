@@ -1,22 +1,35 @@
 from typing import Dict, Any, List, Optional
 
 class Column:
-    """Column model representing a stage in the Kanban board"""
+    """Column model representing a stage in the Kanban board
     
-    def __init__(self, id: str, title: str, board_id: str, order: int):
+    ``position`` is the stored fractional key columns are sorted by, while
+    ``order`` is the column's index on its board, filled in when the board's
+    columns are listed and None otherwise. ``card_count`` is a counter kept
+    up to date as cards are written.
+    """
+    
+    def __init__(self, id: str, title: str, board_id: str, order: Optional[int] = None,
+                 position: Optional[str] = None, card_count: int = 0):
         self.id = id
         self.title = title
         self.board_id = board_id
         self.order = order
+        self.position = position
+        self.card_count = card_count
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Column':
-        """Create a Column instance from a dictionary"""
+        """Create a Column instance from a dictionary
+        
+        Attributes left out of a projected read are set to None.
+        """
         return cls(
             id=data["id"],
-            title=data["title"],
-            board_id=data["boardId"],
-            order=data["order"]
+            title=data.get("title"),
+            board_id=data.get("boardId"),
+            position=data.get("position"),
+            card_count=int(data.get("cardCount", 0))
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -25,5 +38,6 @@ class Column:
             "id": self.id,
             "title": self.title,
             "boardId": self.board_id,
-            "order": self.order
+            "position": self.position,
+            "cardCount": self.card_count
         }
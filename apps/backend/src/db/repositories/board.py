@@ -1,21 +1,60 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from src.db.models.board import Board
-from src.db.dynamodb import dynamodb
+from src.db.models.column import Column
+from src.db.models.card import Card
+from src.db.repositories.column import ColumnRepository
+from src.db.repositories.card import CardRepository
+from src.db.storage import storage
+from src.db.engine import Page, read_page, start_key
 from src.core.config import settings
-from src.core.exceptions import NotFoundException, DatabaseException, ConflictException
+from src.core.exceptions import (
+    NotFoundException,
+    DatabaseException,
+    ConflictException,
+    ConditionFailedException
+)
+from boto3.dynamodb.conditions import Attr
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Board fields that can be patched, mapped to their item attribute names
+BOARD_ATTRIBUTES = {
+    "title": "title",
+    "column_count": "columnCount",
+    "card_count": "cardCount"
+}
+
+# Board counters, maintained with ADD so concurrent writers never overwrite each other
+BOARD_COUNTERS = {
+    "column_count": "columnCount",
+    "card_count": "cardCount"
+}
+
+# Attributes of a board's key, from which a page of boards is resumed
+BOARD_KEY = ["id"]
+
+def board_attributes(fields: Dict[str, Any], allowed: Dict[str, str] = BOARD_ATTRIBUTES) -> Dict[str, Any]:
+    """Translate board fields into item attributes"""
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise ValueError(f"Cannot write board fields: {', '.join(sorted(unknown))}")
+    return {allowed[field]: value for field, value in fields.items()}
+
 class BoardRepository:
     """Repository for Board data access using DynamoDB"""
     
     @staticmethod
     def get_all() -> List[Board]:
         """Get all boards from DynamoDB"""
+        return list(BoardRepository.iter_all())
+    
+    @staticmethod
+    def iter_all(page_size: Optional[int] = None) -> Iterator[Board]:
+        """Stream all boards from DynamoDB one page at a time"""
         try:
-            items = dynamodb.scan(settings.DYNAMODB_BOARDS_TABLE)
-            return [Board.from_dict(item) for item in items]
+            for item in storage.iter_scan(settings.DYNAMODB_BOARDS_TABLE, limit=page_size):
+                yield Board.from_dict(item)
         except DatabaseException as e:
             logger.error(f"Database error getting all boards: {e.message}")
             raise
@@ -23,14 +62,33 @@ class BoardRepository:
             logger.error(f"Unexpected error getting all boards: {str(e)}")
             raise DatabaseException("get_all_boards", str(e))
     
+    @staticmethod
+    def get_page(count: int, after: Optional[Dict[str, Any]] = None) -> Page:
+        """Get up to ``count`` boards following the key ``after``"""
+        after = start_key(after, BOARD_KEY)
+        try:
+            return read_page(
+                storage.iter_scan(settings.DYNAMODB_BOARDS_TABLE, limit=count + 1, exclusive_start_key=after),
+                count,
+                BOARD_KEY
+            ).map(Board.from_dict)
+        except DatabaseException as e:
+            logger.error(f"Database error getting a page of boards: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error getting a page of boards: {str(e)}")
+            raise DatabaseException("get_boards_page", str(e))
+    
     @staticmethod
     def get_by_id(board_id: str) -> Board:
         """Get a board by ID from DynamoDB"""
         try:
-            item = dynamodb.get_item(settings.DYNAMODB_BOARDS_TABLE, {"id": board_id})
+            item = storage.get_item(settings.DYNAMODB_BOARDS_TABLE, {"id": board_id})
             if not item:
                 raise NotFoundException("Board", board_id)
             return Board.from_dict(item)
+        except NotFoundException:
+            raise
         except DatabaseException as e:
             logger.error(f"Database error getting board {board_id}: {e.message}")
             raise
@@ -38,19 +96,45 @@ class BoardRepository:
             logger.error(f"Unexpected error getting board {board_id}: {str(e)}")
             raise DatabaseException("get_board", str(e))
     
+    @staticmethod
+    def get_many(board_ids: List[str]) -> List[Board]:
+        """Get several boards by ID in batched requests, in the order requested"""
+        try:
+            keys = [{"id": board_id} for board_id in board_ids]
+            items = storage.batch_get_item(settings.DYNAMODB_BOARDS_TABLE, keys)
+            return [Board.from_dict(item) for item in items]
+        except DatabaseException as e:
+            logger.error(f"Database error getting boards {board_ids}: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error getting boards {board_ids}: {str(e)}")
+            raise DatabaseException("get_boards", str(e))
+    
+    @staticmethod
+    def get_contents(board_id: str, column_attributes: Optional[List[str]] = None,
+                     card_attributes: Optional[List[str]] = None) -> Tuple[List[Column], List[Card]]:
+        """Get a board's columns and cards, each in display order"""
+        columns = ColumnRepository.get_by_board_id(board_id, attributes=column_attributes)
+        cards = [
+            card
+            for column in columns
+            for card in CardRepository.get_by_column_id(column.id, attributes=card_attributes)
+        ]
+        return columns, cards
+    
     @staticmethod
     def create(board: Board) -> Board:
         """Create a new board in DynamoDB"""
         try:
-            # Check if board already exists
-            existing = dynamodb.get_item(settings.DYNAMODB_BOARDS_TABLE, {"id": board.id})
-            if existing:
-                raise ConflictException("Board", board.id)
-                
-            dynamodb.put_item(settings.DYNAMODB_BOARDS_TABLE, board.to_dict())
+            # Only write if no board with this ID exists yet
+            storage.put_item(
+                settings.DYNAMODB_BOARDS_TABLE,
+                board.to_dict(),
+                condition_expression=Attr("id").not_exists()
+            )
             return board
-        except ConflictException:
-            raise
+        except ConditionFailedException:
+            raise ConflictException("Board", board.id)
         except DatabaseException as e:
             logger.error(f"Database error creating board {board.id}: {e.message}")
             raise
@@ -60,40 +144,93 @@ class BoardRepository:
     
     @staticmethod
     def update(board: Board) -> Board:
-        """Update a board in DynamoDB"""
+        """Update a board's title in DynamoDB, leaving its counters alone"""
+        return BoardRepository.patch(board.id, title=board.title)
+    
+    @staticmethod
+    def patch(board_id: str, **fields) -> Board:
+        """Write only the given fields of a board and return the whole board as stored"""
+        attributes = board_attributes(fields)
         try:
-            # Check if board exists
-            existing = dynamodb.get_item(settings.DYNAMODB_BOARDS_TABLE, {"id": board.id})
-            if not existing:
-                raise NotFoundException("Board", board.id)
-                
-            dynamodb.put_item(settings.DYNAMODB_BOARDS_TABLE, board.to_dict())
-            return board
-        except NotFoundException:
-            raise
+            # Only write if the board already exists
+            item = storage.set_attributes(
+                settings.DYNAMODB_BOARDS_TABLE,
+                {"id": board_id},
+                attributes,
+                condition_expression=Attr("id").exists()
+            )
+            return Board.from_dict(item)
+        except ConditionFailedException:
+            raise NotFoundException("Board", board_id)
         except DatabaseException as e:
-            logger.error(f"Database error updating board {board.id}: {e.message}")
+            logger.error(f"Database error updating board {board_id}: {e.message}")
             raise
         except Exception as e:
-            logger.error(f"Unexpected error updating board {board.id}: {str(e)}")
+            logger.error(f"Unexpected error updating board {board_id}: {str(e)}")
             raise DatabaseException("update_board", str(e))
     
+    @staticmethod
+    def add_to_counters(board_id: str, **deltas: int) -> Optional[Board]:
+        """Atomically adjust a board's counters, returning the board as updated or None if it is gone"""
+        try:
+            # The condition stops a late update from recreating a deleted board
+            item = storage.add_to_attributes(
+                settings.DYNAMODB_BOARDS_TABLE,
+                {"id": board_id},
+                board_attributes(deltas, BOARD_COUNTERS),
+                condition_expression=Attr("id").exists()
+            )
+            return Board.from_dict(item)
+        except ConditionFailedException:
+            return None
+    
     @staticmethod
     def delete(board_id: str) -> bool:
         """Delete a board from DynamoDB"""
         try:
-            # Check if board exists
-            existing = dynamodb.get_item(settings.DYNAMODB_BOARDS_TABLE, {"id": board_id})
-            if not existing:
-                raise NotFoundException("Board", board_id)
-                
-            dynamodb.delete_item(settings.DYNAMODB_BOARDS_TABLE, {"id": board_id})
+            # Only delete if the board exists, so a missing board is reported
+            storage.delete_item(
+                settings.DYNAMODB_BOARDS_TABLE,
+                {"id": board_id},
+                condition_expression=Attr("id").exists()
+            )
             return True
-        except NotFoundException:
-            raise
+        except ConditionFailedException:
+            raise NotFoundException("Board", board_id)
         except DatabaseException as e:
             logger.error(f"Database error deleting board {board_id}: {e.message}")
             raise
         except Exception as e:
             logger.error(f"Unexpected error deleting board {board_id}: {str(e)}")
             raise DatabaseException("delete_board", str(e))
+    
+    @staticmethod
+    def save_many(boards: List[Board]) -> List[Board]:
+        """Create or overwrite several boards in batched writes"""
+        try:
+            storage.batch_write(
+                settings.DYNAMODB_BOARDS_TABLE,
+                put_items=[board.to_dict() for board in boards]
+            )
+            return boards
+        except DatabaseException as e:
+            logger.error(f"Database error saving {len(boards)} boards: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error saving {len(boards)} boards: {str(e)}")
+            raise DatabaseException("save_boards", str(e))
+    
+    @staticmethod
+    def delete_many(board_ids: List[str]) -> int:
+        """Delete several boards in batched writes, returning how many were deleted"""
+        try:
+            return storage.batch_write(
+                settings.DYNAMODB_BOARDS_TABLE,
+                delete_keys=[{"id": board_id} for board_id in board_ids]
+            )
+        except DatabaseException as e:
+            logger.error(f"Database error deleting {len(board_ids)} boards: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error deleting {len(board_ids)} boards: {str(e)}")
+            raise DatabaseException("delete_boards", str(e))
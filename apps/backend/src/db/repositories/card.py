@@ -1,53 +1,294 @@
-from typing import List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from src.db.models.card import Card
-from src.db.dynamodb import dynamodb
+from src.db.storage import storage
+from src.db.engine import TRANSACT_WRITE_LIMIT, Page, read_page, set_attributes_operation, start_key
 from src.core.config import settings
-import boto3
-from boto3.dynamodb.conditions import Key
+from src.core.exceptions import NotFoundException, ConditionFailedException
+from boto3.dynamodb.conditions import Attr, Key
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Card fields that can be patched, mapped to their item attribute names
+CARD_ATTRIBUTES = {
+    "title": "title",
+    "description": "description",
+    "column_id": "columnId",
+    "position": "position"
+}
+
+# Attributes of a card's key in the column index, from which a page of a column's cards is resumed
+CARD_PAGE_KEY = ["id", "columnId", "position"]
+
+def card_attributes(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate patched card fields into item attributes"""
+    unknown = set(fields) - set(CARD_ATTRIBUTES)
+    if unknown:
+        raise ValueError(f"Cannot patch card fields: {', '.join(sorted(unknown))}")
+    return {CARD_ATTRIBUTES[field]: value for field, value in fields.items()}
+
+def _position_condition(expected_position: Optional[str]):
+    # Cards written before positions were introduced have none until they are migrated
+    if expected_position is None:
+        return Attr("position").not_exists()
+    return Attr("position").eq(expected_position)
+
+def _move_operation(card: Card, expected_column_id: str, expected_position: Optional[str]) -> Dict[str, Any]:
+    """Transaction operation writing a card's new column and position if it is still where it was read from"""
+    return {
+        'Update': {
+            'TableName': settings.DYNAMODB_CARDS_TABLE,
+            'Key': {"id": card.id},
+            'UpdateExpression': "SET columnId = :columnId, #position = :position",
+            'ExpressionAttributeNames': {"#position": "position"},
+            'ExpressionAttributeValues': {":columnId": card.column_id, ":position": card.position},
+            'ConditionExpression': Attr("columnId").eq(expected_column_id) & _position_condition(expected_position)
+        }
+    }
 
 class CardRepository:
     """Repository for Card data access using DynamoDB"""
     
     @staticmethod
-    def get_all() -> List[Card]:
+    def get_all(attributes: Optional[List[str]] = None) -> List[Card]:
         """Get all cards from DynamoDB"""
-        items = dynamodb.scan(settings.DYNAMODB_CARDS_TABLE)
-        return [Card.from_dict(item) for item in items]
+        return list(CardRepository.iter_all(attributes=attributes))
     
     @staticmethod
-    def get_by_id(card_id: str) -> Optional[Card]:
+    def iter_all(page_size: Optional[int] = None, attributes: Optional[List[str]] = None) -> Iterator[Card]:
+        """Stream all cards from DynamoDB one page at a time"""
+        for item in storage.iter_scan(settings.DYNAMODB_CARDS_TABLE, limit=page_size, attributes=attributes):
+            yield Card.from_dict(item)
+    
+    @staticmethod
+    def get_by_id(card_id: str, attributes: Optional[List[str]] = None) -> Optional[Card]:
         """Get a card by ID from DynamoDB"""
-        item = dynamodb.get_item(settings.DYNAMODB_CARDS_TABLE, {"id": card_id})
+        item = storage.get_item(settings.DYNAMODB_CARDS_TABLE, {"id": card_id}, attributes=attributes)
         if item:
             return Card.from_dict(item)
         return None
     
     @staticmethod
-    def get_by_column_id(column_id: str) -> List[Card]:
-        """Get all cards for a specific column from DynamoDB"""
-        # For this query, we need to use a secondary index or scan with filter
-        # Since we're using DynamoDB Local for development, we'll use scan with filter
-        table = dynamodb.get_table(settings.DYNAMODB_CARDS_TABLE)
-        response = table.scan(
-            FilterExpression=boto3.dynamodb.conditions.Attr("columnId").eq(column_id)
+    def get_many(card_ids: List[str], attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get several cards by ID in batched requests, in the order requested"""
+        keys = [{"id": card_id} for card_id in card_ids]
+        items = storage.batch_get_item(settings.DYNAMODB_CARDS_TABLE, keys, attributes=attributes)
+        return [Card.from_dict(item) for item in items]
+    
+    @staticmethod
+    def get_by_column_id(column_id: str, attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get all cards for a specific column, sorted by position, from the column index"""
+        items = storage.query(
+            settings.DYNAMODB_CARDS_TABLE,
+            Key("columnId").eq(column_id),
+            index_name=settings.DYNAMODB_CARDS_BY_COLUMN_INDEX,
+            attributes=attributes
         )
-        items = response.get('Items', [])
         return [Card.from_dict(item) for item in items]
     
+    @staticmethod
+    def iter_by_column(column_id: str, board_id: str, page_size: Optional[int] = None) -> Iterator[Card]:
+        """Stream a column's cards in position order, one index page at a time
+        
+        ``board_id`` is not needed in this layout.
+        """
+        for item in storage.iter_query(
+            settings.DYNAMODB_CARDS_TABLE,
+            Key("columnId").eq(column_id),
+            index_name=settings.DYNAMODB_CARDS_BY_COLUMN_INDEX,
+            limit=page_size
+        ):
+            yield Card.from_dict(item)
+    
+    @staticmethod
+    def get_page_by_column_id(column_id: str, board_id: Optional[str], count: int,
+                              after: Optional[Dict[str, Any]] = None,
+                              attributes: Optional[List[str]] = None) -> Page:
+        """Get up to ``count`` of a column's cards, in position order, following the key ``after``
+        
+        ``board_id`` is not needed in this layout.
+        """
+        after = start_key(after, CARD_PAGE_KEY)
+        if attributes is not None:
+            attributes = sorted({*attributes, *CARD_PAGE_KEY})
+        return read_page(
+            storage.iter_query(
+                settings.DYNAMODB_CARDS_TABLE,
+                Key("columnId").eq(column_id),
+                index_name=settings.DYNAMODB_CARDS_BY_COLUMN_INDEX,
+                limit=count + 1,
+                # A key from another column can't move the query off this one
+                exclusive_start_key={**after, "columnId": column_id} if after else None,
+                attributes=attributes
+            ),
+            count,
+            CARD_PAGE_KEY
+        ).map(Card.from_dict)
+    
+    @staticmethod
+    def get_by_columns(columns: List[Tuple[str, str]], attributes: Optional[List[str]] = None) -> Dict[str, List[Card]]:
+        """Get the cards of several columns, given as (board ID, column ID) pairs, keyed by column ID
+        
+        Index queries cannot be batched, so each column is one query; board IDs
+        are not needed in this layout.
+        """
+        return {
+            column_id: CardRepository.get_by_column_id(column_id, attributes=attributes)
+            for _, column_id in columns
+        }
+    
+    @staticmethod
+    def get_last_position(column_id: str) -> Optional[str]:
+        """Position of the last card in a column, read as a single item from the end of the index"""
+        items = storage.iter_query(
+            settings.DYNAMODB_CARDS_TABLE,
+            Key("columnId").eq(column_id),
+            index_name=settings.DYNAMODB_CARDS_BY_COLUMN_INDEX,
+            limit=1,
+            attributes=["position"],
+            scan_forward=False
+        )
+        item = next(items, None)
+        return item["position"] if item else None
+    
     @staticmethod
     def create(card: Card) -> Card:
         """Create a new card in DynamoDB"""
-        dynamodb.put_item(settings.DYNAMODB_CARDS_TABLE, card.to_dict())
+        storage.put_item(settings.DYNAMODB_CARDS_TABLE, card.to_dict())
         return card
     
     @staticmethod
     def update(card: Card) -> Card:
         """Update a card in DynamoDB"""
-        dynamodb.put_item(settings.DYNAMODB_CARDS_TABLE, card.to_dict())
+        storage.put_item(settings.DYNAMODB_CARDS_TABLE, card.to_dict())
         return card
     
+    @staticmethod
+    def patch(card_id: str, **fields) -> Card:
+        """Write only the given fields of a card and return the whole card as stored"""
+        attributes = card_attributes(fields)
+        if not attributes:
+            card = CardRepository.get_by_id(card_id)
+            if not card:
+                raise NotFoundException("Card", card_id)
+            return card
+        try:
+            # The condition stops a patch from creating a partial card
+            item = storage.set_attributes(
+                settings.DYNAMODB_CARDS_TABLE,
+                {"id": card_id},
+                attributes,
+                condition_expression=Attr("id").exists()
+            )
+        except ConditionFailedException:
+            raise NotFoundException("Card", card_id)
+        return Card.from_dict(item)
+    
+    @staticmethod
+    def reorder(moves: List[Tuple[Card, str, str]]) -> List[Card]:
+        """Atomically write new column and position values for several cards
+        
+        Each move is ``(card, expected_column_id, expected_position)``. The write
+        is conditioned on every card still sitting where it was read from, so a
+        concurrent drag fails cleanly instead of being silently overwritten.
+        """
+        operations = [_move_operation(*move) for move in moves]
+        
+        if len(operations) > TRANSACT_WRITE_LIMIT:
+            # Rebalancing a very long column can't fit in one transaction; each chunk stays atomic
+            logger.warning(f"Repositioning {len(operations)} cards across several transactions")
+        for start in range(0, len(operations), TRANSACT_WRITE_LIMIT):
+            storage.transact_write(operations[start:start + TRANSACT_WRITE_LIMIT], resource_type="Card")
+        return [card for card, _, _ in moves]
+    
+    @staticmethod
+    def move_each(moves: List[Tuple[Card, str, str]]) -> List[bool]:
+        """Write new column and position values for several cards, returning whether each was moved
+        
+        Moves are given like ``reorder``'s and share transactions, but a card
+        that is no longer where it was read from only fails its own move.
+        """
+        return storage.transact_write_each([[_move_operation(*move)] for move in moves], resource_type="Card")
+    
+    @staticmethod
+    def patch_many(patches: List[Tuple[Card, Dict[str, Any]]]) -> List[Optional[Card]]:
+        """Write only the given fields of several cards in shared transactions
+        
+        Each patch is ``(card, fields)``, with the card as it was read. Returns,
+        for each patch in turn, the card with its fields applied, or None if
+        the card no longer exists.
+        """
+        groups = [
+            [set_attributes_operation(
+                settings.DYNAMODB_CARDS_TABLE, {"id": card.id}, card_attributes(fields), Attr("id").exists()
+            )]
+            for card, fields in patches
+        ]
+        written = storage.transact_write_each(groups, resource_type="Card")
+        return [
+            Card.from_dict({**card.to_dict(), **card_attributes(fields)}) if patched else None
+            for (card, fields), patched in zip(patches, written)
+        ]
+    
     @staticmethod
     def delete(card_id: str) -> bool:
-        """Delete a card from DynamoDB"""
-        dynamodb.delete_item(settings.DYNAMODB_CARDS_TABLE, {"id": card_id})
+        """Delete a card from DynamoDB, reporting one that is already gone"""
+        try:
+            # Of two concurrent deletes only one succeeds, so counters are decremented once
+            storage.delete_item(settings.DYNAMODB_CARDS_TABLE, {"id": card_id}, condition_expression=Attr("id").exists())
+        except ConditionFailedException:
+            raise NotFoundException("Card", card_id)
         return True
+    
+    @staticmethod
+    def iter_delete_by_column(column_id: str, board_id: str, chunk_size: int) -> Iterator[int]:
+        """Delete every card in a column a chunk at a time, yielding how many each chunk removed
+        
+        Only card IDs are read, one index page per chunk. ``board_id`` is not
+        needed in this layout.
+        """
+        items = storage.iter_query(
+            settings.DYNAMODB_CARDS_TABLE,
+            Key("columnId").eq(column_id),
+            index_name=settings.DYNAMODB_CARDS_BY_COLUMN_INDEX,
+            limit=chunk_size,
+            attributes=["id"]
+        )
+        while True:
+            card_ids = [item["id"] for item in islice(items, chunk_size)]
+            if not card_ids:
+                break
+            yield CardRepository.delete_many(card_ids)
+    
+    @staticmethod
+    def create_many(cards: List[Card]) -> List[Card]:
+        """Create several new cards in batched writes"""
+        storage.batch_write(settings.DYNAMODB_CARDS_TABLE, put_items=[card.to_dict() for card in cards])
+        return cards
+    
+    @staticmethod
+    def save_many(cards: List[Card]) -> List[Card]:
+        """Create or overwrite several cards in batched writes"""
+        storage.batch_write(settings.DYNAMODB_CARDS_TABLE, put_items=[card.to_dict() for card in cards])
+        return cards
+    
+    @staticmethod
+    def delete_many(card_ids: List[str]) -> int:
+        """Delete several cards in batched writes, returning how many were deleted"""
+        return storage.batch_write(settings.DYNAMODB_CARDS_TABLE, delete_keys=[{"id": card_id} for card_id in card_ids])
+    
+    @staticmethod
+    def delete_existing(card_ids: List[str]) -> List[bool]:
+        """Delete several cards in shared transactions, returning whether each still existed to be deleted"""
+        groups = [
+            [{
+                'Delete': {
+                    'TableName': settings.DYNAMODB_CARDS_TABLE,
+                    'Key': {"id": card_id},
+                    'ConditionExpression': Attr("id").exists()
+                }
+            }]
+            for card_id in card_ids
+        ]
+        return storage.transact_write_each(groups, resource_type="Card")
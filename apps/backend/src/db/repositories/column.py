@@ -1,53 +1,159 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from src.db.models.column import Column
-from src.db.dynamodb import dynamodb
+from src.db.storage import storage
+from src.db.engine import Page, read_page, start_key
 from src.core.config import settings
-import boto3
-from boto3.dynamodb.conditions import Key
+from src.core.exceptions import NotFoundException, ConditionFailedException
+from boto3.dynamodb.conditions import Attr, Key
+
+# Column fields that can be patched, mapped to their item attribute names
+COLUMN_ATTRIBUTES = {
+    "title": "title",
+    "position": "position",
+    "card_count": "cardCount"
+}
+
+# Column counters, maintained with ADD so concurrent writers never overwrite each other
+COLUMN_COUNTERS = {
+    "card_count": "cardCount"
+}
+
+# Attributes of a column's key in the board index, from which a page of a board's columns is resumed
+COLUMN_PAGE_KEY = ["id", "boardId", "position"]
+
+def column_attributes(fields: Dict[str, Any], allowed: Dict[str, str] = COLUMN_ATTRIBUTES) -> Dict[str, Any]:
+    """Translate column fields into item attributes"""
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise ValueError(f"Cannot write column fields: {', '.join(sorted(unknown))}")
+    return {allowed[field]: value for field, value in fields.items()}
 
 class ColumnRepository:
     """Repository for Column data access using DynamoDB"""
     
     @staticmethod
-    def get_all() -> List[Column]:
+    def get_all(attributes: Optional[List[str]] = None) -> List[Column]:
         """Get all columns from DynamoDB"""
-        items = dynamodb.scan(settings.DYNAMODB_COLUMNS_TABLE)
-        return [Column.from_dict(item) for item in items]
+        return list(ColumnRepository.iter_all(attributes=attributes))
     
     @staticmethod
-    def get_by_id(column_id: str) -> Optional[Column]:
+    def iter_all(page_size: Optional[int] = None, attributes: Optional[List[str]] = None) -> Iterator[Column]:
+        """Stream all columns from DynamoDB one page at a time"""
+        for item in storage.iter_scan(settings.DYNAMODB_COLUMNS_TABLE, limit=page_size, attributes=attributes):
+            yield Column.from_dict(item)
+    
+    @staticmethod
+    def get_by_id(column_id: str, attributes: Optional[List[str]] = None) -> Optional[Column]:
         """Get a column by ID from DynamoDB"""
-        item = dynamodb.get_item(settings.DYNAMODB_COLUMNS_TABLE, {"id": column_id})
+        item = storage.get_item(settings.DYNAMODB_COLUMNS_TABLE, {"id": column_id}, attributes=attributes)
         if item:
             return Column.from_dict(item)
         return None
     
     @staticmethod
-    def get_by_board_id(board_id: str) -> List[Column]:
-        """Get all columns for a specific board from DynamoDB"""
-        # For this query, we need to use a secondary index or scan with filter
-        # Since we're using DynamoDB Local for development, we'll use scan with filter
-        table = dynamodb.get_table(settings.DYNAMODB_COLUMNS_TABLE)
-        response = table.scan(
-            FilterExpression=boto3.dynamodb.conditions.Attr("boardId").eq(board_id)
+    def get_many(column_ids: List[str], attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get several columns by ID in batched requests, in the order requested"""
+        keys = [{"id": column_id} for column_id in column_ids]
+        items = storage.batch_get_item(settings.DYNAMODB_COLUMNS_TABLE, keys, attributes=attributes)
+        return [Column.from_dict(item) for item in items]
+    
+    @staticmethod
+    def get_by_board_id(board_id: str, attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get all columns for a specific board, sorted by position, from the board index"""
+        items = storage.query(
+            settings.DYNAMODB_COLUMNS_TABLE,
+            Key("boardId").eq(board_id),
+            index_name=settings.DYNAMODB_COLUMNS_BY_BOARD_INDEX,
+            attributes=attributes
         )
-        items = response.get('Items', [])
         return [Column.from_dict(item) for item in items]
     
+    @staticmethod
+    def get_page_by_board_id(board_id: str, count: int, after: Optional[Dict[str, Any]] = None,
+                             attributes: Optional[List[str]] = None) -> Page:
+        """Get up to ``count`` of a board's columns, in position order, following the key ``after``"""
+        after = start_key(after, COLUMN_PAGE_KEY)
+        if attributes is not None:
+            attributes = sorted({*attributes, *COLUMN_PAGE_KEY})
+        return read_page(
+            storage.iter_query(
+                settings.DYNAMODB_COLUMNS_TABLE,
+                Key("boardId").eq(board_id),
+                index_name=settings.DYNAMODB_COLUMNS_BY_BOARD_INDEX,
+                limit=count + 1,
+                # A key from another board can't move the query off this one
+                exclusive_start_key={**after, "boardId": board_id} if after else None,
+                attributes=attributes
+            ),
+            count,
+            COLUMN_PAGE_KEY
+        ).map(Column.from_dict)
+    
     @staticmethod
     def create(column: Column) -> Column:
         """Create a new column in DynamoDB"""
-        dynamodb.put_item(settings.DYNAMODB_COLUMNS_TABLE, column.to_dict())
+        storage.put_item(settings.DYNAMODB_COLUMNS_TABLE, column.to_dict())
         return column
     
     @staticmethod
     def update(column: Column) -> Column:
         """Update a column in DynamoDB"""
-        dynamodb.put_item(settings.DYNAMODB_COLUMNS_TABLE, column.to_dict())
+        storage.put_item(settings.DYNAMODB_COLUMNS_TABLE, column.to_dict())
         return column
     
+    @staticmethod
+    def patch(column_id: str, **fields) -> Column:
+        """Write only the given fields of a column and return the whole column as stored"""
+        attributes = column_attributes(fields)
+        if not attributes:
+            column = ColumnRepository.get_by_id(column_id)
+            if not column:
+                raise NotFoundException("Column", column_id)
+            return column
+        try:
+            # The condition stops a patch from creating a partial column
+            item = storage.set_attributes(
+                settings.DYNAMODB_COLUMNS_TABLE,
+                {"id": column_id},
+                attributes,
+                condition_expression=Attr("id").exists()
+            )
+        except ConditionFailedException:
+            raise NotFoundException("Column", column_id)
+        return Column.from_dict(item)
+    
+    @staticmethod
+    def add_to_counters(column_id: str, **deltas: int) -> Optional[Column]:
+        """Atomically adjust a column's counters, returning the column as updated or None if it is gone"""
+        try:
+            # The condition stops a late update from recreating a deleted column
+            item = storage.add_to_attributes(
+                settings.DYNAMODB_COLUMNS_TABLE,
+                {"id": column_id},
+                column_attributes(deltas, COLUMN_COUNTERS),
+                condition_expression=Attr("id").exists()
+            )
+            return Column.from_dict(item)
+        except ConditionFailedException:
+            return None
+    
     @staticmethod
     def delete(column_id: str) -> bool:
-        """Delete a column from DynamoDB"""
-        dynamodb.delete_item(settings.DYNAMODB_COLUMNS_TABLE, {"id": column_id})
+        """Delete a column from DynamoDB, reporting one that is already gone"""
+        try:
+            # Of two concurrent deletes only one succeeds, so counters are decremented once
+            storage.delete_item(settings.DYNAMODB_COLUMNS_TABLE, {"id": column_id}, condition_expression=Attr("id").exists())
+        except ConditionFailedException:
+            raise NotFoundException("Column", column_id)
         return True
+    
+    @staticmethod
+    def save_many(columns: List[Column]) -> List[Column]:
+        """Create or overwrite several columns in batched writes"""
+        storage.batch_write(settings.DYNAMODB_COLUMNS_TABLE, put_items=[column.to_dict() for column in columns])
+        return columns
+    
+    @staticmethod
+    def delete_many(column_ids: List[str]) -> int:
+        """Delete several columns in batched writes, returning how many were deleted"""
+        return storage.batch_write(settings.DYNAMODB_COLUMNS_TABLE, delete_keys=[{"id": column_id} for column_id in column_ids])
@@ -0,0 +1,18 @@
+"""Repository implementations for the configured storage layout"""
+
+from src.core.config import settings
+
+if settings.DYNAMODB_STORAGE_LAYOUT == "single_table":
+    from src.db.repositories.single_table import (
+        SingleTableBoardRepository as BoardRepository,
+        SingleTableColumnRepository as ColumnRepository,
+        SingleTableCardRepository as CardRepository
+    )
+elif settings.DYNAMODB_STORAGE_LAYOUT == "multi_table":
+    from src.db.repositories.board import BoardRepository
+    from src.db.repositories.column import ColumnRepository
+    from src.db.repositories.card import CardRepository
+else:
+    raise ValueError(f"Unknown DYNAMODB_STORAGE_LAYOUT '{settings.DYNAMODB_STORAGE_LAYOUT}'")
+
+__all__ = ["BoardRepository", "ColumnRepository", "CardRepository"]
@@ -0,0 +1,911 @@
+"""Repositories for the single-table storage layout
+
+Every board lives in one partition of ``DYNAMODB_SINGLE_TABLE``::
+
+    PK = BOARD#<boardId>   SK = BOARD
+    PK = BOARD#<boardId>   SK = COL#<position>#<columnId>
+    PK = BOARD#<boardId>   SK = CARD#<columnId>#<position>#<cardId>
+
+so a single paginated query returns a board with all of its columns and
+cards already in display order. Items keep their plain attributes (``id``,
+``title``, ``boardId``, ``columnId``, ``position``...) next to the keys, and the
+``id`` index finds a column or card when only its ID is known.
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from src.db.models.board import Board
+from src.db.models.column import Column
+from src.db.models.card import Card
+from src.db.storage import storage
+from src.db.engine import TRANSACT_WRITE_LIMIT, Page, read_page, set_attributes_operation, start_key
+from src.db.repositories.board import board_attributes, BOARD_COUNTERS
+from src.db.repositories.column import column_attributes, COLUMN_COUNTERS
+from src.db.repositories.card import card_attributes
+from src.core.config import settings
+from src.core.exceptions import (
+    NotFoundException,
+    DatabaseException,
+    ConflictException,
+    ConditionFailedException,
+    ConcurrentModificationException,
+    ValidationException
+)
+from boto3.dynamodb.conditions import Attr, Key
+import logging
+
+logger = logging.getLogger(__name__)
+
+BOARD_TYPE = "BOARD"
+COLUMN_TYPE = "COLUMN"
+CARD_TYPE = "CARD"
+
+# Counters changed with ADD while an item may be moving; a move only goes ahead if they haven't changed
+MOVE_GUARDED_ATTRIBUTES = ("cardCount",)
+
+# A column move that loses a race with a counter update is retried from a fresh read this many times
+MOVE_ATTEMPTS = 3
+
+# Card attributes a reorder rewrites from the cards it is given, so it only goes ahead if they haven't changed
+CARD_CONTENT_ATTRIBUTES = ("title", "description")
+
+# Every item's key, from which a page of any query or scan is resumed
+ITEM_KEY = ["PK", "SK"]
+
+# Every board item shares this boardList value, the partition of the sparse board index
+BOARD_LIST = "BOARDS"
+BOARD_PAGE_KEY = [*ITEM_KEY, "boardList", "id"]
+
+def board_key(board_id: str) -> Dict[str, str]:
+    """Primary key of a board's own item"""
+    return {"PK": f"BOARD#{board_id}", "SK": BOARD_TYPE}
+
+def _position_key(position: Optional[str]) -> str:
+    # "#" sorts below every position digit, so a key sorts before its own extensions
+    return position or ""
+
+def board_item(board: Board) -> Dict[str, Any]:
+    """Single-table item for a board"""
+    return {**board_key(board.id), "type": BOARD_TYPE, "boardList": BOARD_LIST, **board.to_dict()}
+
+def column_item(column: Column) -> Dict[str, Any]:
+    """Single-table item for a column"""
+    return {
+        "PK": f"BOARD#{column.board_id}",
+        "SK": f"COL#{_position_key(column.position)}#{column.id}",
+        "type": COLUMN_TYPE,
+        **column.to_dict()
+    }
+
+def card_item(card: Card, board_id: str) -> Dict[str, Any]:
+    """Single-table item for a card on the given board"""
+    return {
+        "PK": f"BOARD#{board_id}",
+        "SK": f"CARD#{card.column_id}#{_position_key(card.position)}#{card.id}",
+        "type": CARD_TYPE,
+        "boardId": board_id,
+        **card.to_dict()
+    }
+
+def iter_single_table_items(boards: Iterable[Dict[str, Any]], columns: Iterable[Dict[str, Any]],
+                            cards: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Convert items from the per-entity tables into single-table items
+    
+    Columns are consumed before cards so each card can be placed in its
+    board's partition; cards whose column no longer exists are skipped.
+    """
+    for item in boards:
+        yield board_item(Board.from_dict(item))
+    
+    column_boards = {}
+    for item in columns:
+        column = Column.from_dict(item)
+        column_boards[column.id] = column.board_id
+        yield column_item(column)
+    
+    for item in cards:
+        card = Card.from_dict(item)
+        board_id = column_boards.get(card.column_id)
+        if board_id is None:
+            logger.warning(f"Skipping card {card.id}: column {card.column_id} does not exist")
+            continue
+        yield card_item(card, board_id)
+
+def _item_key(item: Dict[str, Any]) -> Dict[str, str]:
+    return {"PK": item["PK"], "SK": item["SK"]}
+
+def _locate(entity_id: str, attributes: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Find a column or card item by ID through the id index"""
+    items = storage.query(
+        settings.DYNAMODB_SINGLE_TABLE,
+        Key("id").eq(entity_id),
+        index_name=settings.DYNAMODB_SINGLE_TABLE_ID_INDEX,
+        attributes=attributes
+    )
+    return items[0] if items else None
+
+def _locate_many(entity_ids: Iterable[str], attributes: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Find several column or card items by ID through the id index, keyed by ID"""
+    if attributes is not None:
+        attributes = sorted({*attributes, "id"})
+    items = storage.query_many(
+        settings.DYNAMODB_SINGLE_TABLE,
+        "id",
+        entity_ids,
+        index_name=settings.DYNAMODB_SINGLE_TABLE_ID_INDEX,
+        attributes=attributes
+    )
+    return {item["id"]: item for item in items}
+
+def _boards_of_columns(column_ids: Iterable[str]) -> Dict[str, str]:
+    """Board IDs of the given columns, looked up together, for use as a ``_board_id_of_column`` memo"""
+    return {column_id: item["boardId"] for column_id, item in _locate_many(column_ids, ["boardId"]).items()}
+
+def _board_id_of_column(column_id: str, cache: Optional[Dict[str, str]] = None) -> str:
+    """Resolve the board a column belongs to, memoising lookups in ``cache``"""
+    if cache is not None and column_id in cache:
+        return cache[column_id]
+    item = _locate(column_id)
+    if not item:
+        raise NotFoundException("Column", column_id)
+    if cache is not None:
+        cache[column_id] = item["boardId"]
+    return item["boardId"]
+
+def _unchanged(stale: Dict[str, Any]):
+    """Condition that an item still exists with the counters it was read with"""
+    condition = Attr("PK").exists()
+    for name in MOVE_GUARDED_ATTRIBUTES:
+        condition &= Attr(name).eq(stale[name]) if name in stale else Attr(name).not_exists()
+    return condition
+
+def _move_item(resource_type: str, stale: Dict[str, Any], fresh: Dict[str, Any]) -> Dict[str, Any]:
+    """Atomically move an item to a new key and return the item as written
+    
+    The counters are carried over from ``stale``, and the move raises
+    ``ConcurrentModificationException`` when the item has moved, been deleted
+    or had a counter changed since it was read, so two moves from one read
+    can't both commit and leave two copies behind.
+    """
+    fresh = {**fresh, **{name: stale[name] for name in MOVE_GUARDED_ATTRIBUTES if name in stale}}
+    storage.transact_write(_move_operations(stale, fresh), resource_type=resource_type)
+    return fresh
+
+def _move_operations(stale: Dict[str, Any], fresh: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transaction operations replacing ``stale`` with ``fresh``, if ``stale`` is unchanged and ``fresh`` is new"""
+    return [
+        {
+            'Delete': {
+                'TableName': settings.DYNAMODB_SINGLE_TABLE,
+                'Key': _item_key(stale),
+                'ConditionExpression': _unchanged(stale)
+            }
+        },
+        {
+            'Put': {
+                'TableName': settings.DYNAMODB_SINGLE_TABLE,
+                'Item': fresh,
+                'ConditionExpression': Attr("PK").not_exists()
+            }
+        }
+    ]
+
+def _content_unchanged(card: Card):
+    """Condition that a card's item still exists with the title and description the card was read with"""
+    condition = Attr("PK").exists()
+    for name in CARD_CONTENT_ATTRIBUTES:
+        value = getattr(card, name)
+        condition &= Attr(name).eq(value) if value is not None else Attr(name).not_exists() | Attr(name).eq(None)
+    return condition
+
+def _boards_of_moves(moves: List[Tuple[Card, str, str]]) -> Dict[str, str]:
+    """Board IDs of every column that card moves go from or to"""
+    return _boards_of_columns({column_id for card, expected_column_id, _ in moves
+                               for column_id in (card.column_id, expected_column_id)})
+
+def _card_move_operations(card: Card, expected_column_id: str, expected_position: Optional[str],
+                          boards: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Transaction operations moving a card's item, if it is still where and as it was read"""
+    stale = Card(card.id, card.title, card.description, expected_column_id, position=expected_position)
+    stale_item = card_item(stale, _board_id_of_column(expected_column_id, boards))
+    fresh_item = card_item(card, _board_id_of_column(card.column_id, boards))
+    if _item_key(stale_item) == _item_key(fresh_item):
+        # A transaction may touch an item only once, so a card that stays put is rewritten in place
+        return [{
+            'Put': {
+                'TableName': settings.DYNAMODB_SINGLE_TABLE,
+                'Item': fresh_item,
+                'ConditionExpression': _content_unchanged(card)
+            }
+        }]
+    return [
+        {
+            'Delete': {
+                'TableName': settings.DYNAMODB_SINGLE_TABLE,
+                'Key': _item_key(stale_item),
+                'ConditionExpression': _content_unchanged(card)
+            }
+        },
+        {
+            'Put': {
+                'TableName': settings.DYNAMODB_SINGLE_TABLE,
+                'Item': fresh_item,
+                'ConditionExpression': Attr("PK").not_exists()
+            }
+        }
+    ]
+
+def _replace_items(resource_type: str, stale: List[Dict[str, Any]], fresh: List[Dict[str, Any]]):
+    """Write fresh items in batches, moving the ones whose sort key changed one transaction each"""
+    stale_by_id = {item["id"]: item for item in stale}
+    in_place = []
+    for item in fresh:
+        previous = stale_by_id.get(item["id"])
+        if previous is not None and _item_key(previous) != _item_key(item):
+            _move_item(resource_type, previous, item)
+        else:
+            in_place.append(item)
+    storage.batch_write(settings.DYNAMODB_SINGLE_TABLE, put_items=in_place)
+
+def _replace_item(resource_type: str, stale: Optional[Dict[str, Any]], fresh: Dict[str, Any]):
+    """Overwrite an item, moving it atomically when its sort key changed"""
+    if not stale or _item_key(stale) == _item_key(fresh):
+        storage.put_item(settings.DYNAMODB_SINGLE_TABLE, fresh)
+        return
+    _move_item(resource_type, stale, fresh)
+
+def _patch_item(resource_type: str, stale: Dict[str, Any], fresh: Dict[str, Any],
+                attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Write patched attributes in place, or move the item when its key changed"""
+    if _item_key(stale) != _item_key(fresh):
+        return _move_item(resource_type, stale, fresh)
+    try:
+        return storage.set_attributes(
+            settings.DYNAMODB_SINGLE_TABLE,
+            _item_key(stale),
+            attributes,
+            condition_expression=Attr("PK").exists()
+        )
+    except ConditionFailedException:
+        raise NotFoundException(resource_type, stale["id"])
+
+def _iter_type(item_type: str, page_size: Optional[int] = None, attributes: Optional[List[str]] = None,
+               exclusive_start_key: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    return storage.iter_scan(
+        settings.DYNAMODB_SINGLE_TABLE,
+        limit=page_size,
+        exclusive_start_key=exclusive_start_key,
+        filter_expression=Attr("type").eq(item_type),
+        attributes=attributes
+    )
+
+def _iter_boards(page_size: Optional[int] = None,
+                 exclusive_start_key: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    return storage.iter_query(
+        settings.DYNAMODB_SINGLE_TABLE,
+        Key("boardList").eq(BOARD_LIST),
+        index_name=settings.DYNAMODB_SINGLE_TABLE_BOARD_INDEX,
+        limit=page_size,
+        exclusive_start_key=exclusive_start_key
+    )
+
+def _read_partition_page(partition: str, prefix: str, count: int, after: Optional[Dict[str, Any]],
+                         attributes: Optional[List[str]]) -> Page:
+    """One page of the items in a board partition whose sort key starts with ``prefix``"""
+    after = start_key(after, ITEM_KEY)
+    if after and not after["SK"].startswith(prefix):
+        # DynamoDB rejects a start key outside the query's sort key range
+        raise ValidationException("Invalid cursor")
+    if attributes is not None:
+        attributes = sorted({*attributes, *ITEM_KEY})
+    return read_page(
+        storage.iter_query(
+            settings.DYNAMODB_SINGLE_TABLE,
+            Key("PK").eq(partition) & Key("SK").begins_with(prefix),
+            limit=count + 1,
+            # A key from another board can't move the query off this one
+            exclusive_start_key={**after, "PK": partition} if after else None,
+            attributes=attributes
+        ),
+        count,
+        ITEM_KEY
+    )
+
+class SingleTableBoardRepository:
+    """Repository for Board data access using the single-table layout"""
+    
+    @staticmethod
+    def get_all() -> List[Board]:
+        """Get all boards"""
+        return list(SingleTableBoardRepository.iter_all())
+    
+    @staticmethod
+    def iter_all(page_size: Optional[int] = None) -> Iterator[Board]:
+        """Stream all boards one page at a time"""
+        try:
+            for item in _iter_boards(page_size):
+                yield Board.from_dict(item)
+        except DatabaseException as e:
+            logger.error(f"Database error getting all boards: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error getting all boards: {str(e)}")
+            raise DatabaseException("get_all_boards", str(e))
+    
+    @staticmethod
+    def get_page(count: int, after: Optional[Dict[str, Any]] = None) -> Page:
+        """Get up to ``count`` boards following the key ``after``"""
+        after = start_key(after, BOARD_PAGE_KEY)
+        try:
+            if after:
+                # A key from another index can't move the query off the board list
+                after = {**after, "boardList": BOARD_LIST}
+            return read_page(_iter_boards(count + 1, after), count, BOARD_PAGE_KEY).map(Board.from_dict)
+        except DatabaseException as e:
+            logger.error(f"Database error getting a page of boards: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error getting a page of boards: {str(e)}")
+            raise DatabaseException("get_boards_page", str(e))
+    
+    @staticmethod
+    def get_by_id(board_id: str) -> Board:
+        """Get a board by ID"""
+        try:
+            item = storage.get_item(settings.DYNAMODB_SINGLE_TABLE, board_key(board_id))
+            if not item:
+                raise NotFoundException("Board", board_id)
+            return Board.from_dict(item)
+        except DatabaseException as e:
+            logger.error(f"Database error getting board {board_id}: {e.message}")
+            raise
+        except NotFoundException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error getting board {board_id}: {str(e)}")
+            raise DatabaseException("get_board", str(e))
+    
+    @staticmethod
+    def get_many(board_ids: List[str]) -> List[Board]:
+        """Get several boards by ID in batched requests, in the order requested"""
+        items = storage.batch_get_item(
+            settings.DYNAMODB_SINGLE_TABLE,
+            [board_key(board_id) for board_id in board_ids]
+        )
+        return [Board.from_dict(item) for item in items]
+    
+    @staticmethod
+    def get_contents(board_id: str, column_attributes: Optional[List[str]] = None,
+                     card_attributes: Optional[List[str]] = None) -> Tuple[List[Column], List[Card]]:
+        """Get a board's columns and cards, in display order, with one paginated query"""
+        # Columns and cards come back from the same query, so it reads the union of both projections
+        attributes = None
+        if column_attributes is not None and card_attributes is not None:
+            attributes = sorted({"type", *column_attributes, *card_attributes})
+        columns, cards = [], []
+        for item in storage.iter_query(
+            settings.DYNAMODB_SINGLE_TABLE,
+            Key("PK").eq(f"BOARD#{board_id}"),
+            attributes=attributes
+        ):
+            if item["type"] == COLUMN_TYPE:
+                columns.append(Column.from_dict(item))
+            elif item["type"] == CARD_TYPE:
+                cards.append(Card.from_dict(item))
+        return columns, cards
+    
+    @staticmethod
+    def create(board: Board) -> Board:
+        """Create a new board"""
+        try:
+            # Only write if no board with this ID exists yet
+            storage.put_item(
+                settings.DYNAMODB_SINGLE_TABLE,
+                board_item(board),
+                condition_expression=Attr("PK").not_exists()
+            )
+            return board
+        except ConditionFailedException:
+            raise ConflictException("Board", board.id)
+        except DatabaseException as e:
+            logger.error(f"Database error creating board {board.id}: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error creating board {board.id}: {str(e)}")
+            raise DatabaseException("create_board", str(e))
+    
+    @staticmethod
+    def update(board: Board) -> Board:
+        """Update a board's title, leaving its counters alone"""
+        return SingleTableBoardRepository.patch(board.id, title=board.title)
+    
+    @staticmethod
+    def patch(board_id: str, **fields) -> Board:
+        """Write only the given fields of a board and return the whole board as stored"""
+        try:
+            # Only write if the board already exists
+            item = storage.set_attributes(
+                settings.DYNAMODB_SINGLE_TABLE,
+                board_key(board_id),
+                board_attributes(fields),
+                condition_expression=Attr("PK").exists()
+            )
+            return Board.from_dict(item)
+        except ConditionFailedException:
+            raise NotFoundException("Board", board_id)
+        except DatabaseException as e:
+            logger.error(f"Database error updating board {board_id}: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error updating board {board_id}: {str(e)}")
+            raise DatabaseException("update_board", str(e))
+    
+    @staticmethod
+    def add_to_counters(board_id: str, **deltas: int) -> Optional[Board]:
+        """Atomically adjust a board's counters, returning the board as updated or None if it is gone"""
+        try:
+            # The condition stops a late update from recreating a deleted board
+            item = storage.add_to_attributes(
+                settings.DYNAMODB_SINGLE_TABLE,
+                board_key(board_id),
+                board_attributes(deltas, BOARD_COUNTERS),
+                condition_expression=Attr("PK").exists()
+            )
+            return Board.from_dict(item)
+        except ConditionFailedException:
+            return None
+    
+    @staticmethod
+    def delete(board_id: str) -> bool:
+        """Delete a board"""
+        try:
+            # Only delete if the board exists, so a missing board is reported
+            storage.delete_item(
+                settings.DYNAMODB_SINGLE_TABLE,
+                board_key(board_id),
+                condition_expression=Attr("PK").exists()
+            )
+            return True
+        except ConditionFailedException:
+            raise NotFoundException("Board", board_id)
+        except DatabaseException as e:
+            logger.error(f"Database error deleting board {board_id}: {e.message}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error deleting board {board_id}: {str(e)}")
+            raise DatabaseException("delete_board", str(e))
+    
+    @staticmethod
+    def save_many(boards: List[Board]) -> List[Board]:
+        """Create or overwrite several boards in batched writes"""
+        storage.batch_write(settings.DYNAMODB_SINGLE_TABLE, put_items=[board_item(board) for board in boards])
+        return boards
+    
+    @staticmethod
+    def delete_many(board_ids: List[str]) -> int:
+        """Delete several boards in batched writes, returning how many were deleted"""
+        return storage.batch_write(
+            settings.DYNAMODB_SINGLE_TABLE,
+            delete_keys=[board_key(board_id) for board_id in board_ids]
+        )
+
+class SingleTableColumnRepository:
+    """Repository for Column data access using the single-table layout"""
+    
+    @staticmethod
+    def get_all(attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get all columns"""
+        return list(SingleTableColumnRepository.iter_all(attributes=attributes))
+    
+    @staticmethod
+    def iter_all(page_size: Optional[int] = None, attributes: Optional[List[str]] = None) -> Iterator[Column]:
+        """Stream all columns one page at a time"""
+        for item in _iter_type(COLUMN_TYPE, page_size, attributes):
+            yield Column.from_dict(item)
+    
+    @staticmethod
+    def get_by_id(column_id: str, attributes: Optional[List[str]] = None) -> Optional[Column]:
+        """Get a column by ID"""
+        item = _locate(column_id, attributes)
+        if item:
+            return Column.from_dict(item)
+        return None
+    
+    @staticmethod
+    def get_many(column_ids: List[str], attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get several columns by ID, in the order requested"""
+        # Sort keys embed the position, so columns can only be found by ID through the index
+        items = _locate_many(column_ids, attributes)
+        return [Column.from_dict(items[column_id]) for column_id in column_ids if column_id in items]
+    
+    @staticmethod
+    def get_by_board_id(board_id: str, attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get all columns for a specific board, sorted by position"""
+        items = storage.query(
+            settings.DYNAMODB_SINGLE_TABLE,
+            Key("PK").eq(f"BOARD#{board_id}") & Key("SK").begins_with("COL#"),
+            attributes=attributes
+        )
+        return [Column.from_dict(item) for item in items]
+    
+    @staticmethod
+    def get_page_by_board_id(board_id: str, count: int, after: Optional[Dict[str, Any]] = None,
+                             attributes: Optional[List[str]] = None) -> Page:
+        """Get up to ``count`` of a board's columns, in position order, following the key ``after``"""
+        return _read_partition_page(f"BOARD#{board_id}", "COL#", count, after, attributes).map(Column.from_dict)
+    
+    @staticmethod
+    def create(column: Column) -> Column:
+        """Create a new column"""
+        storage.put_item(settings.DYNAMODB_SINGLE_TABLE, column_item(column))
+        return column
+    
+    @staticmethod
+    def update(column: Column) -> Column:
+        """Update a column, moving its item when the position changed"""
+        _replace_item("Column", _locate(column.id), column_item(column))
+        return column
+    
+    @staticmethod
+    def patch(column_id: str, **fields) -> Column:
+        """Write only the given fields of a column, moving its item when the position changed"""
+        attributes = column_attributes(fields)
+        for attempt in range(1, MOVE_ATTEMPTS + 1):
+            # Sort keys embed the position, so the item has to be found through the index first
+            stale = _locate(column_id)
+            if not stale:
+                raise NotFoundException("Column", column_id)
+            if not attributes:
+                return Column.from_dict(stale)
+            fresh = column_item(Column.from_dict({**stale, **attributes}))
+            try:
+                return Column.from_dict(_patch_item("Column", stale, fresh, attributes))
+            except ConcurrentModificationException:
+                # Usually a card count changed mid-move; nothing else depends on where the column was
+                if attempt == MOVE_ATTEMPTS:
+                    raise
+                logger.warning(f"Column {column_id} changed while moving; retrying (attempt {attempt})")
+    
+    @staticmethod
+    def add_to_counters(column_id: str, **deltas: int) -> Optional[Column]:
+        """Atomically adjust a column's counters, returning the column as updated or None if it is gone"""
+        attributes = column_attributes(deltas, COLUMN_COUNTERS)
+        # A column that moves between the lookup and the update has a new key, so look it up once more
+        for _ in range(2):
+            item = _locate(column_id, ["PK", "SK"])
+            if not item:
+                return None
+            try:
+                # The condition stops a late update from recreating a deleted column
+                return Column.from_dict(storage.add_to_attributes(
+                    settings.DYNAMODB_SINGLE_TABLE,
+                    _item_key(item),
+                    attributes,
+                    condition_expression=Attr("PK").exists()
+                ))
+            except ConditionFailedException:
+                continue
+        return None
+    
+    @staticmethod
+    def delete(column_id: str) -> bool:
+        """Delete a column, reporting one that is already gone"""
+        item = _locate(column_id, ["PK", "SK"])
+        if not item:
+            raise NotFoundException("Column", column_id)
+        try:
+            # Of two concurrent deletes only one succeeds, so counters are decremented once
+            storage.delete_item(settings.DYNAMODB_SINGLE_TABLE, _item_key(item), condition_expression=Attr("PK").exists())
+        except ConditionFailedException:
+            raise NotFoundException("Column", column_id)
+        return True
+    
+    @staticmethod
+    def save_many(columns: List[Column]) -> List[Column]:
+        """Create or overwrite several columns in batched writes"""
+        stale = list(_locate_many(column.id for column in columns).values())
+        _replace_items("Column", stale, [column_item(column) for column in columns])
+        return columns
+    
+    @staticmethod
+    def delete_many(column_ids: List[str]) -> int:
+        """Delete several columns in batched writes, returning how many were deleted"""
+        items = _locate_many(column_ids, ["PK", "SK"]).values()
+        return storage.batch_write(
+            settings.DYNAMODB_SINGLE_TABLE,
+            delete_keys=[_item_key(item) for item in items]
+        )
+
+class SingleTableCardRepository:
+    """Repository for Card data access using the single-table layout"""
+    
+    @staticmethod
+    def get_all(attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get all cards"""
+        return list(SingleTableCardRepository.iter_all(attributes=attributes))
+    
+    @staticmethod
+    def iter_all(page_size: Optional[int] = None, attributes: Optional[List[str]] = None) -> Iterator[Card]:
+        """Stream all cards one page at a time"""
+        for item in _iter_type(CARD_TYPE, page_size, attributes):
+            yield Card.from_dict(item)
+    
+    @staticmethod
+    def get_by_id(card_id: str, attributes: Optional[List[str]] = None) -> Optional[Card]:
+        """Get a card by ID"""
+        item = _locate(card_id, attributes)
+        if item:
+            return Card.from_dict(item)
+        return None
+    
+    @staticmethod
+    def get_many(card_ids: List[str], attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get several cards by ID, in the order requested"""
+        # Sort keys embed the position, so cards can only be found by ID through the index
+        items = _locate_many(card_ids, attributes)
+        return [Card.from_dict(items[card_id]) for card_id in card_ids if card_id in items]
+    
+    @staticmethod
+    def get_by_column_id(column_id: str, attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get all cards for a specific column, sorted by position"""
+        column = _locate(column_id, ["PK"])
+        if not column:
+            return []
+        items = storage.query(
+            settings.DYNAMODB_SINGLE_TABLE,
+            Key("PK").eq(column["PK"]) & Key("SK").begins_with(f"CARD#{column_id}#"),
+            attributes=attributes
+        )
+        return [Card.from_dict(item) for item in items]
+    
+    @staticmethod
+    def iter_by_column(column_id: str, board_id: str, page_size: Optional[int] = None) -> Iterator[Card]:
+        """Stream a column's cards in position order, one page of its key range at a time"""
+        for item in storage.iter_query(
+            settings.DYNAMODB_SINGLE_TABLE,
+            Key("PK").eq(f"BOARD#{board_id}") & Key("SK").begins_with(f"CARD#{column_id}#"),
+            limit=page_size
+        ):
+            yield Card.from_dict(item)
+    
+    @staticmethod
+    def get_page_by_column_id(column_id: str, board_id: Optional[str], count: int,
+                              after: Optional[Dict[str, Any]] = None,
+                              attributes: Optional[List[str]] = None) -> Page:
+        """Get up to ``count`` of a column's cards, in position order, following the key ``after``
+        
+        The column's board is looked up when ``board_id`` isn't given.
+        """
+        if board_id is None:
+            column = _locate(column_id, ["boardId"])
+            if not column:
+                return Page([], [], False)
+            board_id = column["boardId"]
+        return _read_partition_page(f"BOARD#{board_id}", f"CARD#{column_id}#", count, after, attributes).map(Card.from_dict)
+    
+    @staticmethod
+    def get_by_columns(columns: List[Tuple[str, str]], attributes: Optional[List[str]] = None) -> Dict[str, List[Card]]:
+        """Get the cards of several columns, given as (board ID, column ID) pairs, keyed by column ID
+        
+        Each board's partition is queried once, however many of its columns
+        are asked for.
+        """
+        cards: Dict[str, List[Card]] = {column_id: [] for _, column_id in columns}
+        column_ids_by_board: Dict[str, Set[str]] = {}
+        for board_id, column_id in columns:
+            column_ids_by_board.setdefault(board_id, set()).add(column_id)
+        if attributes is not None:
+            attributes = sorted({"columnId", *attributes})
+        
+        for board_id, column_ids in column_ids_by_board.items():
+            # A lone column only needs its own key range
+            prefix = f"CARD#{next(iter(column_ids))}#" if len(column_ids) == 1 else "CARD#"
+            for item in storage.iter_query(
+                settings.DYNAMODB_SINGLE_TABLE,
+                Key("PK").eq(f"BOARD#{board_id}") & Key("SK").begins_with(prefix),
+                attributes=attributes
+            ):
+                if item["columnId"] in column_ids:
+                    cards[item["columnId"]].append(Card.from_dict(item))
+        return cards
+    
+    @staticmethod
+    def get_last_position(column_id: str) -> Optional[str]:
+        """Position of the last card in a column, read as a single item from the end of its key range"""
+        column = _locate(column_id, ["PK"])
+        if not column:
+            return None
+        items = storage.iter_query(
+            settings.DYNAMODB_SINGLE_TABLE,
+            Key("PK").eq(column["PK"]) & Key("SK").begins_with(f"CARD#{column_id}#"),
+            limit=1,
+            attributes=["position"],
+            scan_forward=False
+        )
+        item = next(items, None)
+        return item["position"] if item else None
+    
+    @staticmethod
+    def create(card: Card) -> Card:
+        """Create a new card"""
+        item = card_item(card, _board_id_of_column(card.column_id))
+        storage.put_item(settings.DYNAMODB_SINGLE_TABLE, item)
+        return card
+    
+    @staticmethod
+    def update(card: Card) -> Card:
+        """Update a card, moving its item when the column or position changed"""
+        item = card_item(card, _board_id_of_column(card.column_id))
+        _replace_item("Card", _locate(card.id), item)
+        return card
+    
+    @staticmethod
+    def patch(card_id: str, **fields) -> Card:
+        """Write only the given fields of a card, moving its item when the column or position changed"""
+        attributes = card_attributes(fields)
+        # Sort keys embed the column and position, so the item has to be found through the index first
+        stale = _locate(card_id)
+        if not stale:
+            raise NotFoundException("Card", card_id)
+        if not attributes:
+            return Card.from_dict(stale)
+        card = Card.from_dict({**stale, **attributes})
+        board_id = stale["boardId"]
+        if card.column_id != stale["columnId"]:
+            board_id = _board_id_of_column(card.column_id)
+        fresh = card_item(card, board_id)
+        return Card.from_dict(_patch_item("Card", stale, fresh, attributes))
+    
+    @staticmethod
+    def delete(card_id: str) -> bool:
+        """Delete a card, reporting one that is already gone"""
+        item = _locate(card_id, ["PK", "SK"])
+        if not item:
+            raise NotFoundException("Card", card_id)
+        try:
+            # Of two concurrent deletes only one succeeds, so counters are decremented once
+            storage.delete_item(settings.DYNAMODB_SINGLE_TABLE, _item_key(item), condition_expression=Attr("PK").exists())
+        except ConditionFailedException:
+            raise NotFoundException("Card", card_id)
+        return True
+    
+    @staticmethod
+    def iter_delete_by_column(column_id: str, board_id: str, chunk_size: int) -> Iterator[int]:
+        """Delete every card in a column a chunk at a time, yielding how many each chunk removed
+        
+        Only the keys are read, straight from the board's partition, so the
+        column item itself may already be gone.
+        """
+        items = storage.iter_query(
+            settings.DYNAMODB_SINGLE_TABLE,
+            Key("PK").eq(f"BOARD#{board_id}") & Key("SK").begins_with(f"CARD#{column_id}#"),
+            limit=chunk_size,
+            attributes=["PK", "SK"]
+        )
+        while True:
+            keys = [_item_key(item) for item in islice(items, chunk_size)]
+            if not keys:
+                break
+            yield storage.batch_write(settings.DYNAMODB_SINGLE_TABLE, delete_keys=keys)
+    
+    @staticmethod
+    def create_many(cards: List[Card]) -> List[Card]:
+        """Create several new cards in batched writes, looking up the columns' boards together"""
+        boards = _boards_of_columns(card.column_id for card in cards)
+        storage.batch_write(
+            settings.DYNAMODB_SINGLE_TABLE,
+            put_items=[card_item(card, _board_id_of_column(card.column_id, boards)) for card in cards]
+        )
+        return cards
+    
+    @staticmethod
+    def save_many(cards: List[Card]) -> List[Card]:
+        """Create or overwrite several cards in batched writes"""
+        boards = _boards_of_columns(card.column_id for card in cards)
+        stale = list(_locate_many(card.id for card in cards).values())
+        fresh = [card_item(card, _board_id_of_column(card.column_id, boards)) for card in cards]
+        _replace_items("Card", stale, fresh)
+        return cards
+    
+    @staticmethod
+    def delete_many(card_ids: List[str]) -> int:
+        """Delete several cards in batched writes, returning how many were deleted"""
+        items = _locate_many(card_ids, ["PK", "SK"]).values()
+        return storage.batch_write(
+            settings.DYNAMODB_SINGLE_TABLE,
+            delete_keys=[_item_key(item) for item in items]
+        )
+    
+    @staticmethod
+    def delete_existing(card_ids: List[str]) -> List[bool]:
+        """Delete several cards in shared transactions, returning whether each still existed to be deleted"""
+        items = _locate_many(card_ids, ["PK", "SK"])
+        found = [card_id for card_id in card_ids if card_id in items]
+        groups = [
+            [{
+                'Delete': {
+                    'TableName': settings.DYNAMODB_SINGLE_TABLE,
+                    'Key': _item_key(items[card_id]),
+                    'ConditionExpression': Attr("PK").exists()
+                }
+            }]
+            for card_id in found
+        ]
+        deleted = {card_id for card_id, written in zip(found, storage.transact_write_each(groups, resource_type="Card"))
+                   if written}
+        return [card_id in deleted for card_id in card_ids]
+    
+    @staticmethod
+    def reorder(moves: List[Tuple[Card, str, str]]) -> List[Card]:
+        """Atomically move several cards to new columns and positions
+        
+        Each move is ``(card, expected_column_id, expected_position)``. The card's
+        old item is deleted on the condition that it still exists at that
+        position with the card's title and description, and its new item is
+        written in the same transaction, so a concurrent edit is never reverted.
+        Moves that don't fit in one transaction are split between several,
+        but a card's delete and put always share one.
+        """
+        boards = _boards_of_moves(moves)
+        transactions = [[]]
+        for move in moves:
+            operations = _card_move_operations(*move, boards)
+            if len(transactions[-1]) + len(operations) > TRANSACT_WRITE_LIMIT:
+                transactions.append([])
+            transactions[-1].extend(operations)
+        
+        if len(transactions) > 1:
+            # Rebalancing a very long column can't fit in one transaction; each one stays atomic
+            logger.warning(f"Repositioning {len(moves)} cards across {len(transactions)} transactions")
+        for operations in transactions:
+            storage.transact_write(operations, resource_type="Card")
+        return [card for card, _, _ in moves]
+    
+    @staticmethod
+    def move_each(moves: List[Tuple[Card, str, str]]) -> List[bool]:
+        """Move several cards' items, returning whether each was moved
+        
+        Moves are given like ``reorder``'s and share transactions, but a card
+        that changed since it was read only fails its own move.
+        """
+        boards = _boards_of_moves(moves)
+        return storage.transact_write_each(
+            [_card_move_operations(*move, boards) for move in moves], resource_type="Card"
+        )
+    
+    @staticmethod
+    def patch_many(patches: List[Tuple[Card, Dict[str, Any]]]) -> List[Optional[Card]]:
+        """Write only the given fields of several cards in shared transactions
+        
+        Each patch is ``(card, fields)``. The items are found through the id
+        index together, and an item whose key changes is moved. Returns, for
+        each patch in turn, the card as written, or None if the card no longer
+        exists.
+        """
+        stale_items = _locate_many(card.id for card, _ in patches)
+        patched = [{**stale_items[card.id], **card_attributes(fields)} if card.id in stale_items else None
+                   for card, fields in patches]
+        boards = _boards_of_columns(
+            item["columnId"] for item in patched if item and item["columnId"] != stale_items[item["id"]]["columnId"]
+        )
+        groups, members = [], []
+        for index, ((card, fields), item) in enumerate(zip(patches, patched)):
+            if item is None:
+                continue
+            stale = stale_items[card.id]
+            board_id = stale["boardId"]
+            if item["columnId"] != stale["columnId"]:
+                board_id = _board_id_of_column(item["columnId"], boards)
+            fresh = card_item(Card.from_dict(item), board_id)
+            if _item_key(stale) == _item_key(fresh):
+                groups.append([set_attributes_operation(
+                    settings.DYNAMODB_SINGLE_TABLE, _item_key(stale), card_attributes(fields), Attr("PK").exists()
+                )])
+            else:
+                fresh = {**fresh, **{name: stale[name] for name in MOVE_GUARDED_ATTRIBUTES if name in stale}}
+                groups.append(_move_operations(stale, fresh))
+            members.append(index)
+        for index, written in zip(members, storage.transact_write_each(groups, resource_type="Card")):
+            if not written:
+                patched[index] = None
+        return [Card.from_dict(item) if item else None for item in patched]
@@ -0,0 +1,17 @@
+"""The storage engine selected by ``STORAGE_ENGINE``"""
+
+from src.core.config import settings
+from src.db.engine import StorageEngine
+
+def create_storage_engine() -> StorageEngine:
+    """Build the configured storage engine"""
+    if settings.STORAGE_ENGINE == "dynamodb":
+        from src.db.dynamodb import DynamoDBClient
+        return DynamoDBClient()
+    if settings.STORAGE_ENGINE == "memory":
+        from src.db.memory import InMemoryEngine
+        return InMemoryEngine()
+    raise ValueError(f"Unknown STORAGE_ENGINE '{settings.STORAGE_ENGINE}'")
+
+# Create the global storage engine instance
+storage = create_storage_engine()
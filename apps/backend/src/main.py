@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.core.config import settings
 from src.api.router import router as api_router
 from src.db.init_db import init_database
+from src.core.executor import shutdown_executor
 import logging
 
 # Configure logging
@@ -31,6 +32,11 @@ async def startup_db_client():
     except Exception as e:
         logger.error(f"Error initializing DynamoDB: {e}")
 
+# Let in-flight resolvers finish before the worker exits
+@app.on_event("shutdown")
+async def shutdown_resolver_executor():
+    shutdown_executor()
+
 # Include API router
 app.include_router(api_router)
 
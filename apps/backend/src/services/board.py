@@ -1,7 +1,14 @@
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from src.db.models.board import Board
-from src.db.repositories.board import BoardRepository
+from src.db.models.column import Column
+from src.db.engine import Page
+from src.db.repositories.registry import BoardRepository, ColumnRepository
+from src.services.card import CardService
 from src.core.exceptions import ValidationException
+from src.core.cache import cache, board_group, cache_variant, invalidate_boards
+from src.core.jobs import Job, jobs
+from src.core.versions import bump_boards
+from src.core.ranking import number_by_position
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,32 +21,68 @@ class BoardService:
         """Get all boards"""
         return BoardRepository.get_all()
     
+    @staticmethod
+    def iter_all_boards() -> Iterator[Board]:
+        """Stream all boards without holding the whole table in memory"""
+        return BoardRepository.iter_all()
+    
+    @staticmethod
+    def get_boards_page(count: int, after: Optional[Dict[str, Any]] = None) -> Page:
+        """Get a page of boards, starting after the key ``after``"""
+        return BoardRepository.get_page(count, after)
+    
     @staticmethod
     def get_board_by_id(board_id: str) -> Board:
         """Get a board by ID"""
         if not board_id:
             raise ValidationException("Board ID is required")
-            
-        return BoardRepository.get_by_id(board_id)
+        
+        item = cache.get_or_load(
+            board_group(board_id),
+            cache_variant("board"),
+            lambda: BoardRepository.get_by_id(board_id).to_dict()
+        )
+        return Board.from_dict(item)
+    
+    @staticmethod
+    def get_boards_by_ids(board_ids: List[str]) -> List[Board]:
+        """Get several boards by ID, skipping any that don't exist"""
+        return BoardRepository.get_many(board_ids)
+    
+    @staticmethod
+    def get_board_stats(board_id: str) -> Tuple[Board, List[Column]]:
+        """Get a board and its columns in order, with their maintained counters
+        
+        Both are read past the cache, whose entries are not invalidated by
+        counter updates, so the counts are as fresh as the table.
+        """
+        if not board_id:
+            raise ValidationException("Board ID is required")
+        
+        board = BoardRepository.get_by_id(board_id)
+        columns = ColumnRepository.get_by_board_id(
+            board_id, attributes=["boardId", "cardCount", "id", "position", "title"]
+        )
+        return board, number_by_position(columns)
     
     @staticmethod
     def create_board(board: Board) -> Board:
         """Create a new board"""
         if not board:
             raise ValidationException("Board data is required")
-            
+        
         if not board.title:
             raise ValidationException("Board title is required")
-            
+        
         # Trim the title
         board.title = board.title.strip()
         
         if len(board.title) < 1:
             raise ValidationException("Board title cannot be empty")
-            
+        
         if len(board.title) > 100:
             raise ValidationException("Board title cannot exceed 100 characters")
-            
+        
         logger.info(f"Creating new board with ID {board.id}")
         return BoardRepository.create(board)
     
@@ -48,22 +91,22 @@ class BoardService:
         """Update an existing board"""
         if not board:
             raise ValidationException("Board data is required")
-            
+        
         if not board.id:
             raise ValidationException("Board ID is required")
-            
+        
         if not board.title:
             raise ValidationException("Board title is required")
-            
+        
         # Trim the title
         board.title = board.title.strip()
         
         if len(board.title) < 1:
             raise ValidationException("Board title cannot be empty")
-            
+        
         if len(board.title) > 100:
             raise ValidationException("Board title cannot exceed 100 characters")
-            
+        
         logger.info(f"Updating board with ID {board.id}")
         return BoardRepository.update(board)
     
@@ -72,6 +115,23 @@ class BoardService:
         """Delete a board"""
         if not board_id:
             raise ValidationException("Board ID is required")
-            
+        
         logger.info(f"Deleting board with ID {board_id}")
         return BoardRepository.delete(board_id)
+    
+    @staticmethod
+    def delete_board_contents(board_id: str) -> Job:
+        """Start a background job that deletes the columns and cards of a deleted board"""
+        return jobs.start("DELETE_BOARD", board_id, lambda job: BoardService._delete_contents(job, board_id))
+    
+    @staticmethod
+    def _delete_contents(job: Job, board_id: str):
+        columns = ColumnRepository.get_by_board_id(board_id, attributes=["boardId", "id", "position"])
+        try:
+            for column in columns:
+                CardService.delete_cards_by_column(column.id, board_id, job.advance)
+            # Columns go last, so cards left behind by a failed job can still be found through them
+            job.advance(ColumnRepository.delete_many([column.id for column in columns]))
+        finally:
+            invalidate_boards(board_id)
+            bump_boards(board_id)
@@ -1,31 +1,122 @@
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from src.db.models.card import Card
-from src.db.repositories.card import CardRepository
+from src.db.engine import TRANSACT_WRITE_LIMIT, Page
+from src.db.repositories.registry import BoardRepository, ColumnRepository, CardRepository
+from src.core.cache import cache, column_group, cache_variant, invalidate_columns, MISSING
+from src.core.config import settings
+from src.core.exceptions import (
+    KanladinException,
+    NotFoundException,
+    ValidationException,
+    ConcurrentModificationException
+)
+from src.core.executor import run_in_background
+from src.core.versions import bump_boards
+from src.core.ranking import (
+    position_at,
+    position_between,
+    positions_for_inserts,
+    rebalance_plan,
+    needs_rebalance,
+    number_by_position
+)
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Attributes needed to place a card among its neighbours, sorted like GraphQL projections
+# so that both share one cache entry
+CARD_POSITION_ATTRIBUTES = ["columnId", "id", "position"]
+
+# Cards written per transaction by bulk updates and deletes; a moved card can take two operations
+BULK_WRITE_CHUNK = TRANSACT_WRITE_LIMIT // 2
+
+# A rebalance that loses a race with a card move starts over from a fresh read this many times
+REBALANCE_ATTEMPTS = 3
+
+# Columns being rebalanced in this process; a rebalance waits for or skips one already running
+_rebalancing = set()
+_rebalanced = threading.Condition()
 
 class CardService:
     """Service for Card business logic"""
     
     @staticmethod
-    def get_all_cards() -> List[Card]:
-        """Get all cards sorted by order"""
-        cards = CardRepository.get_all()
-        return sorted(cards, key=lambda card: card.order)
+    def get_all_cards(attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get all cards, grouped by column and sorted by position"""
+        cards = CardRepository.get_all(attributes=attributes)
+        return number_by_position(cards, parent=lambda card: card.column_id)
     
     @staticmethod
-    def get_card_by_id(card_id: str) -> Optional[Card]:
+    def get_card_by_id(card_id: str, attributes: Optional[List[str]] = None) -> Optional[Card]:
         """Get a card by ID"""
-        return CardRepository.get_by_id(card_id)
+        return CardRepository.get_by_id(card_id, attributes=attributes)
+    
+    @staticmethod
+    def get_cards_by_ids(card_ids: List[str], attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get several cards by ID, skipping any that don't exist"""
+        return CardRepository.get_many(card_ids, attributes=attributes)
+    
+    @staticmethod
+    def get_cards_by_column_id(column_id: str, attributes: Optional[List[str]] = None) -> List[Card]:
+        """Get all cards for a specific column, sorted by position"""
+        # The column index already returns cards in order
+        items = cache.get_or_load(
+            column_group(column_id),
+            cache_variant("cards", attributes),
+            lambda: [card.to_dict() for card in CardRepository.get_by_column_id(column_id, attributes=attributes)]
+        )
+        # Cached items are copied into fresh models so callers can modify them
+        return number_by_position([Card.from_dict(item) for item in items])
     
     @staticmethod
-    def get_cards_by_column_id(column_id: str) -> List[Card]:
-        """Get all cards for a specific column, sorted by order"""
-        cards = CardRepository.get_by_column_id(column_id)
-        return sorted(cards, key=lambda card: card.order)
+    def get_cards_page(column_id: str, board_id: Optional[str], count: int, after: Optional[Dict[str, Any]] = None,
+                       attributes: Optional[List[str]] = None) -> Page:
+        """Get a page of a column's cards, sorted by position, starting after the key ``after``"""
+        # Pages start wherever a client's cursor says, so they are read past the cache
+        return CardRepository.get_page_by_column_id(column_id, board_id, count, after, attributes=attributes)
     
     @staticmethod
-    def create_card(card: Card) -> Card:
-        """Create a new card"""
-        return CardRepository.create(card)
+    def get_cards_by_columns(columns: List[Tuple[str, str]], attributes: Optional[List[str]] = None) -> List[List[Card]]:
+        """Get the cards of several columns, given as (board ID, column ID) pairs, each sorted by position
+        
+        Columns whose cards are cached are served from the cache; the rest are
+        read together and cached per column.
+        """
+        variant = cache_variant("cards", attributes)
+        items = {column_id: cache.peek(column_group(column_id), variant) for _, column_id in columns}
+        missing = [(board_id, column_id) for board_id, column_id in columns if items[column_id] is MISSING]
+        if missing:
+            generations = {column_id: cache.generation(column_group(column_id)) for _, column_id in missing}
+            loaded = CardRepository.get_by_columns(missing, attributes=attributes)
+            for _, column_id in missing:
+                items[column_id] = [card.to_dict() for card in loaded.get(column_id, [])]
+                cache.put(column_group(column_id), variant, items[column_id], generations[column_id])
+        return [number_by_position([Card.from_dict(item) for item in items[column_id]]) for _, column_id in columns]
+    
+    @staticmethod
+    def get_card_order(card_id: str, column_id: str) -> Optional[int]:
+        """Index of a card within its column, or None if it isn't there"""
+        for card in CardService.get_cards_by_column_id(column_id, attributes=CARD_POSITION_ATTRIBUTES):
+            if card.id == card_id:
+                return card.order
+        return None
+    
+    @staticmethod
+    def create_card(card: Card, order: Optional[int] = None) -> Card:
+        """Create a new card at ``order`` within its column, or at the end"""
+        if order is None:
+            # Appending only needs the last card's position, not the whole column
+            card.position = position_between(CardRepository.get_last_position(card.column_id), None)
+        else:
+            positions = CardService._sibling_positions(card.column_id)
+            card.order = max(0, min(order, len(positions)))
+            card.position = CardService._position_at(card.column_id, positions, card.order)
+        created_card = CardRepository.create(card)
+        CardService.count_cards(created_card.column_id, 1)
+        CardService._rebalance_if_needed(created_card)
+        return created_card
     
     @staticmethod
     def update_card(card: Card) -> Card:
@@ -33,6 +124,357 @@ class CardService:
         return CardRepository.update(card)
     
     @staticmethod
-    def delete_card(card_id: str) -> bool:
-        """Delete a card"""
-        return CardRepository.delete(card_id)
+    def patch_card(card_id: str, **fields) -> Card:
+        """Update only the given fields of a card"""
+        return CardRepository.patch(card_id, **fields)
+    
+    @staticmethod
+    def update_cards(cards: List[Card]) -> List[Card]:
+        """Update several existing cards in batched writes"""
+        return CardRepository.save_many(cards)
+    
+    @staticmethod
+    def move_card(card: Card, column_id: str, order: Optional[int] = None) -> Card:
+        """Move a card to index ``order`` of a column, or to its end, writing only that card
+        
+        The card gets a new position between its new neighbours. The write is
+        conditioned on the card still being where it was read, so a concurrent
+        move of the same card fails instead of being overwritten.
+        """
+        if order is None and card.column_id == column_id:
+            # Nothing to move
+            return card
+        siblings = CardService._sibling_positions(column_id, exclude=[card.id])
+        order = len(siblings) if order is None else max(0, min(order, len(siblings)))
+        before = siblings[order - 1] if order > 0 else None
+        after = siblings[order] if order < len(siblings) else None
+        if (card.column_id == column_id and card.position is not None
+                and (before is None or before < card.position) and (after is None or card.position < after)):
+            # Already between the right neighbours
+            card.order = order
+            return card
+        
+        expected_column_id, expected_position = card.column_id, card.position
+        card.column_id = column_id
+        card.position = CardService._position_at(column_id, siblings, order, exclude=card.id)
+        card.order = order
+        CardService.reorder_cards([(card, expected_column_id, expected_position)])
+        if expected_column_id != column_id:
+            CardService.count_cards(expected_column_id, -1)
+            CardService.count_cards(column_id, 1)
+        CardService._rebalance_if_needed(card)
+        return card
+    
+    @staticmethod
+    def reorder_cards(moves: List[Tuple[Card, str, str]]) -> List[Card]:
+        """Atomically apply card moves given as (card, expected_column_id, expected_position)"""
+        return CardRepository.reorder(moves)
+    
+    @staticmethod
+    def rebalance_column(column_id: str, wait: bool = True) -> int:
+        """Respread the positions of a column's cards evenly, returning how many cards were rewritten
+        
+        Only one rebalance of a column runs at a time in this process: another
+        one waits for it to finish, or returns 0 straight away if ``wait`` is
+        False. Long columns are written in several transactions, ordered so
+        the column stays sorted in between; if a card moves meanwhile, the
+        rebalance starts over from a fresh read.
+        """
+        with _rebalanced:
+            while column_id in _rebalancing:
+                if not wait:
+                    return 0
+                _rebalanced.wait()
+            _rebalancing.add(column_id)
+        
+        rewritten = 0
+        try:
+            for attempt in range(1, REBALANCE_ATTEMPTS + 1):
+                # Read past the cache: the moves are conditioned on the stored positions
+                cards = CardRepository.get_by_column_id(column_id)
+                moves = []
+                for index, position in rebalance_plan([card.position for card in cards]):
+                    card = cards[index]
+                    moves.append((card, card.column_id, card.position))
+                    card.position = position
+                try:
+                    CardService.reorder_cards(moves)
+                    rewritten = len(moves)
+                    break
+                except ConcurrentModificationException:
+                    if attempt == REBALANCE_ATTEMPTS:
+                        raise
+                    logger.warning(f"Cards in column {column_id} moved during a rebalance; retrying (attempt {attempt})")
+        finally:
+            with _rebalanced:
+                _rebalancing.discard(column_id)
+                _rebalanced.notify_all()
+            invalidate_columns(column_id)
+            column = ColumnRepository.get_by_id(column_id, attributes=["boardId", "id"])
+            if column:
+                bump_boards(column.board_id)
+        logger.info(f"Rebalanced {rewritten} card positions in column {column_id}")
+        return rewritten
+    
+    @staticmethod
+    def delete_card(card: Card) -> bool:
+        """Delete a card and take it off its column's and board's counts"""
+        CardRepository.delete(card.id)
+        CardService.count_cards(card.column_id, -1)
+        return True
+    
+    @staticmethod
+    def create_cards(cards: List[Tuple[Card, Optional[int]]]) -> Tuple[List[Union[Card, KanladinException]], Dict[str, str]]:
+        """Create several cards, each given with the index to insert it at in its column, or None for the end
+        
+        Parent columns are checked with one read, each column's positions are
+        read once and assigned in one pass, and the cards are written in
+        batches. Returns, for each card in turn, the created card or the error
+        that kept it out, along with the board ID of every column written to.
+        """
+        results: List[Union[Card, KanladinException, None]] = [None] * len(cards)
+        boards = CardService._boards_of_columns(card.column_id for card, _ in cards)
+        indexes_by_column: Dict[str, List[int]] = {}
+        for index, (card, _) in enumerate(cards):
+            if card.column_id in boards:
+                indexes_by_column.setdefault(card.column_id, []).append(index)
+            else:
+                results[index] = NotFoundException("Column", card.column_id)
+        
+        try:
+            for column_id, indexes in indexes_by_column.items():
+                placed = CardService._place_in_column(column_id, [cards[index][1] for index in indexes])
+                for index, (position, order) in zip(indexes, placed):
+                    card = cards[index][0]
+                    card.position, card.order = position, order
+                    results[index] = card
+            CardRepository.create_many([card for card in results if isinstance(card, Card)])
+        finally:
+            invalidate_columns(*indexes_by_column)
+            bump_boards(*(boards[column_id] for column_id in indexes_by_column))
+        
+        for column_id, indexes in indexes_by_column.items():
+            CardService.count_cards(column_id, len(indexes))
+            CardService._rebalance_column_if_needed(column_id, [results[index] for index in indexes])
+        return results, {column_id: boards[column_id] for column_id in indexes_by_column}
+    
+    @staticmethod
+    def patch_cards(changes: List[Tuple[str, Dict[str, Any], Optional[str], Optional[int]]]
+                    ) -> Tuple[List[Union[Card, KanladinException]], Dict[str, str]]:
+        """Apply changes given as (card ID, fields, column ID, order) to several cards
+        
+        Cards and columns are read with one batched read each. Field changes
+        are written as updates of just those fields, so concurrent edits of
+        other fields survive, in transactions of ``BULK_WRITE_CHUNK`` cards
+        where each update requires its card to still exist. Moves are then
+        written the same way, each conditioned on its card still being where
+        it was read. A card whose condition fails gets its own error and the
+        rest of its transaction is written. A column ID or order moves the
+        card to that index of that column, or to the end. Returns, for each
+        change in turn, the updated card or its error, along with the board
+        ID of every column touched.
+        """
+        results: List[Union[Card, KanladinException, None]] = [None] * len(changes)
+        found = {card.id: card for card in CardRepository.get_many(list({change[0] for change in changes}))}
+        boards = CardService._boards_of_columns(
+            [card.column_id for card in found.values()] + [change[2] for change in changes if change[2]]
+        )
+        edits: List[Tuple[int, Dict[str, Any]]] = []
+        seen = set()
+        for index, (card_id, fields, column_id, order) in enumerate(changes):
+            if card_id in seen:
+                results[index] = ValidationException(f"Card {card_id} is listed more than once")
+                continue
+            seen.add(card_id)
+            card = found.get(card_id)
+            if card is None:
+                results[index] = NotFoundException("Card", card_id)
+                continue
+            if column_id and column_id not in boards:
+                results[index] = NotFoundException("Column", column_id)
+                continue
+            fields = {field: value for field, value in fields.items() if value is not None}
+            if fields:
+                edits.append((index, fields))
+            results[index] = card
+        
+        touched = {card.column_id for card in results if isinstance(card, Card)}
+        deltas: Dict[str, int] = {}
+        indexes_by_column: Dict[str, List[int]] = {}
+        try:
+            for start in range(0, len(edits), BULK_WRITE_CHUNK):
+                chunk = edits[start:start + BULK_WRITE_CHUNK]
+                patched = CardRepository.patch_many([(results[index], fields) for index, fields in chunk])
+                for (index, _), card in zip(chunk, patched):
+                    results[index] = card or NotFoundException("Card", results[index].id)
+            
+            # Moves start from the cards as patched, so they carry the new fields
+            for index, (_, _, column_id, order) in enumerate(changes):
+                card = results[index]
+                if not isinstance(card, Card):
+                    continue
+                target_column_id = column_id or card.column_id
+                if order is not None or target_column_id != card.column_id:
+                    indexes_by_column.setdefault(target_column_id, []).append(index)
+            touched |= set(indexes_by_column)
+            moved_ids = {results[index].id for indexes in indexes_by_column.values() for index in indexes}
+            moves = []
+            for column_id, indexes in indexes_by_column.items():
+                placed = CardService._place_in_column(
+                    column_id, [changes[index][3] for index in indexes], exclude=moved_ids
+                )
+                for index, (position, order) in zip(indexes, placed):
+                    card = results[index]
+                    moves.append((index, card, card.column_id, card.position))
+                    card.column_id, card.position, card.order = column_id, position, order
+            for start in range(0, len(moves), BULK_WRITE_CHUNK):
+                chunk = moves[start:start + BULK_WRITE_CHUNK]
+                moved = CardRepository.move_each([move[1:] for move in chunk])
+                for (index, card, from_column_id, _), written in zip(chunk, moved):
+                    if not written:
+                        results[index] = ConcurrentModificationException("Card")
+                    elif from_column_id != card.column_id:
+                        deltas[from_column_id] = deltas.get(from_column_id, 0) - 1
+                        deltas[card.column_id] = deltas.get(card.column_id, 0) + 1
+        finally:
+            invalidate_columns(*touched)
+            bump_boards(*(boards[column_id] for column_id in touched if column_id in boards))
+            # Counted for every move that was written, even if a later transaction failed
+            for column_id, delta in deltas.items():
+                if delta:
+                    CardService.count_cards(column_id, delta)
+        
+        for column_id, indexes in indexes_by_column.items():
+            CardService._rebalance_column_if_needed(
+                column_id, [results[index] for index in indexes if isinstance(results[index], Card)]
+            )
+        return results, {column_id: boards[column_id] for column_id in touched if column_id in boards}
+    
+    @staticmethod
+    def delete_cards(card_ids: List[str]) -> Tuple[List[Union[Card, KanladinException]], Dict[str, str]]:
+        """Delete several cards and take them off their columns' and boards' counts
+        
+        Cards are read with one batched read and deleted in transactions of
+        ``BULK_WRITE_CHUNK`` cards, each delete on the condition that its card
+        still exists, so a card deleted concurrently by another request is
+        reported as not found and counted off only once.
+        Returns, for each ID in turn, the deleted card or its error, along with
+        the board ID of every column deleted from.
+        """
+        results: List[Union[Card, KanladinException, None]] = [None] * len(card_ids)
+        found = {
+            card.id: card
+            for card in CardRepository.get_many(list(set(card_ids)), attributes=["columnId", "id"])
+        }
+        seen = set()
+        for index, card_id in enumerate(card_ids):
+            if card_id in seen:
+                results[index] = ValidationException(f"Card {card_id} is listed more than once")
+            elif card_id in found:
+                results[index] = found[card_id]
+            else:
+                results[index] = NotFoundException("Card", card_id)
+            seen.add(card_id)
+        boards = CardService._boards_of_columns(card.column_id for card in results if isinstance(card, Card))
+        
+        counts: Dict[str, int] = {}
+        deletes = [(index, card) for index, card in enumerate(results) if isinstance(card, Card)]
+        try:
+            for start in range(0, len(deletes), BULK_WRITE_CHUNK):
+                chunk = deletes[start:start + BULK_WRITE_CHUNK]
+                deleted = CardRepository.delete_existing([card.id for _, card in chunk])
+                for (index, card), written in zip(chunk, deleted):
+                    if not written:
+                        results[index] = NotFoundException("Card", card.id)
+                        continue
+                    counts[card.column_id] = counts.get(card.column_id, 0) + 1
+        finally:
+            invalidate_columns(*counts)
+            bump_boards(*(boards[column_id] for column_id in counts if column_id in boards))
+            for column_id, count in counts.items():
+                CardService.count_cards(column_id, -count)
+        return results, {column_id: boards[column_id] for column_id in counts if column_id in boards}
+    
+    @staticmethod
+    def delete_cards_by_column(column_id: str, board_id: str,
+                               on_progress: Optional[Callable[[int], None]] = None) -> int:
+        """Delete every card in a column in chunks, returning how many were deleted
+        
+        ``on_progress`` is called with the number of cards removed by each chunk.
+        """
+        deleted = 0
+        try:
+            for count in CardRepository.iter_delete_by_column(
+                column_id, board_id, settings.CASCADE_DELETE_CHUNK_SIZE
+            ):
+                deleted += count
+                if on_progress:
+                    on_progress(count)
+        finally:
+            invalidate_columns(column_id)
+            bump_boards(board_id)
+        return deleted
+    
+    @staticmethod
+    def count_cards(column_id: str, delta: int):
+        """Add ``delta`` to the card counts of a column and of its board
+        
+        Counters are updated after the card write rather than in the same
+        transaction, so busy columns don't make card writes conflict.
+        """
+        column = ColumnRepository.add_to_counters(column_id, card_count=delta)
+        if column:
+            BoardRepository.add_to_counters(column.board_id, card_count=delta)
+    
+    @staticmethod
+    def _position_at(column_id: str, positions: List[str], order: int, exclude: Optional[str] = None) -> str:
+        """Position for index ``order`` among a column's positions, rebalancing first if neighbours tie"""
+        try:
+            return position_at(positions, order)
+        except ValueError:
+            # Two cards written concurrently at the same spot share a position
+            CardService.rebalance_column(column_id)
+            positions = CardService._sibling_positions(column_id, exclude=[exclude] if exclude else ())
+            return position_at(positions, min(order, len(positions)))
+    
+    @staticmethod
+    def _sibling_positions(column_id: str, exclude: Iterable[str] = ()) -> List[str]:
+        """Positions of a column's cards in order, leaving out ``exclude``
+        
+        Read past the cache, since new positions are generated between these.
+        """
+        exclude = set(exclude)
+        return [
+            sibling.position
+            for sibling in CardRepository.get_by_column_id(column_id, attributes=CARD_POSITION_ATTRIBUTES)
+            if sibling.id not in exclude
+        ]
+    
+    @staticmethod
+    def _boards_of_columns(column_ids: Iterable[str]) -> Dict[str, str]:
+        """Board IDs of the given columns, read together, leaving out columns that don't exist"""
+        column_ids = list(set(column_ids))
+        if not column_ids:
+            return {}
+        return {column.id: column.board_id for column in ColumnRepository.get_many(column_ids, attributes=["boardId", "id"])}
+    
+    @staticmethod
+    def _place_in_column(column_id: str, orders: List[Optional[int]], exclude: Iterable[str] = ()) -> List[Tuple[str, int]]:
+        """Positions and indexes for new cards inserted at ``orders`` in a column, in one pass"""
+        exclude = set(exclude)
+        try:
+            return positions_for_inserts(CardService._sibling_positions(column_id, exclude), orders)
+        except ValueError:
+            # Two cards written concurrently at the same spot share a position
+            CardService.rebalance_column(column_id)
+            return positions_for_inserts(CardService._sibling_positions(column_id, exclude), orders)
+    
+    @staticmethod
+    def _rebalance_column_if_needed(column_id: str, cards: List[Card]):
+        if any(needs_rebalance(card.position) for card in cards):
+            run_in_background(CardService.rebalance_column, column_id, wait=False)
+    
+    @staticmethod
+    def _rebalance_if_needed(card: Card):
+        if needs_rebalance(card.position):
+            run_in_background(CardService.rebalance_column, card.column_id, wait=False)
@@ -1,31 +1,104 @@
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 from src.db.models.column import Column
-from src.db.repositories.column import ColumnRepository
+from src.db.engine import Page
+from src.db.repositories.registry import BoardRepository, ColumnRepository
+from src.services.card import CardService
+from src.core.cache import cache, board_group, cache_variant, invalidate_boards, MISSING
+from src.core.exceptions import NotFoundException
+from src.core.executor import run_in_background
+from src.core.jobs import Job, jobs
+from src.core.versions import bump_boards
+from src.core.ranking import (
+    position_at,
+    positions_for_order,
+    spread_positions,
+    needs_rebalance,
+    number_by_position
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Attributes needed to place a column among its neighbours, sorted like GraphQL projections
+# so that both share one cache entry
+COLUMN_POSITION_ATTRIBUTES = ["boardId", "id", "position"]
 
 class ColumnService:
     """Service for Column business logic"""
     
     @staticmethod
-    def get_all_columns() -> List[Column]:
-        """Get all columns"""
-        return ColumnRepository.get_all()
+    def get_all_columns(attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get all columns, grouped by board and sorted by position"""
+        columns = ColumnRepository.get_all(attributes=attributes)
+        return number_by_position(columns, parent=lambda column: column.board_id)
     
     @staticmethod
-    def get_column_by_id(column_id: str) -> Optional[Column]:
+    def get_column_by_id(column_id: str, attributes: Optional[List[str]] = None) -> Optional[Column]:
         """Get a column by ID"""
-        return ColumnRepository.get_by_id(column_id)
+        return ColumnRepository.get_by_id(column_id, attributes=attributes)
+    
+    @staticmethod
+    def get_columns_by_ids(column_ids: List[str], attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get several columns by ID, skipping any that don't exist"""
+        return ColumnRepository.get_many(column_ids, attributes=attributes)
+    
+    @staticmethod
+    def get_columns_by_board_id(board_id: str, attributes: Optional[List[str]] = None) -> List[Column]:
+        """Get all columns for a specific board, sorted by position"""
+        # The board index already returns columns in order
+        items = cache.get_or_load(
+            board_group(board_id),
+            cache_variant("columns", attributes),
+            lambda: [column.to_dict() for column in ColumnRepository.get_by_board_id(board_id, attributes=attributes)]
+        )
+        # Cached items are copied into fresh models so callers can modify them
+        return number_by_position([Column.from_dict(item) for item in items])
+    
+    @staticmethod
+    def get_columns_page(board_id: str, count: int, after: Optional[Dict[str, Any]] = None,
+                         attributes: Optional[List[str]] = None) -> Page:
+        """Get a page of a board's columns, sorted by position, starting after the key ``after``"""
+        # Pages start wherever a client's cursor says, so they are read past the cache
+        return ColumnRepository.get_page_by_board_id(board_id, count, after, attributes=attributes)
     
     @staticmethod
-    def get_columns_by_board_id(board_id: str) -> List[Column]:
-        """Get all columns for a specific board, sorted by order"""
-        columns = ColumnRepository.get_by_board_id(board_id)
-        # Sort columns by order property
-        return sorted(columns, key=lambda column: column.order)
+    def get_columns_by_board_ids(board_ids: List[str], attributes: Optional[List[str]] = None) -> List[List[Column]]:
+        """Get the columns of several boards, each sorted by position, in the order the boards were given"""
+        variant = cache_variant("columns", attributes)
+        items = {board_id: cache.peek(board_group(board_id), variant) for board_id in board_ids}
+        for board_id in board_ids:
+            if items[board_id] is MISSING:
+                generation = cache.generation(board_group(board_id))
+                items[board_id] = [
+                    column.to_dict() for column in ColumnRepository.get_by_board_id(board_id, attributes=attributes)
+                ]
+                cache.put(board_group(board_id), variant, items[board_id], generation)
+        return [number_by_position([Column.from_dict(item) for item in items[board_id]]) for board_id in board_ids]
     
     @staticmethod
-    def create_column(column: Column) -> Column:
-        """Create a new column"""
-        return ColumnRepository.create(column)
+    def get_board_ids(column_ids: List[str]) -> List[str]:
+        """IDs of the boards that the given columns belong to"""
+        columns = ColumnRepository.get_many(list(set(column_ids)), attributes=["boardId", "id"])
+        return list({column.board_id for column in columns})
+    
+    @staticmethod
+    def get_column_order(column_id: str, board_id: str) -> Optional[int]:
+        """Index of a column on its board, or None if it isn't there"""
+        for column in ColumnService.get_columns_by_board_id(board_id, attributes=COLUMN_POSITION_ATTRIBUTES):
+            if column.id == column_id:
+                return column.order
+        return None
+    
+    @staticmethod
+    def create_column(column: Column, order: Optional[int] = None) -> Column:
+        """Create a new column at ``order`` on its board, or at the end"""
+        positions = ColumnService._sibling_positions(column.board_id)
+        column.order = len(positions) if order is None else max(0, min(order, len(positions)))
+        column.position = ColumnService._position_at(column.board_id, positions, column.order)
+        created_column = ColumnRepository.create(column)
+        BoardRepository.add_to_counters(created_column.board_id, column_count=1)
+        ColumnService._rebalance_if_needed(created_column)
+        return created_column
     
     @staticmethod
     def update_column(column: Column) -> Column:
@@ -33,6 +106,127 @@ class ColumnService:
         return ColumnRepository.update(column)
     
     @staticmethod
-    def delete_column(column_id: str) -> bool:
-        """Delete a column"""
-        return ColumnRepository.delete(column_id)
+    def patch_column(column_id: str, **fields) -> Column:
+        """Update only the given fields of a column"""
+        return ColumnRepository.patch(column_id, **fields)
+    
+    @staticmethod
+    def update_columns(columns: List[Column]) -> List[Column]:
+        """Update several existing columns in batched writes"""
+        return ColumnRepository.save_many(columns)
+    
+    @staticmethod
+    def move_column(column: Column, order: int) -> Column:
+        """Move a column to index ``order`` on its board, writing only that column"""
+        siblings = ColumnService._sibling_positions(column.board_id, exclude=[column.id])
+        order = max(0, min(order, len(siblings)))
+        before = siblings[order - 1] if order > 0 else None
+        after = siblings[order] if order < len(siblings) else None
+        if (column.position is not None
+                and (before is None or before < column.position) and (after is None or column.position < after)):
+            # Already between the right neighbours
+            column.order = order
+            return column
+        
+        moved_column = ColumnRepository.patch(
+            column.id, position=ColumnService._position_at(column.board_id, siblings, order, exclude=column.id)
+        )
+        moved_column.order = order
+        ColumnService._rebalance_if_needed(moved_column)
+        return moved_column
+    
+    @staticmethod
+    def reorder_columns(column_ids: List[str]) -> List[Column]:
+        """Put columns in the given order, writing only the ones that are out of place"""
+        found = {
+            column.id: column
+            for column in ColumnRepository.get_many(column_ids, attributes=COLUMN_POSITION_ATTRIBUTES)
+        }
+        for column_id in column_ids:
+            if column_id not in found:
+                raise NotFoundException("Column", column_id)
+        columns = [found[column_id] for column_id in column_ids]
+        
+        try:
+            # The longest run of columns already in order keeps its positions
+            for column, position in zip(columns, positions_for_order([column.position for column in columns])):
+                if position is not None:
+                    column.position = ColumnRepository.patch(column.id, position=position).position
+        finally:
+            invalidate_boards(*{column.board_id for column in columns})
+            bump_boards(*{column.board_id for column in columns})
+        
+        for order, column in enumerate(columns):
+            column.order = order
+        for board_id in {column.board_id for column in columns if needs_rebalance(column.position)}:
+            run_in_background(ColumnService.rebalance_board, board_id)
+        return columns
+    
+    @staticmethod
+    def rebalance_board(board_id: str) -> int:
+        """Respread the positions of a board's columns evenly, returning how many columns were rewritten"""
+        columns = ColumnRepository.get_by_board_id(board_id, attributes=COLUMN_POSITION_ATTRIBUTES)
+        rewritten = 0
+        try:
+            for column, position in zip(columns, spread_positions(len(columns))):
+                if column.position != position:
+                    ColumnRepository.patch(column.id, position=position)
+                    rewritten += 1
+        finally:
+            invalidate_boards(board_id)
+            bump_boards(board_id)
+        logger.info(f"Rebalanced {rewritten} column positions on board {board_id}")
+        return rewritten
+    
+    @staticmethod
+    def delete_column(column: Column) -> bool:
+        """Delete a column and take it off its board's column count"""
+        ColumnRepository.delete(column.id)
+        BoardRepository.add_to_counters(column.board_id, column_count=-1)
+        return True
+    
+    @staticmethod
+    def delete_column_contents(column: Column) -> Job:
+        """Start a background job that deletes the cards of a deleted column"""
+        def work(job: Job):
+            def on_progress(count: int):
+                job.advance(count)
+                # The board's card count drops as each chunk of cards goes
+                BoardRepository.add_to_counters(column.board_id, card_count=-count)
+                bump_boards(column.board_id)
+            CardService.delete_cards_by_column(column.id, column.board_id, on_progress)
+        return jobs.start("DELETE_COLUMN", column.id, work)
+    
+    @staticmethod
+    def delete_columns(column_ids: List[str]) -> int:
+        """Delete several columns"""
+        return ColumnRepository.delete_many(column_ids)
+    
+    @staticmethod
+    def _position_at(board_id: str, positions: List[str], order: int, exclude: Optional[str] = None) -> str:
+        """Position for index ``order`` among a board's positions, rebalancing first if neighbours tie"""
+        try:
+            return position_at(positions, order)
+        except ValueError:
+            # Two columns written concurrently at the same spot share a position
+            ColumnService.rebalance_board(board_id)
+            positions = ColumnService._sibling_positions(board_id, exclude=[exclude] if exclude else ())
+            return position_at(positions, min(order, len(positions)))
+    
+    @staticmethod
+    def _sibling_positions(board_id: str, exclude: Iterable[str] = ()) -> List[str]:
+        """Positions of a board's columns in order, leaving out ``exclude``
+        
+        Read past the cache, since new positions are generated between these.
+        """
+        exclude = set(exclude)
+        return [
+            sibling.position
+            for sibling in ColumnRepository.get_by_board_id(board_id, attributes=COLUMN_POSITION_ATTRIBUTES)
+            if sibling.id not in exclude
+        ]
+    
+    @staticmethod
+    def _rebalance_if_needed(column: Column):
+        if needs_rebalance(column.position):
+            run_in_background(ColumnService.rebalance_board, column.board_id)
@@ -0,0 +1,58 @@
+from typing import Any, Dict, Iterable, List, Optional
+from src.db.models.column import Column
+from src.db.models.card import Card
+from src.core.broker import Subscriber, broker
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Kinds of board change sent to subscribers; RESYNC comes from the broker itself
+BOARD_UPDATED = "BOARD_UPDATED"
+BOARD_DELETED = "BOARD_DELETED"
+COLUMN_CREATED = "COLUMN_CREATED"
+COLUMN_UPDATED = "COLUMN_UPDATED"
+COLUMN_DELETED = "COLUMN_DELETED"
+COLUMNS_REORDERED = "COLUMNS_REORDERED"
+CARD_CREATED = "CARD_CREATED"
+CARD_UPDATED = "CARD_UPDATED"
+CARD_MOVED = "CARD_MOVED"
+CARD_DELETED = "CARD_DELETED"
+# Several cards changed at once; columnIds lists the columns to refetch
+CARDS_CHANGED = "CARDS_CHANGED"
+
+def board_topic(board_id: str) -> str:
+    """Broker topic for changes to a board, its columns and its cards"""
+    return f"board:{board_id}"
+
+class EventService:
+    """Service for publishing board changes to live subscribers"""
+    
+    @staticmethod
+    def publish_board_change(board_ids: Iterable[str], kind: str, title: Optional[str] = None,
+                             column: Optional[Column] = None, card: Optional[Card] = None,
+                             column_ids: Optional[List[str]] = None):
+        """Send a compact delta to the subscribers of each board
+        
+        Only what changed is sent: the written column or card as returned by
+        the write, or the new column order, never the whole board.
+        """
+        for board_id in {board_id for board_id in board_ids if board_id}:
+            message: Dict[str, Any] = {"boardId": board_id, "kind": kind}
+            if title is not None:
+                message["title"] = title
+            if column is not None:
+                message["column"] = {**column.to_dict(), "order": column.order}
+            if card is not None:
+                message["card"] = {**card.to_dict(), "order": card.order}
+            if column_ids is not None:
+                message["columnIds"] = column_ids
+            try:
+                broker.publish(board_topic(board_id), message)
+            except Exception as e:
+                # The write has already happened; a missed update must not fail the mutation
+                logger.error(f"Failed to publish {kind} for board {board_id}: {str(e)}")
+    
+    @staticmethod
+    def subscribe_board(board_id: str) -> Subscriber:
+        """Start receiving a board's changes; must be called on the event loop"""
+        return broker.subscribe(board_topic(board_id))
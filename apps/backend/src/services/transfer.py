@@ -0,0 +1,192 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.db.models.board import Board
+from src.db.models.column import Column
+from src.db.models.card import Card
+from src.db.repositories.registry import BoardRepository, ColumnRepository, CardRepository
+from src.services.board import BoardService
+from src.core.cache import invalidate_boards
+from src.core.config import settings
+from src.core.exceptions import ValidationException
+from src.core.ranking import is_position, position_between
+from src.core.versions import bump_boards
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Version of the export format, written on the board line
+EXPORT_VERSION = 1
+
+def _line(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+class TransferService:
+    """Service for exporting and importing whole boards as newline-delimited JSON (NDJSON)
+    
+    An export is one JSON object per line: the board, then its columns in
+    order, then each column's cards in order. Every line has a ``type`` of
+    ``board``, ``column`` or ``card``, and positions are kept, so an imported
+    board is ordered exactly like the exported one. Both directions work
+    ``TRANSFER_BATCH_SIZE`` items at a time, so memory use doesn't grow with
+    the board.
+    """
+    
+    @staticmethod
+    def export_board(board_id: str) -> Iterator[bytes]:
+        """Read a board and return its export as a stream of NDJSON chunks
+        
+        The board is read right away, so a missing board raises
+        ``NotFoundException`` before anything is streamed. Columns and cards
+        are read as the stream is consumed.
+        """
+        board = BoardRepository.get_by_id(board_id)
+        return TransferService._export_chunks(board)
+    
+    @staticmethod
+    def _export_chunks(board: Board) -> Iterator[bytes]:
+        yield _line({"type": "board", "version": EXPORT_VERSION, "id": board.id, "title": board.title}).encode()
+        columns = ColumnRepository.get_by_board_id(board.id)
+        yield "".join(
+            _line({"type": "column", "id": column.id, "title": column.title, "position": column.position})
+            for column in columns
+        ).encode()
+        
+        lines: List[str] = []
+        for column in columns:
+            for card in CardRepository.iter_by_column(column.id, board.id, settings.TRANSFER_BATCH_SIZE):
+                lines.append(_line({
+                    "type": "card",
+                    "id": card.id,
+                    "columnId": card.column_id,
+                    "title": card.title,
+                    "description": card.description,
+                    "position": card.position
+                }))
+                if len(lines) >= settings.TRANSFER_BATCH_SIZE:
+                    yield "".join(lines).encode()
+                    lines = []
+        if lines:
+            yield "".join(lines).encode()
+
+class BoardImport:
+    """One import in progress, fed a batch of parsed lines at a time
+    
+    Imports always create a new board with new IDs, so a board can be
+    imported next to the one it was exported from.
+    
+    Only the new IDs of the board's columns and their card counts are held
+    between batches; cards are written and forgotten. Counters are set by
+    ``finish``, and ``abort`` removes whatever an import that failed part way
+    had already written.
+    """
+    
+    def __init__(self):
+        self.board: Optional[Board] = None
+        self.columns: Dict[str, str] = {}
+        self.card_counts: Dict[str, int] = {}
+        self._last_positions: Dict[Optional[str], Optional[str]] = {}
+    
+    def write(self, records: List[Tuple[int, Dict[str, Any]]]):
+        """Validate a batch of (line number, record) pairs and write it with batched writes"""
+        columns: List[Column] = []
+        cards: List[Card] = []
+        for line_number, record in records:
+            kind = record.get("type") if isinstance(record, dict) else None
+            if kind == "board":
+                self._create_board(line_number, record)
+            elif self.board is None:
+                raise ValidationException(f"Line {line_number}: the board must come first")
+            elif kind == "column":
+                column_id = f"col-{uuid.uuid4().hex[:8]}"
+                self.columns[self._required(line_number, record, "id")] = column_id
+                columns.append(Column(
+                    id=column_id,
+                    title=self._required(line_number, record, "title"),
+                    board_id=self.board.id,
+                    position=self._position(line_number, None, record.get("position"))
+                ))
+            elif kind == "card":
+                column_id = self.columns.get(self._required(line_number, record, "columnId"))
+                if column_id is None:
+                    raise ValidationException(f"Line {line_number}: card belongs to a column that wasn't listed before it")
+                cards.append(Card(
+                    id=f"card-{uuid.uuid4().hex[:8]}",
+                    title=self._required(line_number, record, "title"),
+                    description=record.get("description") or "",
+                    column_id=column_id,
+                    position=self._position(line_number, column_id, record.get("position"))
+                ))
+                self.card_counts[column_id] = self.card_counts.get(column_id, 0) + 1
+            else:
+                raise ValidationException(f"Line {line_number}: unknown type {kind!r}")
+        
+        # Columns go first, so the cards of this batch can find them
+        if columns:
+            ColumnRepository.save_many(columns)
+        if cards:
+            CardRepository.create_many(cards)
+    
+    def finish(self) -> Board:
+        """Set the counters of the imported board and its columns"""
+        if self.board is None:
+            raise ValidationException("The import is empty")
+        for column_id, count in self.card_counts.items():
+            ColumnRepository.add_to_counters(column_id, card_count=count)
+        self.board.column_count = len(self.columns)
+        self.board.card_count = sum(self.card_counts.values())
+        BoardRepository.add_to_counters(
+            self.board.id, column_count=self.board.column_count, card_count=self.board.card_count
+        )
+        invalidate_boards(self.board.id)
+        bump_boards(self.board.id)
+        logger.info(f"Imported board {self.board.id} with {self.board.column_count} columns "
+                    f"and {self.board.card_count} cards")
+        return self.board
+    
+    def abort(self):
+        """Delete the partly imported board, its columns and cards going in the background"""
+        if self.board is None:
+            return
+        logger.warning(f"Import into board {self.board.id} failed; deleting what was written")
+        BoardService.delete_board(self.board.id)
+        BoardService.delete_board_contents(self.board.id)
+        # Invalidated before the bump, so a read at the new version can't find the board cached
+        invalidate_boards(self.board.id)
+        bump_boards(self.board.id)
+    
+    def _create_board(self, line_number: int, record: Dict[str, Any]):
+        if self.board is not None:
+            raise ValidationException(f"Line {line_number}: an import holds a single board")
+        if record.get("version", EXPORT_VERSION) != EXPORT_VERSION:
+            raise ValidationException(f"Line {line_number}: unsupported export version {record.get('version')!r}")
+        self.board = BoardRepository.create(Board(
+            id=f"board-{uuid.uuid4().hex[:8]}",
+            title=self._required(line_number, record, "title")
+        ))
+    
+    def _position(self, line_number: int, parent_id: Optional[str], position: Any) -> str:
+        """The exported position, or one after the parent's last item when a line has none
+        
+        An exported position must be a well-formed key that sorts after the
+        parent's previous item, since items are written with their positions
+        as given.
+        """
+        last = self._last_positions.get(parent_id)
+        if position is None:
+            position = position_between(last, None)
+        elif not is_position(position):
+            raise ValidationException(f"Line {line_number}: {position!r} is not a valid position")
+        elif last is not None and position <= last:
+            raise ValidationException(
+                f"Line {line_number}: position {position!r} must come after the previous one, {last!r}"
+            )
+        self._last_positions[parent_id] = position
+        return position
+    
+    @staticmethod
+    def _required(line_number: int, record: Dict[str, Any], field: str) -> Any:
+        value = record.get(field)
+        if value is None:
+            raise ValidationException(f"Line {line_number}: '{field}' is required")
+        return value
@@ -0,0 +1,52 @@
+"""Shared fixtures for the backend tests
+
+Tests that touch storage run against the engine selected by
+``STORAGE_ENGINE``: the in-memory engine by default, or ``dynamodb`` to run
+them against DynamoDB Local. DynamoDB-backed tests are skipped when the
+endpoint can't be reached.
+"""
+
+import os
+
+# Set before anything reads the settings
+os.environ.setdefault("STORAGE_ENGINE", "memory")
+
+import socket
+import uuid
+import pytest
+from urllib.parse import urlsplit
+from src.core.config import settings
+from src.db.init_db import create_tables
+from src.db.models.board import Board
+from src.db.models.column import Column
+from src.services.board import BoardService
+from src.services.column import ColumnService
+
+@pytest.fixture(scope="session")
+def storage_reachable():
+    """Skip the requesting tests when the DynamoDB endpoint doesn't accept connections"""
+    if settings.STORAGE_ENGINE != "dynamodb" or not settings.DYNAMODB_ENDPOINT_URL:
+        return
+    endpoint = urlsplit(settings.DYNAMODB_ENDPOINT_URL)
+    port = endpoint.port or (443 if endpoint.scheme == "https" else 80)
+    try:
+        socket.create_connection((endpoint.hostname, port), timeout=2).close()
+    except OSError as e:
+        pytest.skip(f"DynamoDB endpoint {settings.DYNAMODB_ENDPOINT_URL} is unreachable: {e}")
+
+@pytest.fixture(scope="session")
+def tables(storage_reachable):
+    """Create the tables of the configured layout once per run"""
+    create_tables()
+
+@pytest.fixture
+def board(tables) -> Board:
+    """A new, empty board"""
+    return BoardService.create_board(Board(f"board-{uuid.uuid4()}", "Test board"))
+
+@pytest.fixture
+def make_column(board):
+    """Create columns at the end of the test board"""
+    def make(title: str = "Column") -> Column:
+        return ColumnService.create_column(Column(f"column-{uuid.uuid4()}", title, board.id))
+    return make
@@ -0,0 +1,31 @@
+from src.core.cache import MISSING, MemoryCacheBackend, ReadThroughCache
+
+def test_a_load_that_races_an_invalidation_is_not_cached():
+    cache = ReadThroughCache(MemoryCacheBackend(10, 30))
+    
+    def load_while_a_write_lands():
+        value = "before the write"
+        cache.invalidate(["board:a"])
+        return value
+    
+    assert cache.get_or_load("board:a", "columns:*", load_while_a_write_lands) == "before the write"
+    assert cache.peek("board:a", "columns:*") is MISSING
+    assert cache.get_or_load("board:a", "columns:*", lambda: "after the write") == "after the write"
+    assert cache.peek("board:a", "columns:*") == "after the write"
+
+def test_put_is_skipped_after_an_invalidation():
+    cache = ReadThroughCache(MemoryCacheBackend(10, 30))
+    generation = cache.generation("column:a")
+    cache.invalidate(["column:a"])
+    cache.put("column:a", "cards:*", [], generation)
+    assert cache.peek("column:a", "cards:*") is MISSING
+
+def test_forgotten_invalidations_still_block_older_loads():
+    backend = MemoryCacheBackend(1, 30)
+    generation = backend.generation("column:a")
+    backend.invalidate("column:a")
+    backend.invalidate("column:b")
+    backend.set("column:a", "cards:*", [], generation)
+    assert backend.get("column:a", "cards:*") is MISSING
+    backend.set("column:a", "cards:*", [], backend.generation("column:a"))
+    assert backend.get("column:a", "cards:*") == []
@@ -0,0 +1,224 @@
+import uuid
+import pytest
+from src.core.exceptions import ConcurrentModificationException, DatabaseException, ValidationException
+from src.core.ranking import spread_positions
+from src.db.engine import TRANSACT_WRITE_LIMIT
+from src.db.models.card import Card
+from src.db.storage import storage
+from src.db.repositories.registry import CardRepository, ColumnRepository
+from src.services import card as card_service
+from src.services.card import CardService
+
+def new_card(column_id: str, position=None) -> Card:
+    return Card(f"card-{uuid.uuid4()}", "Card", "", column_id, position=position)
+
+def stored_ids(column_id: str):
+    return [card.id for card in CardRepository.get_by_column_id(column_id)]
+
+def stored_positions(column_id: str):
+    return [card.position for card in CardRepository.get_by_column_id(column_id)]
+
+def test_create_card_at_order(make_column):
+    column = make_column()
+    first = CardService.create_card(new_card(column.id))
+    last = CardService.create_card(new_card(column.id))
+    middle = CardService.create_card(new_card(column.id), order=1)
+    assert stored_ids(column.id) == [first.id, middle.id, last.id]
+    assert ColumnRepository.get_by_id(column.id).card_count == 3
+
+def test_move_card_within_column(make_column):
+    column = make_column()
+    cards = [CardService.create_card(new_card(column.id)) for _ in range(4)]
+    moved = CardService.move_card(cards[3], column.id, 1)
+    assert moved.order == 1
+    assert stored_ids(column.id) == [cards[0].id, cards[3].id, cards[1].id, cards[2].id]
+
+def test_move_card_to_another_column_updates_counts(make_column):
+    source, target = make_column(), make_column()
+    card = CardService.create_card(new_card(source.id))
+    existing = CardService.create_card(new_card(target.id))
+    CardService.move_card(card, target.id, 0)
+    assert stored_ids(target.id) == [card.id, existing.id]
+    assert stored_ids(source.id) == []
+    assert ColumnRepository.get_by_id(source.id).card_count == 0
+    assert ColumnRepository.get_by_id(target.id).card_count == 2
+
+def test_move_card_from_stale_read_fails(make_column):
+    column = make_column()
+    cards = [CardService.create_card(new_card(column.id)) for _ in range(3)]
+    stale = CardRepository.get_by_id(cards[0].id)
+    CardService.move_card(cards[0], column.id, 2)
+    with pytest.raises(ConcurrentModificationException):
+        CardService.move_card(stale, column.id, 1)
+    assert sorted(stored_ids(column.id)) == sorted(card.id for card in cards)
+
+def test_move_card_reads_neighbours_past_the_cache(make_column):
+    column = make_column()
+    card = CardService.create_card(new_card(column.id))
+    CardService.create_card(new_card(column.id))
+    # Warm the cache, then add a card it doesn't know about
+    CardService.get_cards_by_column_id(column.id, attributes=card_service.CARD_POSITION_ATTRIBUTES)
+    unseen = CardRepository.create(new_card(column.id, position="zz"))
+    CardService.move_card(card, column.id, 2)
+    assert stored_ids(column.id)[-2:] == [unseen.id, card.id]
+
+def test_rebalance_column_respreads_and_keeps_order(make_column):
+    column = make_column()
+    positions = ["h" + "1" * length for length in range(1, 30)]
+    cards = [CardRepository.create(new_card(column.id, position)) for position in positions]
+    rewritten = CardService.rebalance_column(column.id)
+    assert rewritten == len(cards)
+    assert stored_ids(column.id) == [card.id for card in cards]
+    assert stored_positions(column.id) == spread_positions(len(cards))
+    assert CardService.rebalance_column(column.id) == 0
+
+def test_rebalance_column_retries_from_a_fresh_read(make_column, monkeypatch):
+    column = make_column()
+    cards = [CardRepository.create(new_card(column.id, "h" + "1" * length)) for length in range(1, 6)]
+    reorder = CardService.reorder_cards
+    calls = []
+    
+    def reorder_after_a_concurrent_move(moves):
+        calls.append(len(moves))
+        if len(calls) == 1:
+            # Another request moves a card between the read and the write
+            moved = CardRepository.get_by_id(cards[0].id)
+            expected_position, moved.position = moved.position, "zz"
+            CardRepository.reorder([(moved, column.id, expected_position)])
+        return reorder(moves)
+    
+    monkeypatch.setattr(CardService, "reorder_cards", staticmethod(reorder_after_a_concurrent_move))
+    CardService.rebalance_column(column.id)
+    assert len(calls) == 2
+    assert stored_ids(column.id) == [card.id for card in cards[1:]] + [cards[0].id]
+    assert stored_positions(column.id) == spread_positions(len(cards))
+
+def test_rebalance_column_runs_once_at_a_time(make_column):
+    column = make_column()
+    CardRepository.create(new_card(column.id, "h11111"))
+    card_service._rebalancing.add(column.id)
+    try:
+        assert CardService.rebalance_column(column.id, wait=False) == 0
+        assert stored_positions(column.id) == ["h11111"]
+    finally:
+        card_service._rebalancing.discard(column.id)
+    assert CardService.rebalance_column(column.id, wait=False) == 1
+
+def test_move_card_never_reverts_a_concurrent_edit(make_column):
+    column = make_column()
+    cards = [CardService.create_card(new_card(column.id)) for _ in range(2)]
+    stale = CardRepository.get_by_id(cards[0].id)
+    CardService.patch_card(cards[0].id, title="Edited")
+    try:
+        CardService.move_card(stale, column.id, 1)
+    except ConcurrentModificationException:
+        pass
+    assert CardRepository.get_by_id(cards[0].id).title == "Edited"
+
+def test_patch_cards_writes_only_the_given_fields(make_column):
+    column = make_column()
+    card = CardService.create_card(new_card(column.id))
+    other = CardService.create_card(new_card(column.id))
+    # Another request edits the description after the batch has been read
+    get_many = CardRepository.get_many
+    
+    def get_many_then_edit(card_ids, attributes=None):
+        found = get_many(card_ids, attributes=attributes)
+        CardRepository.patch(card.id, description="Concurrent")
+        return found
+    
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(CardRepository, "get_many", staticmethod(get_many_then_edit))
+        results, _ = CardService.patch_cards([(card.id, {"title": "Patched"}, None, 0)])
+    assert results[0].title == "Patched"
+    stored = CardRepository.get_by_id(card.id)
+    assert (stored.title, stored.description) == ("Patched", "Concurrent")
+    assert stored_ids(column.id) == [card.id, other.id]
+
+def test_patch_cards_moves_and_counts(make_column):
+    source, target = make_column(), make_column()
+    cards = [CardService.create_card(new_card(source.id)) for _ in range(2)]
+    results, boards = CardService.patch_cards([
+        (cards[0].id, {"title": "Moved"}, target.id, None),
+        (cards[1].id, {}, None, None),
+        ("missing", {}, None, None)
+    ])
+    assert results[0].column_id == target.id and results[0].title == "Moved"
+    assert isinstance(results[2], Exception)
+    assert set(boards) == {source.id, target.id}
+    assert stored_ids(target.id) == [cards[0].id]
+    assert ColumnRepository.get_by_id(source.id).card_count == 1
+    assert ColumnRepository.get_by_id(target.id).card_count == 1
+
+def test_patch_cards_counts_moves_written_before_a_failure(make_column, monkeypatch):
+    source, target = make_column(), make_column()
+    cards = [CardService.create_card(new_card(source.id)) for _ in range(2)]
+    move_each = CardRepository.move_each
+    calls = []
+    
+    def fail_second_transaction(moves):
+        calls.append(moves)
+        if len(calls) > 1:
+            raise DatabaseException("transact_write_items", "Throttled")
+        return move_each(moves)
+    
+    monkeypatch.setattr(card_service, "BULK_WRITE_CHUNK", 1)
+    monkeypatch.setattr(CardRepository, "move_each", staticmethod(fail_second_transaction))
+    with pytest.raises(DatabaseException):
+        CardService.patch_cards([(card.id, {}, target.id, None) for card in cards])
+    assert stored_ids(target.id) == [cards[0].id]
+    assert ColumnRepository.get_by_id(source.id).card_count == 1
+    assert ColumnRepository.get_by_id(target.id).card_count == 1
+
+def test_delete_cards_counts_only_cards_it_deleted(make_column):
+    column = make_column()
+    cards = [CardService.create_card(new_card(column.id)) for _ in range(3)]
+    get_many = CardRepository.get_many
+    
+    def get_many_then_delete(card_ids, attributes=None):
+        found = get_many(card_ids, attributes=attributes)
+        # Another request deletes one of the cards after the batch has been read
+        CardService.delete_card(cards[0])
+        return found
+    
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(CardRepository, "get_many", staticmethod(get_many_then_delete))
+        results, _ = CardService.delete_cards([card.id for card in cards])
+    assert isinstance(results[0], Exception)
+    assert [result.id for result in results[1:]] == [card.id for card in cards[1:]]
+    assert stored_ids(column.id) == []
+    assert ColumnRepository.get_by_id(column.id).card_count == 0
+
+def test_cards_page_rejects_a_start_key_that_does_not_fit(make_column):
+    column = make_column()
+    cards = [CardService.create_card(new_card(column.id)) for _ in range(2)]
+    page = CardService.get_cards_page(column.id, None, 1)
+    assert [card.id for card in page.items] == [cards[0].id]
+    assert [card.id for card in CardService.get_cards_page(column.id, None, 1, page.keys[0]).items] == [cards[1].id]
+    for after in [{"id": cards[0].id}, {name: 1 for name in page.keys[0]}, {**page.keys[0], "extra": "x"}]:
+        with pytest.raises(ValidationException):
+            CardService.get_cards_page(column.id, None, 1, after)
+
+def test_reorder_never_splits_a_card_between_transactions(make_column, monkeypatch):
+    column = make_column()
+    cards = [CardRepository.create(new_card(column.id, f"1{index:03d}1")) for index in range(80)]
+    # A card that stays put takes one operation, so later moves start mid-transaction
+    moves = [(cards[0], column.id, cards[0].position)]
+    for card in cards[1:]:
+        moves.append((card, column.id, card.position))
+        card.position = "2" + card.position[1:]
+    transactions = []
+    transact_write = storage.transact_write
+    
+    def record(operations, resource_type="Item"):
+        transactions.append(operations)
+        return transact_write(operations, resource_type=resource_type)
+    
+    monkeypatch.setattr(storage, "transact_write", record)
+    CardRepository.reorder(moves)
+    for operations in transactions:
+        assert len(operations) <= TRANSACT_WRITE_LIMIT
+        deleted = {operation["Delete"]["Key"]["SK"].rsplit("#", 1)[-1] for operation in operations if "Delete" in operation}
+        put = {operation["Put"]["Item"]["id"] for operation in operations if "Put" in operation}
+        assert deleted <= put
+    assert stored_ids(column.id) == [card.id for card in cards]
@@ -0,0 +1,24 @@
+import uuid
+from src.db.models.column import Column
+from src.db.repositories.registry import ColumnRepository
+from src.services import column as column_service
+from src.services.column import ColumnService
+
+def stored_ids(board_id: str):
+    return [column.id for column in ColumnRepository.get_by_board_id(board_id)]
+
+def test_create_column_reads_neighbours_past_the_cache(board, make_column):
+    make_column()
+    # Warm the cache, then add a column it doesn't know about
+    ColumnService.get_columns_by_board_id(board.id, attributes=column_service.COLUMN_POSITION_ATTRIBUTES)
+    unseen = ColumnRepository.create(Column(f"column-{uuid.uuid4()}", "Column", board.id, position="zz"))
+    created = ColumnService.create_column(Column(f"column-{uuid.uuid4()}", "Column", board.id))
+    assert stored_ids(board.id)[-2:] == [unseen.id, created.id]
+
+def test_move_column_reads_neighbours_past_the_cache(board, make_column):
+    column = make_column()
+    make_column()
+    ColumnService.get_columns_by_board_id(board.id, attributes=column_service.COLUMN_POSITION_ATTRIBUTES)
+    unseen = ColumnRepository.create(Column(f"column-{uuid.uuid4()}", "Column", board.id, position="zz"))
+    ColumnService.move_column(column, 2)
+    assert stored_ids(board.id)[-2:] == [unseen.id, column.id]
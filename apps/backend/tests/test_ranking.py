@@ -0,0 +1,114 @@
+import random
+import pytest
+from src.core.ranking import (
+    DIGITS,
+    is_position,
+    position_at,
+    position_between,
+    positions_for_inserts,
+    positions_for_order,
+    rebalance_plan,
+    spread_positions
+)
+
+def assert_valid(positions):
+    assert positions == sorted(positions)
+    assert len(set(positions)) == len(positions)
+    for position in positions:
+        assert position and not position.endswith("0")
+        assert set(position) <= set(DIGITS)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_inserts_stay_ordered(seed):
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(500):
+        index = rng.randint(0, len(positions))
+        position = position_at(positions, index)
+        positions.insert(index, position)
+        assert_valid(positions[max(0, index - 1):index + 2])
+    assert_valid(positions)
+
+def test_repeated_inserts_at_one_spot_stay_ordered():
+    positions = ["h", "i"]
+    for _ in range(200):
+        positions.insert(1, position_at(positions, 1))
+    assert_valid(positions)
+
+def test_appends_and_prepends_grow_slowly():
+    positions = []
+    for _ in range(100):
+        positions.append(position_at(positions, len(positions)))
+    for _ in range(100):
+        positions.insert(0, position_at(positions, 0))
+    assert_valid(positions)
+    assert max(len(position) for position in positions) <= 4
+
+def test_position_between_rejects_unordered_neighbours():
+    with pytest.raises(ValueError):
+        position_between("m", "m")
+    with pytest.raises(ValueError):
+        position_between("n", "m")
+
+def test_position_between_adjacent_digits():
+    assert "a" < position_between("a", "b") < "b"
+    assert "a" < position_between("a", "a1") < "a1"
+
+@pytest.mark.parametrize("count", [0, 1, 2, 17, 35, 36, 100, 1000])
+def test_spread_positions(count):
+    positions = spread_positions(count)
+    assert len(positions) == count
+    assert_valid(positions)
+    # Every gap leaves room for an insert without growing a key by more than a digit
+    width = max((len(position) for position in positions), default=0)
+    for before, after in zip([None] + positions, positions + [None]):
+        assert len(position_between(before, after)) <= width + 1
+
+def test_positions_for_inserts_places_runs_between_neighbours():
+    existing = ["4", "8"]
+    placed = positions_for_inserts(existing, [0, 0, None, 2])
+    merged = sorted(existing + [position for position, _ in placed])
+    assert [merged.index(position) for position, _ in placed] == [order for _, order in placed]
+    assert_valid(merged)
+
+def test_positions_for_inserts_rejects_tied_neighbours():
+    with pytest.raises(ValueError):
+        positions_for_inserts(["5", "5"], [1])
+
+def test_positions_for_order_moves_as_few_as_possible():
+    current = ["1", "2", "9", "3", "4", "5"]
+    result = positions_for_order(current)
+    assert [index for index, position in enumerate(result) if position is not None] == [2]
+    final = [new or old for old, new in zip(current, result)]
+    assert_valid(final)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_positions_for_order_after_shuffle(seed):
+    rng = random.Random(seed)
+    current = spread_positions(50)
+    rng.shuffle(current)
+    result = positions_for_order(current)
+    assert_valid([new or old for old, new in zip(current, result)])
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rebalance_plan_keeps_every_intermediate_state_sorted(seed):
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(120):
+        index = rng.choice([len(positions), len(positions) // 2, rng.randint(0, len(positions))])
+        positions.insert(index, position_at(positions, index))
+    
+    current = list(positions)
+    for index, position in rebalance_plan(positions):
+        current[index] = position
+        assert current == sorted(current)
+        assert len(set(current)) == len(current)
+    assert current == spread_positions(len(positions))
+
+def test_rebalance_plan_skips_keys_already_in_place():
+    positions = spread_positions(10)
+    assert rebalance_plan(positions) == []
+
+def test_is_position_accepts_only_well_formed_keys():
+    assert all(is_position(position) for position in spread_positions(40))
+    assert not any(is_position(value) for value in ["", "h0", "H", "h-1", 17, None])
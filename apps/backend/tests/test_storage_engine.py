@@ -0,0 +1,207 @@
+"""Behaviour every storage engine shares with DynamoDB
+
+These run against the engine selected by ``STORAGE_ENGINE``, so the same
+assertions hold for DynamoDB Local and for the in-memory engine.
+"""
+
+import uuid
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from src.core.exceptions import ConcurrentModificationException, ConditionFailedException, DatabaseException
+from src.db.storage import storage
+
+TABLE = "engine-tests"
+INDEX = "group-rank-index"
+
+@pytest.fixture(scope="module", autouse=True)
+def table(storage_reachable):
+    storage.create_table_if_not_exists(
+        table_name=TABLE,
+        key_schema=[
+            {'AttributeName': 'PK', 'KeyType': 'HASH'},
+            {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+        ],
+        attribute_definitions=[
+            {'AttributeName': 'PK', 'AttributeType': 'S'},
+            {'AttributeName': 'SK', 'AttributeType': 'S'},
+            {'AttributeName': 'group', 'AttributeType': 'S'},
+            {'AttributeName': 'rank', 'AttributeType': 'S'}
+        ],
+        global_secondary_indexes=[
+            {
+                'IndexName': INDEX,
+                'KeySchema': [
+                    {'AttributeName': 'group', 'KeyType': 'HASH'},
+                    {'AttributeName': 'rank', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {
+                    'ReadCapacityUnits': 5,
+                    'WriteCapacityUnits': 5
+                }
+            }
+        ]
+    )
+
+@pytest.fixture
+def partition() -> str:
+    """A partition key no other test writes to"""
+    return f"P#{uuid.uuid4()}"
+
+def put(partition: str, sort_key: str, **attributes):
+    item = {"PK": partition, "SK": sort_key, **attributes}
+    storage.put_item(TABLE, item)
+    return item
+
+def sort_keys(items):
+    return [item["SK"] for item in items]
+
+def test_get_item_with_projection(partition):
+    put(partition, "A", title="first", count=3)
+    assert storage.get_item(TABLE, {"PK": partition, "SK": "A"})["count"] == 3
+    assert storage.get_item(TABLE, {"PK": partition, "SK": "A"}, attributes=["title"]) == {"title": "first"}
+    assert storage.get_item(TABLE, {"PK": partition, "SK": "missing"}) is None
+
+def test_conditional_put_and_delete(partition):
+    put(partition, "A")
+    with pytest.raises(ConditionFailedException):
+        storage.put_item(TABLE, {"PK": partition, "SK": "A"}, condition_expression=Attr("PK").not_exists())
+    storage.delete_item(TABLE, {"PK": partition, "SK": "A"}, condition_expression=Attr("PK").exists())
+    with pytest.raises(ConditionFailedException):
+        storage.delete_item(TABLE, {"PK": partition, "SK": "A"}, condition_expression=Attr("PK").exists())
+
+def test_query_returns_one_partition_in_sort_key_order(partition):
+    for sort_key in ["CARD#b", "COL#a", "CARD#c", "CARD#a"]:
+        put(partition, sort_key)
+    put(f"{partition}-other", "CARD#a")
+    assert sort_keys(storage.query(TABLE, Key("PK").eq(partition))) == ["CARD#a", "CARD#b", "CARD#c", "COL#a"]
+    cards = Key("PK").eq(partition) & Key("SK").begins_with("CARD#")
+    assert sort_keys(storage.query(TABLE, cards)) == ["CARD#a", "CARD#b", "CARD#c"]
+    assert sort_keys(storage.query(TABLE, cards, scan_forward=False)) == ["CARD#c", "CARD#b", "CARD#a"]
+
+def test_query_filters_and_projects(partition):
+    put(partition, "A", colour="red")
+    put(partition, "B", colour="blue")
+    items = list(storage.iter_query(
+        TABLE, Key("PK").eq(partition), filter_expression=Attr("colour").eq("blue"), attributes=["SK"]
+    ))
+    assert items == [{"SK": "B"}]
+
+def test_query_resumes_after_a_deleted_start_key(partition):
+    for sort_key in "ABCD":
+        put(partition, sort_key)
+    storage.delete_item(TABLE, {"PK": partition, "SK": "B"})
+    items = storage.iter_query(TABLE, Key("PK").eq(partition), exclusive_start_key={"PK": partition, "SK": "B"})
+    assert sort_keys(items) == ["C", "D"]
+
+def test_index_query_is_sparse_and_ordered(partition):
+    group = f"G#{partition}"
+    put(partition, "A", group=group, rank="2")
+    put(partition, "B", group=group, rank="1")
+    put(partition, "C", group=group)
+    put(partition, "D")
+    items = storage.query(TABLE, Key("group").eq(group), index_name=INDEX)
+    assert sort_keys(items) == ["B", "A"]
+
+def test_query_many_looks_up_several_partitions(partition):
+    groups = [f"G#{partition}#{index}" for index in range(3)]
+    put(partition, "A", group=groups[0], rank="1")
+    put(partition, "B", group=groups[1], rank="1")
+    put(partition, "C", group=groups[1], rank="2")
+    items = storage.query_many(TABLE, "group", groups + [groups[0]], index_name=INDEX, attributes=["SK"])
+    assert sorted(sort_keys(items)) == ["A", "B", "C"]
+    assert storage.query_many(TABLE, "group", [], index_name=INDEX) == []
+
+def test_query_of_a_missing_index_fails(partition):
+    with pytest.raises(DatabaseException):
+        storage.query(TABLE, Key("group").eq(partition), index_name="no-such-index")
+
+def test_scan_filters_across_partitions(partition):
+    run = str(uuid.uuid4())
+    put(partition, "A", run=run)
+    put(f"{partition}-other", "A", run=run)
+    put(partition, "B")
+    items = list(storage.iter_scan(TABLE, filter_expression=Attr("run").eq(run)))
+    assert sorted(item["PK"] for item in items) == [partition, f"{partition}-other"]
+
+def test_scan_resumes_after_a_deleted_start_key(partition):
+    run = str(uuid.uuid4())
+    only_run = Attr("run").eq(run)
+    for index in range(6):
+        put(f"{partition}-{index}", "A", run=run)
+    order = [item["PK"] for item in storage.iter_scan(TABLE, filter_expression=only_run)]
+    start_key = {"PK": order[2], "SK": "A"}
+    storage.delete_item(TABLE, start_key)
+    put(f"{partition}-late", "A", run=run)
+    rest = [item["PK"] for item in storage.iter_scan(TABLE, exclusive_start_key=start_key, filter_expression=only_run)]
+    # The scan carries on past the deleted item rather than starting over
+    assert [key for key in rest if key in order] == order[3:]
+
+def test_set_attributes_only_touches_named_attributes(partition):
+    put(partition, "A", title="old", count=1)
+    item = storage.set_attributes(TABLE, {"PK": partition, "SK": "A"}, {"title": "new"},
+                                  condition_expression=Attr("PK").exists())
+    assert item["title"] == "new" and item["count"] == 1
+    with pytest.raises(ConditionFailedException):
+        storage.set_attributes(TABLE, {"PK": partition, "SK": "missing"}, {"title": "new"},
+                               condition_expression=Attr("PK").exists())
+    assert storage.get_item(TABLE, {"PK": partition, "SK": "missing"}) is None
+
+def test_add_to_attributes_counts_from_zero(partition):
+    put(partition, "A")
+    storage.add_to_attributes(TABLE, {"PK": partition, "SK": "A"}, {"count": 2})
+    item = storage.add_to_attributes(TABLE, {"PK": partition, "SK": "A"}, {"count": -1, "other": 5})
+    assert item["count"] == 1 and item["other"] == 5
+
+def test_batch_write_and_get(partition):
+    put(partition, "gone")
+    written = storage.batch_write(
+        TABLE,
+        put_items=[{"PK": partition, "SK": sort_key} for sort_key in "AB"],
+        delete_keys=[{"PK": partition, "SK": "gone"}]
+    )
+    assert written == 3
+    keys = [{"PK": partition, "SK": sort_key} for sort_key in ["B", "missing", "A"]]
+    assert sorted(sort_keys(storage.batch_get_item(TABLE, keys))) == ["A", "B"]
+
+def test_transaction_applies_every_operation(partition):
+    put(partition, "old", count=1)
+    storage.transact_write([
+        {'Delete': {'TableName': TABLE, 'Key': {"PK": partition, "SK": "old"},
+                    'ConditionExpression': Attr("count").eq(1)}},
+        {'Put': {'TableName': TABLE, 'Item': {"PK": partition, "SK": "new"},
+                 'ConditionExpression': Attr("PK").not_exists()}}
+    ])
+    assert sort_keys(storage.query(TABLE, Key("PK").eq(partition))) == ["new"]
+
+def test_transaction_with_a_failed_condition_applies_nothing(partition):
+    put(partition, "old", count=1)
+    put(partition, "taken")
+    with pytest.raises(ConcurrentModificationException):
+        storage.transact_write([
+            {'Delete': {'TableName': TABLE, 'Key': {"PK": partition, "SK": "old"},
+                        'ConditionExpression': Attr("PK").exists()}},
+            {'Put': {'TableName': TABLE, 'Item': {"PK": partition, "SK": "taken", "count": 2},
+                     'ConditionExpression': Attr("PK").not_exists()}}
+        ], resource_type="Card")
+    assert sort_keys(storage.query(TABLE, Key("PK").eq(partition))) == ["old", "taken"]
+    assert "count" not in storage.get_item(TABLE, {"PK": partition, "SK": "taken"})
+
+def test_transaction_rejects_two_operations_on_one_item(partition):
+    with pytest.raises(DatabaseException):
+        storage.transact_write([
+            {'Put': {'TableName': TABLE, 'Item': {"PK": partition, "SK": "A"}}},
+            {'Delete': {'TableName': TABLE, 'Key': {"PK": partition, "SK": "A"}}}
+        ])
+    assert storage.get_item(TABLE, {"PK": partition, "SK": "A"}) is None
+
+def test_transact_write_each_leaves_out_only_groups_whose_conditions_fail(partition):
+    put(partition, "A")
+    put(partition, "C")
+    written = storage.transact_write_each([
+        [{'Delete': {'TableName': TABLE, 'Key': {"PK": partition, "SK": sort_key},
+                     'ConditionExpression': Attr("PK").exists()}}]
+        for sort_key in ["A", "B", "C"]
+    ])
+    assert written == [True, False, True]
+    assert storage.query(TABLE, Key("PK").eq(partition)) == []
@@ -0,0 +1,21 @@
+from src.core import versions as versions_module
+from src.core.versions import MemoryVersionStore
+
+def test_bump_changes_only_the_bumped_keys():
+    store = MemoryVersionStore(30)
+    before = store.get(["a", "b"])
+    store.bump(["a"])
+    after = store.get(["a", "b"])
+    assert after[0] != before[0] and after[1] == before[1]
+
+def test_memory_versions_expire_with_the_cache_ttl(monkeypatch):
+    store = MemoryVersionStore(30)
+    monkeypatch.setattr(versions_module.time, "time", lambda: 1000.0)
+    first = store.get(["a"])
+    assert store.get(["a"]) == first
+    monkeypatch.setattr(versions_module.time, "time", lambda: 1030.0)
+    assert store.get(["a"]) != first
+
+def test_memory_versions_never_repeat_without_a_cache():
+    store = MemoryVersionStore(0)
+    assert store.get(["a"]) != store.get(["a"])